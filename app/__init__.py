@@ -1,7 +1,44 @@
+import asyncio
+
 from fastapi import FastAPI
+from loguru import logger
 
-from app.handler import api_v1_router
+from app.handler import api_v1_router, metrics
+from app.handler.resume import MAX_UPLOAD_SIZE, BATCH_MAX_UPLOAD_SIZE
+from app.middleware import BodySizeLimitMiddleware, ServerTimingMiddleware, MULTIPART_OVERHEAD
+from app.service.http_client import close_async_client
+from app.service.job_queue import job_queue
+from app.service.pdf_renderer import pdf_render_pool
+from app.service.warmup import warmup
+from config import config
 
 
 app = FastAPI()
-app.include_router(api_v1_router, prefix="/api/v1")
\ No newline at end of file
+app.include_router(api_v1_router, prefix="/api/v1")
+app.include_router(metrics.router)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/api/v1/resume/parse": MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+        "/api/v1/resume/parse-batch": BATCH_MAX_UPLOAD_SIZE,
+    },
+)
+# 最外层，请求耗时包含其他中间件
+app.add_middleware(ServerTimingMiddleware)
+
+
+@app.on_event("startup")
+async def startup():
+    # 重型依赖在导入时不加载，在 worker 接收请求前预热
+    if getattr(config, "warmup_on_startup", True):
+        await asyncio.to_thread(warmup)
+    await job_queue.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_queue.stop()
+    await close_async_client()
+    pdf_render_pool.shutdown()
+    # 等待后台线程写完已入队的日志
+    await logger.complete()
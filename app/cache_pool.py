@@ -4,9 +4,9 @@ from contextlib import contextmanager
 from collections import OrderedDict
 
 from loguru import logger
-from pymilvus.model.hybrid import BGEM3EmbeddingFunction
 
-from utils.utils import embedding_device
+from app.service.metrics import timed
+from utils.utils import embedding_device, log_limiter
 from config import config
 
 
@@ -30,17 +30,23 @@ class ThreadSafeObject:
     def acquire(self, owner: str = "", msg: str = ""):
         owner = owner or f"thread {threading.get_native_id()}"
         try:
-            self._lock.acquire()
+            with timed("lock_wait"):
+                self._lock.acquire()
             if self._pool is not None:
                 self._pool._cache.move_to_end(self.key)
-            if config.log_verbose:
-                logger.info(f"{owner} 开始操作：{self.key}。{msg}")
+            # 每次访问模型都会经过这里，按调用位置限流
+            if config.log_verbose and (dropped := log_limiter.take()) is not None:
+                logger.info(f"{owner} 开始操作：{self.key}。{msg}{self._dropped(dropped)}")
             yield self._obj
         finally:
-            if config.log_verbose:
-                logger.info(f"{owner} 结束操作：{self.key}。{msg}")
+            if config.log_verbose and (dropped := log_limiter.take()) is not None:
+                logger.info(f"{owner} 结束操作：{self.key}。{msg}{self._dropped(dropped)}")
             self._lock.release()
 
+    @staticmethod
+    def _dropped(count: int) -> str:
+        return f"（此前省略 {count} 条）" if count else ""
+
     def start_loading(self):
         self._loaded.clear()
 
@@ -114,6 +120,8 @@ class EmbeddingsPool(CachePool):
             self.set(key, item)
             with item.acquire(msg="初始化"):
                 self.atomic.release()
+                # 导入 pymilvus.model 会加载 torch / transformers（数秒），只在首次加载模型时导入
+                from pymilvus.model.hybrid import BGEM3EmbeddingFunction
                 embeddings = BGEM3EmbeddingFunction(
                     model_name=model,
                     device=device,
@@ -127,6 +135,24 @@ class EmbeddingsPool(CachePool):
         return self.get(key).obj
 
 
+class TimedEmbeddingFunction:
+    """ 记录向量化耗时的 embedding function 包装 """
+
+    def __init__(self, ef: "BGEM3EmbeddingFunction"):
+        self._ef = ef
+
+    def encode_documents(self, documents: List[str]) -> dict:
+        with timed("embed", "documents"):
+            return self._ef.encode_documents(documents)
+
+    def encode_queries(self, queries: List[str]) -> dict:
+        with timed("embed", "queries"):
+            return self._ef.encode_queries(queries)
+
+    def __getattr__(self, name: str):
+        return getattr(self._ef, name)
+
+
 embeddings_pool = EmbeddingsPool(cache_num=1)
 # 延迟加载 embedding model，避免在导入时就初始化（可能依赖未安装）
 bge_m3_ef = None
@@ -135,5 +161,7 @@ def get_bge_m3_ef():
     """获取 BGE-M3 embedding function，延迟加载"""
     global bge_m3_ef
     if bge_m3_ef is None:
-        bge_m3_ef = embeddings_pool.load_embeddings(config.embedding_model, config.device)
+        bge_m3_ef = TimedEmbeddingFunction(
+            embeddings_pool.load_embeddings(config.embedding_model, config.device)
+        )
     return bge_m3_ef
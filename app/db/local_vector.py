@@ -0,0 +1,555 @@
+import os
+import re
+import json
+import fcntl
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+from pymilvus import CollectionSchema, DataType
+from scipy import sparse as sp
+
+from config import config
+
+
+class LocalHit:
+    """ 与 pymilvus 检索结果相同的属性（id、distance、fields） """
+
+    __slots__ = ("id", "distance", "fields")
+
+    def __init__(self, id: int, distance: float, fields: dict):
+        self.id = id
+        self.distance = distance
+        self.fields = fields
+
+
+class _Column:
+    """ 字典编码的字符串列：codes[i] 为第 i 行的值在 vocab 中的下标，等值过滤只比较整数 """
+
+    def __init__(self, values: List[str]):
+        index: Dict[str, int] = {}
+        self.codes = np.fromiter(
+            (index.setdefault(value, len(index)) for value in values), dtype=np.int32, count=len(values)
+        )
+        self.index = index
+        self.vocab = np.array(list(index), dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def value(self, row: int) -> str:
+        return self.vocab[self.codes[row]]
+
+    def values(self) -> np.ndarray:
+        return self.vocab[self.codes] if len(self.codes) else np.array([], dtype=object)
+
+    def equals(self, value) -> np.ndarray:
+        return self.codes == self.index.get(value, -1)
+
+    def isin(self, values: list) -> np.ndarray:
+        return np.isin(self.codes, [self.index[value] for value in values if value in self.index])
+
+
+_expr_token_pattern = re.compile(
+    r"""\s*(?:(?P<num>-?\d+(?:\.\d+)?)|(?P<str>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')"""
+    r"""|(?P<op>&&|\|\||==|!=|>=|<=|>|<|\(|\)|\[|\]|,)|(?P<name>[A-Za-z_]\w*))"""
+)
+_comparisons = {
+    "==": np.equal, "!=": np.not_equal, ">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal,
+}
+
+
+class _ExprEvaluator:
+    """ Milvus 标量过滤表达式的子集，直接计算为行掩码
+
+    支持 field == / != / > / >= / < / <= 字面量、field in [...]、not、括号，
+    以及 && / and、|| / or 组合；字符串字面量用单引号或双引号（\\ 转义）。
+    """
+
+    def __init__(self, expr: str, column: Callable[[str], object]):
+        self.tokens = []
+        position = 0
+        expr = expr.strip()
+        while position < len(expr):
+            match = _expr_token_pattern.match(expr, position)
+            if match is None or match.end() == position:
+                raise ValueError(f"无法解析的过滤表达式: {expr}")
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == "name" and text.lower() in ("and", "or", "not", "in"):
+                kind, text = "op", {"and": "&&", "or": "||"}.get(text.lower(), text.lower())
+            self.tokens.append((kind, text))
+            position = match.end()
+        self.position = 0
+        self.column = column
+        self.expr = expr
+
+    def evaluate(self) -> np.ndarray:
+        mask = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"无法解析的过滤表达式: {self.expr}")
+        return mask
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def _next(self, expected_kind: str = None) -> str:
+        if self.position >= len(self.tokens):
+            raise ValueError(f"过滤表达式不完整: {self.expr}")
+        kind, text = self.tokens[self.position]
+        if expected_kind is not None and kind != expected_kind:
+            raise ValueError(f"过滤表达式在 {text} 处有误: {self.expr}")
+        self.position += 1
+        return text
+
+    def _or(self) -> np.ndarray:
+        mask = self._and()
+        while self._peek() == "||":
+            self._next()
+            mask = mask | self._and()
+        return mask
+
+    def _and(self) -> np.ndarray:
+        mask = self._factor()
+        while self._peek() == "&&":
+            self._next()
+            mask = mask & self._factor()
+        return mask
+
+    def _factor(self) -> np.ndarray:
+        if self._peek() == "not":
+            self._next()
+            return ~self._factor()
+        if self._peek() == "(":
+            self._next()
+            mask = self._or()
+            if self._next() != ")":
+                raise ValueError(f"过滤表达式括号不匹配: {self.expr}")
+            return mask
+        return self._comparison()
+
+    def _literal(self):
+        kind, text = self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+        self._next()
+        if kind == "str":
+            return re.sub(r"\\(.)", r"\1", text[1:-1])
+        if kind == "num":
+            return float(text) if "." in text else int(text)
+        raise ValueError(f"过滤表达式在 {text} 处应为字面量: {self.expr}")
+
+    def _comparison(self) -> np.ndarray:
+        column = self.column(self._next("name"))
+        op = self._next("op")
+        if op == "in":
+            if self._next() != "[":
+                raise ValueError(f"in 之后应为列表: {self.expr}")
+            values = []
+            while self._peek() != "]":
+                values.append(self._literal())
+                if self._peek() == ",":
+                    self._next()
+            self._next()
+            return column.isin(values) if isinstance(column, _Column) else np.isin(column, values)
+        if op not in _comparisons:
+            raise ValueError(f"不支持的运算符 {op}: {self.expr}")
+        value = self._literal()
+        if isinstance(column, _Column):
+            if op == "==":
+                return column.equals(value)
+            if op == "!=":
+                return ~column.equals(value)
+            column = column.values()
+        return _comparisons[op](column, value)
+
+
+class _Segment:
+    """ 一次插入写入的不可变数据段
+
+    目录中包含 pk.npy、columns.json（标量列）、<稠密向量字段>.npy（内存映射读取）、<稀疏向量字段>.npz
+    """
+
+    def __init__(self, path: str, schema: "_SchemaInfo"):
+        self.path = path
+        self.pk = np.load(os.path.join(path, "pk.npy"))
+        with open(os.path.join(path, "columns.json"), encoding="utf-8") as f:
+            self.columns: Dict[str, list] = json.load(f)
+        self.dense = {
+            field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r") for field in schema.dense_fields
+        }
+        self.sparse = {
+            field: sp.csr_array(sp.load_npz(os.path.join(path, f"{field}.npz"))) for field in schema.sparse_fields
+        }
+
+    @staticmethod
+    def write(path: str, pk: np.ndarray, columns: Dict[str, list], dense: Dict[str, np.ndarray], sparse: dict):
+        # 未写入 manifest 的残留目录（写入中途退出）
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        np.save(os.path.join(path, "pk.npy"), pk)
+        with open(os.path.join(path, "columns.json"), "w", encoding="utf-8") as f:
+            json.dump(columns, f, ensure_ascii=False)
+        for field, vectors in dense.items():
+            np.save(os.path.join(path, f"{field}.npy"), vectors)
+        for field, vectors in sparse.items():
+            sp.save_npz(os.path.join(path, f"{field}.npz"), sp.csr_matrix(vectors))
+
+
+class _SchemaInfo:
+    def __init__(self, schema: CollectionSchema):
+        fields = [field for field in schema.fields if not field.auto_id]
+        # insert 时实体按该顺序传入
+        self.insert_fields = [field.name for field in fields]
+        self.pk_field = next((field.name for field in schema.fields if field.is_primary), "pk")
+        self.dense_fields = [field.name for field in fields if field.dtype == DataType.FLOAT_VECTOR]
+        self.sparse_fields = [field.name for field in fields if field.dtype == DataType.SPARSE_FLOAT_VECTOR]
+        self.scalar_fields = [
+            field.name for field in fields if field.name not in self.dense_fields + self.sparse_fields
+        ]
+
+
+class _View:
+    """ 某一版本的全部数据段合并后的只读视图（检索时使用，不随后续写入变化） """
+
+    def __init__(self, schema: _SchemaInfo, segments: List[_Segment], deleted: List[Optional[np.ndarray]]):
+        self.segments = segments
+        self.rows = sum(len(segment.pk) for segment in segments)
+        self.pk = np.concatenate([segment.pk for segment in segments]) if segments else np.zeros(0, np.int64)
+        self.alive = (
+            np.concatenate([
+                ~mask if mask is not None else np.ones(len(segment.pk), dtype=bool)
+                for segment, mask in zip(segments, deleted)
+            ]) if segments else np.zeros(0, dtype=bool)
+        )
+        self.columns = {
+            field: _Column([value for segment in segments for value in segment.columns[field]])
+            for field in schema.scalar_fields
+        }
+        # 倒排索引：词 -> (行号, 权重)，即按词组织的 CSR（词数 × 行数）
+        self.postings = {}
+        for field in schema.sparse_fields:
+            matrices = [segment.sparse[field] for segment in segments]
+            dim = max((matrix.shape[1] for matrix in matrices), default=0)
+            doc_term = sp.vstack([_resize(matrix, dim) for matrix in matrices], format="csr") if matrices \
+                else sp.csr_array((0, 0), dtype=np.float32)
+            self.postings[field] = sp.csr_array(doc_term.T)
+        self.pk_field = schema.pk_field
+
+    def column(self, field: str):
+        if field == self.pk_field:
+            return self.pk
+        if field not in self.columns:
+            raise ValueError(f"不支持按字段 {field} 过滤")
+        return self.columns[field]
+
+    def mask(self, expr: Optional[str]) -> np.ndarray:
+        if not expr:
+            return self.alive
+        return self.alive & _ExprEvaluator(expr, self.column).evaluate()
+
+    def scores(self, data, anns_field: str) -> np.ndarray:
+        """查询向量与每一行的内积（查询数 × 行数）"""
+        if anns_field in self.postings:
+            postings = self.postings[anns_field]
+            queries = data if sp.issparse(data) else sp.vstack([sp.csr_array(row) for row in data], format="csr")
+            queries = _resize(sp.csr_array(queries), postings.shape[0])
+            return (queries @ postings).toarray()
+        queries = np.asarray(np.vstack(data), dtype=np.float32)
+        if not self.segments:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        return np.hstack([queries @ segment.dense[anns_field].T for segment in self.segments])
+
+    def ranked(self, data, anns_field: str, limit: int, expr: Optional[str]) -> List[List[tuple]]:
+        """每个查询按内积从高到低的 [(行号, 分数)]"""
+        scores = self.scores(data, anns_field)
+        mask = self.mask(expr)
+        k = min(limit, int(mask.sum()))
+        if k <= 0:
+            return [[] for _ in range(scores.shape[0])]
+        candidates = np.flatnonzero(mask)
+        scores = scores[:, candidates]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ranked = []
+        for row_scores, row_top in zip(scores, top):
+            # 分数相同时行号小的在前（结果稳定）
+            order = np.lexsort((row_top, -row_scores[row_top]))
+            ranked.append([(int(candidates[i]), float(row_scores[i])) for i in row_top[order]])
+        return ranked
+
+    def hit(self, row: int, distance: float, output_fields: Optional[List[str]]) -> LocalHit:
+        fields = {}
+        for field in output_fields or []:
+            fields[field] = int(self.pk[row]) if field == self.pk_field else self.columns[field].value(row)
+        return LocalHit(int(self.pk[row]), distance, fields)
+
+
+def _resize(matrix, dim: int) -> sp.csr_array:
+    """调整稀疏矩阵的列数（超出的列在另一方中没有对应项，直接去掉）"""
+    matrix = sp.csr_array(matrix)
+    if matrix.shape[1] > dim:
+        return sp.csr_array(matrix[:, :dim])
+    return sp.csr_array((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], dim))
+
+
+class LocalCollection:
+    """ 进程内向量检索，接口与 pymilvus Collection 中仓储层用到的部分一致
+
+    数据按插入批次写成不可变的数据段：稠密向量为内存映射的 NumPy 数组（多个 worker 共享页缓存），
+    稀疏向量在加载时合并为倒排索引，标量字段为字典编码的列；删除写入删除标记，
+    数据段数超过 local_vector_max_segments 时合并较小的一半数据段。
+    manifest.json 记录当前的数据段，写入时持有文件锁，多个进程（worker、scheduler）可共享同一目录，
+    检索前发现 manifest 变化时重新加载。
+    """
+
+    def __init__(self, name: str, schema: CollectionSchema, path: str, max_segments: int = 16):
+        """
+        Args:
+            name: collection 名称
+            schema: collection 的 Schema（决定 insert 时实体的字段顺序与向量字段）
+            path: 数据目录
+            max_segments: 数据段数上限，超过时合并
+        """
+        self.name = name
+        self.path = path
+        self.max_segments = max_segments
+        self._schema = _SchemaInfo(schema)
+        # 可重入：删除时在持有写锁的情况下读取当前视图
+        self._lock = threading.RLock()
+        self._manifest_stat = None
+        self._segments: Dict[str, _Segment] = {}
+        self._view: Optional[_View] = None
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "next_pk": 0, "next_segment": 0, "segments": []}
+
+    def _write_manifest(self, manifest: dict):
+        manifest["version"] += 1
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+
+    @contextmanager
+    def _writing(self):
+        """写入时持有进程内锁与文件锁，返回最新的 manifest"""
+        with self._lock, open(os.path.join(self.path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield self._read_manifest()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _current(self) -> _View:
+        """当前 manifest 对应的视图，manifest 未变化时直接复用"""
+        try:
+            stat = os.stat(self._manifest_path)
+            key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            key = None
+        with self._lock:
+            if self._view is None or key != self._manifest_stat:
+                for attempt in range(3):
+                    try:
+                        self._load_view()
+                        break
+                    except FileNotFoundError:
+                        # 读取 manifest 后其他进程完成了合并或删除，旧文件已移除，重新读取
+                        if attempt == 2:
+                            raise
+                self._manifest_stat = key
+            return self._view
+
+    def _load_view(self):
+        manifest = self._read_manifest()
+        names = [segment["name"] for segment in manifest["segments"]]
+        segments = {
+            name: self._segments.get(name) or _Segment(os.path.join(self.path, name), self._schema)
+            for name in names
+        }
+        deleted = [
+            np.load(os.path.join(self.path, segment["deleted"])) if segment.get("deleted") else None
+            for segment in manifest["segments"]
+        ]
+        self._segments = segments
+        self._view = _View(self._schema, [segments[name] for name in names], deleted)
+
+    def load(self):
+        pass
+
+    def flush(self):
+        # 每次 insert / delete 都已写入磁盘
+        pass
+
+    def insert(self, entities: list):
+        """
+        Args:
+            entities: 按 Schema 字段顺序（不含自增主键）的列数据
+        """
+        data = dict(zip(self._schema.insert_fields, entities))
+        rows = len(data[self._schema.insert_fields[0]])
+        if rows == 0:
+            return
+        dense = {
+            field: np.asarray(np.vstack(data[field]), dtype=np.float32) for field in self._schema.dense_fields
+        }
+        sparse = {
+            field: data[field] if sp.issparse(data[field]) else sp.vstack([sp.csr_array(row) for row in data[field]])
+            for field in self._schema.sparse_fields
+        }
+        columns = {field: [str(value) for value in data[field]] for field in self._schema.scalar_fields}
+        with self._writing() as manifest:
+            name = f"{manifest['next_segment']:08d}"
+            pk = np.arange(manifest["next_pk"], manifest["next_pk"] + rows, dtype=np.int64)
+            _Segment.write(os.path.join(self.path, name), pk, columns, dense, sparse)
+            manifest["segments"].append({"name": name, "rows": rows, "deleted": None})
+            manifest["next_segment"] += 1
+            manifest["next_pk"] += rows
+            removed = self._compact(manifest) if len(manifest["segments"]) > self.max_segments else []
+            self._write_manifest(manifest)
+        self._remove(removed)
+
+    def _compact(self, manifest: dict) -> List[str]:
+        """合并行数较少的一半数据段（去掉已删除的行），返回可删除的文件"""
+        segments = sorted(manifest["segments"], key=lambda segment: segment["rows"])
+        merging = segments[: max(2, len(segments) // 2)]
+        loaded = [_Segment(os.path.join(self.path, segment["name"]), self._schema) for segment in merging]
+        keeps = [
+            ~np.load(os.path.join(self.path, segment["deleted"])) if segment.get("deleted")
+            else np.ones(segment["rows"], dtype=bool)
+            for segment in merging
+        ]
+        name = f"{manifest['next_segment']:08d}"
+        _Segment.write(
+            os.path.join(self.path, name),
+            np.concatenate([segment.pk[keep] for segment, keep in zip(loaded, keeps)]),
+            {
+                field: [value for segment, keep in zip(loaded, keeps) for value in np.asarray(
+                    segment.columns[field], dtype=object)[keep].tolist()]
+                for field in self._schema.scalar_fields
+            },
+            {
+                field: np.vstack([np.asarray(segment.dense[field])[keep] for segment, keep in zip(loaded, keeps)])
+                for field in self._schema.dense_fields
+            },
+            {
+                field: sp.vstack([
+                    _resize(segment.sparse[field], max(s.sparse[field].shape[1] for s in loaded))[np.flatnonzero(keep)]
+                    for segment, keep in zip(loaded, keeps)
+                ], format="csr")
+                for field in self._schema.sparse_fields
+            },
+        )
+        merged_names = {segment["name"] for segment in merging}
+        manifest["segments"] = [
+            segment for segment in manifest["segments"] if segment["name"] not in merged_names
+        ] + [{"name": name, "rows": int(sum(keep.sum() for keep in keeps)), "deleted": None}]
+        manifest["next_segment"] += 1
+        logger.info(f"{self.name}: 合并 {len(merging)} 个数据段为 {name}")
+        return [segment["name"] for segment in merging] + [
+            segment["deleted"] for segment in merging if segment.get("deleted")
+        ]
+
+    def delete(self, expr: str):
+        """按过滤表达式删除（如 pk>=0 删除全部）"""
+        removed = []
+        with self._writing() as manifest:
+            view = self._current()
+            matched = view.mask(expr)
+            if not matched.any():
+                return
+            offset = 0
+            segments = []
+            for segment in manifest["segments"]:
+                rows = segment["rows"]
+                hit = matched[offset: offset + rows]
+                remaining = view.alive[offset: offset + rows] & ~hit
+                offset += rows
+                if not hit.any():
+                    segments.append(segment)
+                    continue
+                if segment.get("deleted"):
+                    removed.append(segment["deleted"])
+                if not remaining.any():
+                    removed.append(segment["name"])
+                    continue
+                segment["deleted"] = f"deleted-{segment['name']}-{manifest['version'] + 1}.npy"
+                np.save(os.path.join(self.path, segment["deleted"]), ~remaining)
+                segments.append(segment)
+            manifest["segments"] = segments
+            self._write_manifest(manifest)
+        self._remove(removed)
+
+    def _remove(self, names: List[str]):
+        # 其他进程可能仍在读取旧版本：已映射的文件在删除后仍可访问
+        for name in names:
+            path = os.path.join(self.path, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+
+    @property
+    def num_entities(self) -> int:
+        return int(self._current().alive.sum())
+
+    def search(self, data, anns_field: str, param: dict, limit: int, expr: str = None, output_fields=None, **kwargs):
+        view = self._current()
+        return [
+            [view.hit(row, score, output_fields) for row, score in hits]
+            for hits in view.ranked(data, anns_field, limit, expr)
+        ]
+
+    def hybrid_search(self, reqs: list, rerank=None, limit: int = 10, output_fields=None, **kwargs):
+        """各路召回按 RRF 融合（分数为 Σ 1 / (k + 名次)，k 取 rerank 的参数，默认 60）"""
+        view = self._current()
+        k = (rerank.dict().get("params", {}).get("k", 60) if rerank is not None else 60)
+        per_request = [view.ranked(req.data, req.anns_field, req.limit, req.expr) for req in reqs]
+        results = []
+        for hits_per_request in zip(*per_request):
+            fused: Dict[int, float] = {}
+            for hits in hits_per_request:
+                for rank, (row, _) in enumerate(hits, 1):
+                    fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank)
+            top = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            results.append([view.hit(row, score, output_fields) for row, score in top])
+        return results
+
+
+_collections: Dict[str, LocalCollection] = {}
+_collections_lock = threading.Lock()
+
+
+def get_local_collection(name: str) -> LocalCollection:
+    """按名称获取本地 collection（进程内共享），Schema 按配置中的 collection 名称确定，数据目录取当前配置"""
+    path = os.path.join(getattr(config, "local_vector_path", "data/vectors"), name)
+    with _collections_lock:
+        collection = _collections.get(path)
+        if collection is None:
+            from app.model.concept import ConceptSchema, ConceptCentroidSchema, JobRequirementSchema
+
+            schemas = {
+                config.milvus_collection: ConceptSchema,
+                getattr(config, "concept_centroid_collection", "concept_centroids"): ConceptCentroidSchema,
+                getattr(config, "job_requirement_collection", "job_requirements"): JobRequirementSchema,
+            }
+            if name not in schemas:
+                raise ValueError(f"未知的 collection: {name}")
+            collection = _collections[path] = LocalCollection(
+                name,
+                schemas[name],
+                path,
+                max_segments=getattr(config, "local_vector_max_segments", 16),
+            )
+        return collection
@@ -1,56 +1,72 @@
-from pymilvus import MilvusClient, Collection, CollectionSchema, connections, db
+import os
+import threading
+from typing import TYPE_CHECKING, Dict
 
+from app.service.metrics import timed
 from config import config
 
+# 导入 pymilvus 会加载 pandas、grpc（约 0.5s），只在首次连接 Milvus 时导入
+if TYPE_CHECKING:
+    from pymilvus import MilvusClient, Collection, CollectionSchema
 
-# index params
-sparse_vector_params = MilvusClient.prepare_index_params()
-sparse_vector_params.add_index(
-    field_name="sparse_vector", 
-    metric_type="IP", 
-    index_type="SPARSE_INVERTED_INDEX", 
-    index_name="sparse_vector"
-)
 
-dense_vector_params = MilvusClient.prepare_index_params()
-dense_vector_params.add_index(
-    field_name="dense_vector",
-    metric_type="IP", 
-    index_type="FLAT", 
-    index_name="dense_vector"
-)
+# 仓储层使用的连接别名（init_milvus_db 使用 "default" 连接默认数据库建库，两者互不影响）
+MILVUS_ALIAS = "repository"
 
+# 每个进程建立一次连接，collection 按名称缓存；gRPC 连接可被多个线程同时使用
+_connection_lock = threading.Lock()
+_connected_pid = None
+_collections: Dict[str, "Collection"] = {}
 
-def prepare_milvus_oper(collection_name: str = None):
-    """ milvus 操作前的连接建立装饰器
+
+def get_collection(coll_name: str) -> "Collection":
+    """
+    获取已加载的 collection，首次调用时建立连接
+    
+    不再每次操作都断开重连：断开会关闭其他线程正在使用的同一个连接。
     
     Args:
-        collection_name: 指定的 collection 名称，如果为 None 则使用默认的 config.milvus_collection
-                         如果函数名包含 'job_requirement'，则自动使用 job_requirement_collection
+        coll_name: collection 名称
+    
+    Returns:
+        Collection
     """
-    def decorator(func):
-        def inner(*args, **kwargs):
+    from pymilvus import Collection, connections
+    
+    global _connected_pid
+    with _connection_lock:
+        # fork 出的子进程不能复用父进程的 gRPC 连接
+        if _connected_pid != os.getpid():
             # 确保端口是整数类型
             port = int(config.milvus_port) if isinstance(config.milvus_port, str) else config.milvus_port
-            
-            # 使用连接别名，避免重复连接冲突
-            alias = "default"
-            
-            # 每次操作时重新连接，确保使用正确的数据库
-            # 如果连接已存在，先断开再连接（避免连接冲突）
-            try:
-                connections.disconnect(alias)
-            except:
-                pass
-            
-            # 连接到指定数据库
+            _collections.clear()
             connections.connect(
-                host=config.milvus_host, 
+                host=config.milvus_host,
                 port=port,
                 db_name=config.milvus_db,
-                alias=alias
+                alias=MILVUS_ALIAS
             )
-            
+            _connected_pid = os.getpid()
+        
+        collection = _collections.get(coll_name)
+        if collection is None:
+            collection = Collection(coll_name, using=MILVUS_ALIAS)
+            collection.load()
+            _collections[coll_name] = collection
+        return collection
+
+
+def prepare_milvus_oper(collection_name: str = None):
+    """ milvus 操作前获取 collection 的装饰器
+    
+    配置 vector_backend 为 "local" 时使用进程内检索（app.db.local_vector），不连接 Milvus。
+    
+    Args:
+        collection_name: 指定的 collection 名称，如果为 None 则使用默认的 config.milvus_collection
+                         如果函数名包含 'job_requirement'，则自动使用 job_requirement_collection
+    """
+    def decorator(func):
+        def inner(*args, **kwargs):
             # 确定使用的 collection 名称
             if collection_name:
                 coll_name = collection_name
@@ -61,17 +77,29 @@ def prepare_milvus_oper(collection_name: str = None):
                 # 默认使用配置的 collection
                 coll_name = config.milvus_collection
             
-            # 使用连接别名获取 collection
-            collection = Collection(coll_name, using=alias)
-            collection.load()
-            return func(collection, *args, **kwargs)
+            if getattr(config, "vector_backend", "milvus") == "local":
+                # 进程内检索，不需要连接
+                from app.db.local_vector import get_local_collection
+                collection = get_local_collection(coll_name)
+            else:
+                with timed("milvus", "connect"):
+                    collection = get_collection(coll_name)
+            
+            with timed("milvus", func.__name__):
+                return func(collection, *args, **kwargs)
         return inner
+    
+    # 支持不带参数直接使用 @prepare_milvus_oper
+    if callable(collection_name):
+        func, collection_name = collection_name, None
+        return decorator(func)
     return decorator
 
 
 def init_milvus_db():
     """初始化 Milvus 数据库连接，如果数据库不存在则自动创建"""
     from loguru import logger
+    from pymilvus import MilvusClient, connections, db
     
     # 确保端口是整数类型
     port = int(config.milvus_port) if isinstance(config.milvus_port, str) else config.milvus_port
@@ -128,9 +156,27 @@ def init_milvus_db():
     return client
 
 
-def init_milvus_collection(client: MilvusClient, collection: str, schema: CollectionSchema):
+def init_milvus_collection(client: "MilvusClient", collection: str, schema: "CollectionSchema"):
     """初始化 Milvus Collection"""
     from loguru import logger
+    from pymilvus import MilvusClient
+    
+    # index params
+    sparse_vector_params = MilvusClient.prepare_index_params()
+    sparse_vector_params.add_index(
+        field_name="sparse_vector", 
+        metric_type="IP", 
+        index_type="SPARSE_INVERTED_INDEX", 
+        index_name="sparse_vector"
+    )
+    
+    dense_vector_params = MilvusClient.prepare_index_params()
+    dense_vector_params.add_index(
+        field_name="dense_vector",
+        metric_type="IP", 
+        index_type="FLAT", 
+        index_name="dense_vector"
+    )
     
     if not client.has_collection(collection_name=collection):
         try:
@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+
+class SQLiteStore:
+    """ 本地 SQLite 存储基类
+
+    首次使用时才打开数据库并执行 SCHEMA 建表；一个连接在多个线程间共享，
+    所有操作需持有 self._lock。多个进程可以共享同一个数据库文件（WAL 模式）。
+    """
+
+    SCHEMA: List[str] = []
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 数据库文件路径，":memory:" 表示仅保存在内存中
+        """
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """数据库连接（调用方需持有 self._lock）"""
+        if self._conn is None:
+            if self._path != ":memory:" and os.path.dirname(self._path):
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from app.handler import concept, resume
+from app.handler import admin, concept, resume
 
 
 api_v1_router = APIRouter()
 api_v1_router.include_router(concept.router, prefix="/concept")
 api_v1_router.include_router(resume.router, prefix="/resume")
+api_v1_router.include_router(admin.router, prefix="/admin")
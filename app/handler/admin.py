@@ -0,0 +1,106 @@
+import hmac
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header
+from fastapi.responses import PlainTextResponse
+
+from app.schema import GerneralResponse
+from app.service.profiler import ProfilerBusy, cpu_profiler, memory_tracer
+from config import config
+from loguru import logger
+
+router = APIRouter()
+
+# CPU 采集时长上限（秒）
+PROFILE_MAX_SECONDS = getattr(config, "profile_max_seconds", 60)
+
+
+def _check_admin(token: Optional[str]) -> Optional[GerneralResponse]:
+    """校验管理员 Token，未配置 admin_token 时管理接口不可用"""
+    admin_token = getattr(config, "admin_token", "")
+    if not admin_token or not token or not hmac.compare_digest(token, admin_token):
+        return GerneralResponse(code=403, message="无权访问")
+    return None
+
+
+@router.post("/profile/cpu")
+async def profile_cpu(
+    seconds: float = 10,
+    interval: float = 0.01,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    采集当前 worker 的 CPU 调用栈
+    
+    Args:
+        seconds: 采集时长（秒）
+        interval: 采样间隔（秒）
+    
+    Returns:
+        collapsed stack 文件（可用 flamegraph.pl 或 speedscope 生成火焰图）
+    """
+    if (error := _check_admin(x_admin_token)) is not None:
+        return error
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or not 0.001 <= interval <= 1:
+        return GerneralResponse(code=400, message=f"seconds 需在 (0, {PROFILE_MAX_SECONDS}] 内，interval 需在 [0.001, 1] 内")
+    
+    try:
+        collapsed = await asyncio.to_thread(cpu_profiler.sample, seconds, interval)
+    except ProfilerBusy as e:
+        return GerneralResponse(code=409, message=str(e))
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
+
+
+@router.post("/memory/start")
+async def memory_start(frames: int = 25, x_admin_token: Optional[str] = Header(None)) -> GerneralResponse:
+    """
+    开启 tracemalloc（开启期间所有内存分配都有额外开销，分析完成后应关闭）
+    
+    Args:
+        frames: 每次分配记录的调用栈层数
+    """
+    if (error := _check_admin(x_admin_token)) is not None:
+        return error
+    memory_tracer.start(max(1, min(frames, 100)))
+    return GerneralResponse(data={"tracing": True})
+
+
+@router.get("/memory/snapshot")
+async def memory_snapshot(
+    top: int = 20,
+    key_type: str = "lineno",
+    x_admin_token: Optional[str] = Header(None)
+) -> GerneralResponse:
+    """
+    内存快照：分配最多的位置，以及与上一次快照的差异
+    
+    Args:
+        top: 返回的分配位置数
+        key_type: 聚合方式（lineno、filename、traceback）
+    """
+    if (error := _check_admin(x_admin_token)) is not None:
+        return error
+    if key_type not in ("lineno", "filename", "traceback"):
+        return GerneralResponse(code=400, message="key_type 只支持 lineno、filename、traceback")
+    if not memory_tracer.tracing():
+        return GerneralResponse(code=400, message="tracemalloc 未开启，请先调用 /admin/memory/start")
+    
+    try:
+        data = await asyncio.to_thread(memory_tracer.snapshot, top, key_type)
+    except Exception as e:
+        logger.error(f"内存快照失败: {e}")
+        return GerneralResponse(code=500, message=str(e))
+    return GerneralResponse(data=data)
+
+
+@router.post("/memory/stop")
+async def memory_stop(x_admin_token: Optional[str] = Header(None)) -> GerneralResponse:
+    """关闭 tracemalloc，释放记录的分配信息"""
+    if (error := _check_admin(x_admin_token)) is not None:
+        return error
+    memory_tracer.stop()
+    return GerneralResponse(data={"tracing": False})
@@ -1,22 +1,48 @@
+import asyncio
+
 from fastapi import APIRouter             
 
 from app.schema import GerneralResponse
-from app.schema.concept import QueryReqSchema
-from app.repositry.milvus import embedding_and_query
-from app.service.concept import get_most_relevant_concept
+from app.schema.concept import QueryReqSchema, BatchQueryReqSchema
+from app.repositry.milvus import query_concept_stocks
+from app.service.concept import classify_news
+from config import config
 
 router = APIRouter()
 
 
 @router.post("/query")
 async def query_concept(item: QueryReqSchema):
-    """ 新闻搜相关概念
+    """ 新闻搜相关概念，with_stocks 为 True 时同时返回该概念下最相关的个股记录
     """
     response = GerneralResponse()
-    concepts = embedding_and_query(item.news, item.top_k)
-    if not concepts:
+    [result], _ = await asyncio.to_thread(classify_news, [item.news], item.top_k, 1)
+    if result["concept"] is None:
         return response
-    concept_name, score = get_most_relevant_concept(concepts)
-    data = {"distance": score, "concept": concept_name}
+    data = {"distance": result["distance"], "concept": result["concept"]}
+    if item.with_stocks:
+        data["stocks"] = await asyncio.to_thread(
+            query_concept_stocks, item.news, result["concept"], item.top_k
+        )
     response.data = data
     return response
+
+
+@router.post("/query-batch")
+async def query_concept_batch(item: BatchQueryReqSchema):
+    """ 批量新闻搜相关概念（分批向量化与检索，投票向量化计算）
+    """
+    response = GerneralResponse()
+    max_items = getattr(config, "concept_batch_max_items", 1000)
+    if len(item.news) > max_items:
+        response.code = 400
+        response.message = f"单次最多 {max_items} 条新闻"
+        return response
+    if not item.news:
+        response.data = {"results": [], "items_per_second": 0.0}
+        return response
+    results, throughput = await asyncio.to_thread(
+        classify_news, item.news, item.top_k, getattr(config, "concept_batch_size", 64)
+    )
+    response.data = {"results": results, "items_per_second": round(throughput, 2)}
+    return response
@@ -0,0 +1,44 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.service.metrics import registry
+from app.service.llm_cache import llm_response_cache
+from app.service.job_queue import job_queue
+from app.service.pdf_renderer import pdf_render_pool
+
+router = APIRouter()
+
+
+def _llm_cache_lookups():
+    stats = llm_response_cache.stats()
+    return [({"result": result}, stats[result]) for result in ("exact_hits", "semantic_hits", "misses")]
+
+
+def _llm_cache_hit_rate():
+    return [({}, llm_response_cache.stats()["hit_rate"])]
+
+
+def _job_queue_depth():
+    return [
+        ({"provider": provider, "status": status}, count)
+        for (provider, status), count in sorted(job_queue.store.count_unfinished().items())
+    ]
+
+
+def _pdf_render_pending():
+    return [({}, pdf_render_pool.pending)]
+
+
+registry.callback("genious_llm_cache_lookups_total", "LLM 回复缓存查询次数", ["result"], _llm_cache_lookups, type="counter")
+registry.callback("genious_llm_cache_hit_rate", "LLM 回复缓存命中率", [], _llm_cache_hit_rate)
+registry.callback("genious_job_queue_depth", "异步任务队列中排队与执行中的任务数", ["provider", "status"], _job_queue_depth)
+registry.callback("genious_pdf_render_pending", "等待或正在转换的 PDF 数", [], _pdf_render_pending)
+
+
+@router.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """ Prometheus 指标
+    """
+    return PlainTextResponse(await asyncio.to_thread(registry.render), media_type="text/plain; version=0.0.4; charset=utf-8")
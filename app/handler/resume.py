@@ -1,15 +1,74 @@
-from fastapi import APIRouter, UploadFile, File, Form
+from fastapi import APIRouter, UploadFile, File, Form, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool
+from starlette.datastructures import UploadFile as StarletteUploadFile
 from typing import Optional
+from itertools import chain
+from urllib.parse import quote
+import asyncio
+import json
 
 from app.schema import GerneralResponse
-from app.schema.resume import ResumeParseRequest, ResumeParseResponse
-from app.schema.generation import GenerateResumeRequest, GenerateResumeResponse
-from app.service.resume_parser import resume_parser
-from app.service.resume_generator import resume_generator
+from app.schema.resume import ResumeParseRequest, ResumeParseResponse, ResumeInfo
+from app.schema.generation import (
+    GenerateResumeRequest, GenerateResumeResponse, GenerateMultiResumeRequest,
+    RenderResumeRequest, ResumeDocument, RenderResultRequest, RegenerateResumeRequest
+)
+from app.service.resume_parser import get_resume_parser
+from app.service.resume_generator import get_resume_generator
+from app.service.batch_parser import (
+    get_batch_parser, iter_file_sources, iter_archive_sources, open_archive, ArchiveTooLarge
+)
+from app.service.llm_cache import llm_response_cache
+from app.service.llm_router import LLMRouter
+from app.service.job_queue import job_queue
+from app.service.generation_store import generation_store
+from app.service.resume_renderer import resume_renderer, TemplateNotExists
+from app.service.pdf_renderer import pdf_render_pool, PdfUnavailable
+from config import config
 from loguru import logger
 
 router = APIRouter()
 
+# 单个简历文件的大小上限（字节）
+MAX_UPLOAD_SIZE = getattr(config, "resume_max_upload_size", 10 * 1024 * 1024)
+# 批量解析的请求体大小上限（字节）与文件数上限
+BATCH_MAX_UPLOAD_SIZE = getattr(config, "resume_batch_max_upload_size", 512 * 1024 * 1024)
+BATCH_MAX_FILES = getattr(config, "resume_batch_max_files", 1000)
+# zip 压缩包解压后的总大小上限（字节）
+BATCH_MAX_ARCHIVE_SIZE = getattr(config, "resume_batch_max_archive_size", 1024 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def read_upload(file: UploadFile, max_size: int = MAX_UPLOAD_SIZE) -> bytes:
+    """
+    分块读取上传文件，超过大小上限时报错
+    
+    调用时 Starlette 已接收完整个 multipart 请求体，这里只是再次检查单个文件的大小；
+    在接收请求体时提前拒绝超限请求由 BodySizeLimitMiddleware 负责。
+    
+    Args:
+        file: 上传的文件
+        max_size: 最大字节数
+    
+    Returns:
+        文件内容
+    """
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLarge(f"文件大小超过限制 {max_size} 字节")
+    
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer.extend(chunk)
+        if len(buffer) > max_size:
+            raise UploadTooLarge(f"文件大小超过限制 {max_size} 字节")
+    return bytes(buffer)
+
 
 @router.post("/parse")
 async def parse_resume(
@@ -29,11 +88,12 @@ async def parse_resume(
     response = GerneralResponse()
     
     try:
-        # 读取文件内容
-        file_content = await file.read()
+        # 分块读取文件内容（带大小上限）
+        file_content = await read_upload(file)
         
-        # 解析简历
-        parse_response = resume_parser.parse(
+        # 解析简历（PDF 文本提取等为同步 CPU 操作，放到线程中执行，不阻塞事件循环）
+        parse_response = await asyncio.to_thread(
+            get_resume_parser().parse,
             file_content=file_content,
             file_type=file_type
         )
@@ -43,7 +103,15 @@ async def parse_resume(
             response.message = parse_response.error or "解析失败"
             return response
         
-        response.data = parse_response.resume_info.dict()
+        response.data = {
+            **parse_response.resume_info.dict(),
+            "cached": parse_response.cached
+        }
+        return response
+    
+    except UploadTooLarge as e:
+        response.code = 413
+        response.message = str(e)
         return response
     
     except Exception as e:
@@ -53,6 +121,62 @@ async def parse_resume(
         return response
 
 
+@router.post("/parse-batch")
+async def parse_resume_batch(request: Request):
+    """
+    批量解析简历，每个文件解析完成后立即返回一行 NDJSON
+    
+    表单字段（multipart/form-data）：
+        files: 多个简历文件，文件类型由扩展名判断
+        archive: zip 压缩包，逐个解压解析；与 files 合计的文件数不超过 resume_batch_max_files，
+                 解压后总大小不超过 resume_batch_max_archive_size
+    
+    Returns:
+        application/x-ndjson，每行为
+        {"filename": ..., "success": true, "cached": ..., "resume_info": {...}}
+        或 {"filename": ..., "success": false, "error": ...}
+    """
+    # 手动解析表单，使上传的临时文件在流式响应结束后才关闭
+    form = await request.form(max_files=BATCH_MAX_FILES)
+    files = [f for f in form.getlist("files") if isinstance(f, StarletteUploadFile)]
+    archive = form.get("archive")
+    
+    response = GerneralResponse()
+    sources = iter_file_sources(((f.filename, f.file) for f in files), MAX_UPLOAD_SIZE)
+    if isinstance(archive, StarletteUploadFile):
+        try:
+            # 解析开始前按 zip 中央目录检查文件数与解压后总大小
+            zip_archive = await asyncio.to_thread(
+                open_archive, archive.file, BATCH_MAX_FILES - len(files), BATCH_MAX_ARCHIVE_SIZE
+            )
+        except ValueError as e:
+            await form.close()
+            response.code = 413 if isinstance(e, ArchiveTooLarge) else 400
+            response.message = str(e)
+            return response
+        sources = chain(sources, iter_archive_sources(zip_archive, MAX_UPLOAD_SIZE))
+    elif not files:
+        await form.close()
+        response.code = 400
+        response.message = "必须提供 files 或 archive"
+        return response
+    
+    async def stream():
+        lines = get_batch_parser().iter_ndjson(sources)
+        try:
+            async for line in iterate_in_threadpool(lines):
+                yield line
+        finally:
+            # 客户端断开时等待线程池中正在读取上传文件的任务结束，再由 form.close 关闭文件
+            await asyncio.to_thread(lines.close)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(form.close)
+    )
+
+
 @router.post("/generate")
 async def generate_resume(
     request: GenerateResumeRequest
@@ -70,7 +194,7 @@ async def generate_resume(
     
     try:
         # 生成简历
-        generate_response = resume_generator.generate_resume(request)
+        generate_response = await get_resume_generator().generate_resume(request)
         
         if not generate_response.success:
             response.code = 400
@@ -82,7 +206,8 @@ async def generate_resume(
             "resume_pdf_path": generate_response.resume_pdf_path,
             "new_projects": [
                 project.dict() for project in generate_response.new_projects or []
-            ]
+            ],
+            "result_id": generate_response.result_id
         }
         return response
     
@@ -93,11 +218,251 @@ async def generate_resume(
         return response
 
 
+@router.post("/generate-multi")
+async def generate_resume_multi(request: GenerateMultiResumeRequest) -> GerneralResponse:
+    """
+    同一份简历针对多个目标岗位生成多个版本（共享检索，并发生成）
+    
+    Args:
+        request: 多目标生成请求
+    
+    Returns:
+        {"results": [...]}，与 targets 一一对应，每项包含 success、error 及 /generate 的返回字段
+    """
+    response = GerneralResponse()
+    if not request.targets:
+        response.code = 400
+        response.message = "targets 不能为空"
+        return response
+    max_targets = getattr(config, "multi_target_max", 10)
+    if len(request.targets) > max_targets:
+        response.code = 400
+        response.message = f"目标数量不能超过 {max_targets}"
+        return response
+    
+    try:
+        responses = await get_resume_generator().generate_resumes(request)
+        response.data = {
+            "results": [
+                {
+                    **target.dict(),
+                    "success": generate_response.success,
+                    "error": generate_response.error,
+                    "resume_content": generate_response.resume_content,
+                    "new_projects": [
+                        project.dict() for project in generate_response.new_projects or []
+                    ],
+                    "result_id": generate_response.result_id
+                }
+                for target, generate_response in zip(request.targets, responses)
+            ]
+        }
+        return response
+    
+    except Exception as e:
+        logger.error(f"多目标生成简历失败: {e}")
+        response.code = 500
+        response.message = str(e)
+        return response
+
+
+def _sse(event: str, data: dict) -> str:
+    """编码一条 SSE 事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/generate-stream")
+async def generate_resume_stream(
+    request: GenerateResumeRequest
+) -> StreamingResponse:
+    """
+    流式生成新简历（SSE）
+    
+    Args:
+        request: 简历生成请求
+    
+    Returns:
+        text/event-stream，事件依次为 retrieval、project（每个项目一条）、
+        resume（Markdown 增量）、done；出错时返回 error
+    """
+    async def event_stream():
+        try:
+            async for event, data in get_resume_generator().stream_resume(request):
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"流式生成简历失败: {e}")
+            yield _sse("error", {"message": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# 渲染输出格式 -> (Content-Type, 文件后缀)
+RENDER_MEDIA_TYPES = {
+    "markdown": ("text/markdown; charset=utf-8", "md"),
+    "html": ("text/html; charset=utf-8", "html"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+
+@router.get("/templates")
+async def list_templates() -> GerneralResponse:
+    """可用的简历模板ID"""
+    response = GerneralResponse()
+    response.data = resume_renderer.templates()
+    return response
+
+
+async def _render_response(
+    old_resume: ResumeInfo,
+    document: ResumeDocument,
+    template_id: Optional[str],
+    fmt: str
+):
+    """按模板渲染简历，返回流式响应；出错时返回 GerneralResponse"""
+    response = GerneralResponse()
+    if fmt not in RENDER_MEDIA_TYPES:
+        response.code = 400
+        response.message = f"不支持的格式: {fmt}"
+        return response
+    
+    try:
+        if fmt == "pdf":
+            html = resume_renderer.render(old_resume, document, template_id, fmt="html")
+            content = await pdf_render_pool.render(html)
+        else:
+            content = resume_renderer.render(old_resume, document, template_id, fmt=fmt).encode("utf-8")
+    
+    except TemplateNotExists as e:
+        response.code = 404
+        response.message = str(e)
+        return response
+    
+    except PdfUnavailable as e:
+        response.code = 501
+        response.message = str(e)
+        return response
+    
+    except Exception as e:
+        logger.error(f"渲染简历失败: {e}")
+        response.code = 500
+        response.message = str(e)
+        return response
+    
+    media_type, suffix = RENDER_MEDIA_TYPES[fmt]
+    filename = quote(f"{old_resume.name or 'resume'}.{suffix}")
+    return StreamingResponse(
+        (content[i:i + UPLOAD_CHUNK_SIZE] for i in range(0, len(content), UPLOAD_CHUNK_SIZE)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{filename}",
+            "Content-Length": str(len(content))
+        }
+    )
+
+
+@router.post("/render")
+async def render_resume(request: RenderResumeRequest):
+    """
+    按模板在本地渲染简历（不调用 LLM），结果在内存中生成并以流式响应返回
+    
+    Args:
+        request: 渲染请求，format 为 markdown、html 或 pdf
+    
+    Returns:
+        渲染后的文件内容
+    """
+    document = request.document or ResumeDocument(
+        tech_stack=request.old_resume.tech_stack,
+        projects=request.old_resume.projects
+    )
+    return await _render_response(request.old_resume, document, request.template_id, request.format)
+
+
+@router.get("/results/{result_id}")
+async def get_generation_result(result_id: str) -> GerneralResponse:
+    """
+    查询已保存的生成结果
+    
+    Args:
+        result_id: 生成结果ID（/generate 返回）
+    
+    Returns:
+        {"id", "request", "result", "created_at"}
+    """
+    response = GerneralResponse()
+    stored = await asyncio.to_thread(generation_store.get_result, result_id)
+    if stored is None:
+        response.code = 404
+        response.message = "生成结果不存在或已过期"
+        return response
+    
+    response.data = stored
+    return response
+
+
+@router.post("/results/{result_id}/render")
+async def render_generation_result(result_id: str, request: RenderResultRequest):
+    """
+    用另一个模板重新渲染已保存的生成结果（不重新生成内容）
+    
+    Args:
+        result_id: 生成结果ID
+        request: 模板ID与输出格式
+    
+    Returns:
+        渲染后的文件内容
+    """
+    stored = await asyncio.to_thread(generation_store.get_result, result_id)
+    if stored is None:
+        response = GerneralResponse()
+        response.code = 404
+        response.message = "生成结果不存在或已过期"
+        return response
+    
+    old_resume = ResumeInfo(**stored["request"]["old_resume"])
+    result = stored["result"]
+    # 两次调用模式没有结构化简历，按原简历与新项目经验渲染
+    document = ResumeDocument(**result["document"]) if result.get("document") else ResumeDocument(
+        tech_stack=old_resume.tech_stack,
+        projects=result["new_projects"]
+    )
+    return await _render_response(old_resume, document, request.template_id, request.format)
+
+
+@router.post("/results/{result_id}/regenerate")
+async def regenerate_resume(result_id: str, request: RegenerateResumeRequest) -> GerneralResponse:
+    """
+    修改部分参数后重新生成，只重新执行输入发生变化的阶段
+    （如只改姓名时复用检索与项目经验，只换模板时不调用 LLM）
+    
+    Args:
+        result_id: 原生成结果ID
+        request: 需要修改的参数，未提供的字段沿用原请求
+    
+    Returns:
+        与 /generate 相同，result_id 为新结果的ID
+    """
+    response = GerneralResponse()
+    stored = await asyncio.to_thread(generation_store.get_result, result_id)
+    if stored is None:
+        response.code = 404
+        response.message = "生成结果不存在或已过期"
+        return response
+    
+    generate_request = GenerateResumeRequest(**{**stored["request"], **request.dict(exclude_unset=True)})
+    return await generate_resume(generate_request)
+
+
 @router.post("/generate-projects")
 async def generate_projects(
     job_requirements: list,
     open_source_projects: list,
-    existing_projects: Optional[list] = None
+    existing_projects: Optional[list] = None,
+    use_cache: bool = True
 ) -> GerneralResponse:
     """
     仅生成项目经验（不生成完整简历）
@@ -106,6 +471,7 @@ async def generate_projects(
         job_requirements: 招聘要求列表
         open_source_projects: 开源项目列表
         existing_projects: 现有项目列表（可选）
+        use_cache: 是否使用 LLM 回复缓存
     
     Returns:
         生成的项目经验列表
@@ -127,10 +493,11 @@ async def generate_projects(
         project_request = GenerateProjectRequest(
             job_requirements=job_requirements,
             open_source_projects=open_source_projects,
-            existing_projects=existing
+            existing_projects=existing,
+            use_cache=use_cache
         )
         
-        project_response = resume_generator.generate_project_experience(project_request)
+        project_response = await get_resume_generator().generate_project_experience(project_request)
         
         if not project_response.success:
             response.code = 400
@@ -150,3 +517,107 @@ async def generate_projects(
         response.message = str(e)
         return response
 
+
+
+@router.get("/llm-cache/stats")
+async def llm_cache_stats() -> GerneralResponse:
+    """LLM 回复缓存命中率"""
+    response = GerneralResponse()
+    response.data = llm_response_cache.stats()
+    return response
+
+
+@router.get("/llm-router/stats")
+async def llm_router_stats() -> GerneralResponse:
+    """LLM 服务地址的延迟、错误率与熔断状态"""
+    response = GerneralResponse()
+    llm_client = get_resume_generator().llm_client
+    response.data = llm_client.stats() if isinstance(llm_client, LLMRouter) else []
+    return response
+
+
+def _job_view(job: dict) -> dict:
+    """任务信息（不含请求参数）"""
+    return {key: job[key] for key in ("id", "kind", "status", "result", "error", "created_at", "updated_at")}
+
+
+@router.post("/jobs")
+async def submit_generate_job(
+    request: GenerateResumeRequest
+) -> GerneralResponse:
+    """
+    提交异步简历生成任务，立即返回任务 ID
+    
+    Args:
+        request: 简历生成请求
+    
+    Returns:
+        {"job_id": ..., "status": "pending"}，结果通过 /jobs/{job_id} 轮询
+        或 /jobs/{job_id}/events 订阅
+    """
+    response = GerneralResponse()
+    
+    try:
+        job = await job_queue.submit(
+            "generate_resume",
+            provider=get_resume_generator().llm_client.name,
+            request=request.dict()
+        )
+        response.data = {"job_id": job["id"], "status": job["status"]}
+        return response
+    
+    except Exception as e:
+        logger.error(f"提交生成任务失败: {e}")
+        response.code = 500
+        response.message = str(e)
+        return response
+
+
+@router.get("/jobs/{job_id}")
+async def get_generate_job(job_id: str) -> GerneralResponse:
+    """
+    查询任务状态与结果
+    
+    Args:
+        job_id: 任务 ID
+    
+    Returns:
+        任务信息，status 为 pending、running、succeeded 或 failed
+    """
+    response = GerneralResponse()
+    job = await job_queue.get(job_id)
+    if job is None:
+        response.code = 404
+        response.message = "任务不存在"
+        return response
+    
+    response.data = _job_view(job)
+    return response
+
+
+@router.get("/jobs/{job_id}/events")
+async def watch_generate_job(job_id: str):
+    """
+    订阅任务状态（SSE）
+    
+    Args:
+        job_id: 任务 ID
+    
+    Returns:
+        text/event-stream，每次状态变化发送一条 status 事件，任务完成后结束
+    """
+    if await job_queue.get(job_id) is None:
+        response = GerneralResponse()
+        response.code = 404
+        response.message = "任务不存在"
+        return response
+    
+    async def event_stream():
+        async for job in job_queue.watch(job_id):
+            yield _sse("status", _job_view(job))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
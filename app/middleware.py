@@ -0,0 +1,119 @@
+import time
+from typing import Dict
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.schema import GerneralResponse
+from app.service.metrics import RequestTimings, registry, request_timings
+
+
+# multipart 边界、字段头等额外开销
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class BodySizeLimitMiddleware:
+    """ 请求体大小限制中间件
+
+    在路由解析表单之前按路径限制请求体大小：
+    Content-Length 超限时直接拒绝，不接收请求体；
+    没有 Content-Length（chunked）时边接收边计数，超限立即中止。
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Args:
+            app: 下游 ASGI 应用
+            limits: {请求路径: 最大字节数}
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise BodyTooLarge()
+            return message
+
+        async def tracked_send(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except BodyTooLarge:
+            if not response_started:
+                await self._reject(scope, receive, send, limit)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, limit: int):
+        response = GerneralResponse(code=413, message=f"请求体超过大小限制 {limit} 字节")
+        await JSONResponse(response.dict(), status_code=413)(scope, receive, send)
+
+
+request_seconds = registry.histogram(
+    "genious_http_request_duration_seconds", "HTTP 请求耗时（到响应结束）", ["method", "route", "status"]
+)
+
+
+class ServerTimingMiddleware:
+    """ 请求耗时指标与 Server-Timing 响应头
+
+    请求开始时创建当前请求的阶段耗时记录，各阶段（embed、milvus、http、llm 等）通过 metrics.timed 计入；
+    发送响应头时写入 Server-Timing（流式响应只包含响应头发出前完成的阶段）。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status = 500
+
+        async def timed_send(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.header())
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            request_timings.reset(token)
+            # 使用路由模板（如 /api/v1/resume/jobs/{job_id}），避免标签取值无限增长
+            route = getattr(scope.get("route"), "path_format", None) or "unmatched"
+            request_seconds.observe(
+                time.perf_counter() - start, method=scope["method"], route=route, status=str(status)
+            )
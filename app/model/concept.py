@@ -19,6 +19,18 @@ ConceptSchema = CollectionSchema(
 )
 
 
+# 概念中心向量 Schema：每个概念一个或少数几个中心向量，用于新闻分类
+ConceptCentroidSchema = CollectionSchema(
+    [
+        FieldSchema(name="pk", dtype=DataType.INT64, is_primary=True, auto_id=True),
+        FieldSchema(name="concept", dtype=DataType.VARCHAR, max_length=128),
+        FieldSchema(name="sparse_vector", dtype=DataType.SPARSE_FLOAT_VECTOR),
+        FieldSchema(name="dense_vector", dtype=DataType.FLOAT_VECTOR, dim=BGE_M3_DENSE_DIM),
+    ],
+    description="概念中心向量"
+)
+
+
 # 招聘要求 Schema
 JobRequirementSchema = CollectionSchema(
     [
@@ -1,7 +1,10 @@
-from pymilvus import RRFRanker, AnnSearchRequest
-
 from app.db.milvus import prepare_milvus_oper
 from app.cache_pool import get_bge_m3_ef
+from config import config
+
+
+CONCEPT_CENTROID_COLLECTION = getattr(config, "concept_centroid_collection", "concept_centroids")
+# pymilvus 在检索函数内导入：导入 app 时不加载 pymilvus（及其依赖的 pandas、grpc）
 
 
 @prepare_milvus_oper
@@ -20,8 +23,24 @@ def embedding_and_insert(collection, docs: list, concepts: list, stock_codes: li
     return res
 
 
+@prepare_milvus_oper
+def insert_concepts(collection, docs: list, concepts: list, stock_codes: list, sparse_vectors, dense_vectors):
+    """
+    插入已向量化的 概念 × 个股 记录
+    """
+    entities = [
+        docs,
+        concepts,
+        stock_codes,
+        sparse_vectors,
+        list(dense_vectors),
+    ]
+    return collection.insert(entities)
+
+
 @prepare_milvus_oper
 def embedding_and_query(collection, query: str, top_k: int):
+    from pymilvus import RRFRanker, AnnSearchRequest
     bge_m3_ef = get_bge_m3_ef()
     search_params = {"metric_type": "IP"}
     bge_m3_ef = get_bge_m3_ef()
@@ -56,6 +75,151 @@ def embedding_and_query(collection, query: str, top_k: int):
     return rst
 
 
+@prepare_milvus_oper
+def embedding_and_query_batch(collection, queries: list, top_k: int, batch_size: int = 64):
+    """
+    批量新闻搜概念
+    queries: 新闻文本列表
+    top_k: 每条新闻的返回数量
+    batch_size: 每批向量化与检索的条数（一批为一次多向量 hybrid_search）
+    
+    返回与 queries 一一对应的命中列表
+    """
+    from pymilvus import RRFRanker, AnnSearchRequest
+    bge_m3_ef = get_bge_m3_ef()
+    search_params = {"metric_type": "IP"}
+    rst = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start: start + batch_size]
+        query_embeddings = bge_m3_ef.encode_documents(batch)
+        sparse_req = AnnSearchRequest(
+            query_embeddings["sparse"],
+            "sparse_vector",
+            search_params,
+            limit=top_k
+        )
+        dense_req = AnnSearchRequest(
+            query_embeddings["dense"],
+            "dense_vector",
+            search_params,
+            limit=top_k
+        )
+        res = collection.hybrid_search(
+            [sparse_req, dense_req],
+            rerank=RRFRanker(),
+            limit=top_k,
+            output_fields=["concept", "stock_code"]
+        )
+        rst.extend(
+            [
+                {
+                    "distance": hit.distance,
+                    "concept": hit.fields["concept"],
+                    "stock_code": hit.fields["stock_code"],
+                }
+                for hit in hits
+            ]
+            for hits in res
+        )
+    return rst
+
+
+@prepare_milvus_oper(collection_name=CONCEPT_CENTROID_COLLECTION)
+def replace_concept_centroids(collection, concepts: list, sparse_vectors, dense_vectors, batch_size: int = 500):
+    """
+    替换全部概念中心向量
+    concepts: 每个中心向量所属的概念
+    sparse_vectors: 稀疏向量矩阵（scipy sparse，每行一个）
+    dense_vectors: 稠密向量矩阵
+    """
+    collection.delete("pk>=0")
+    for start in range(0, len(concepts), batch_size):
+        end = start + batch_size
+        collection.insert([
+            concepts[start: end],
+            sparse_vectors[start: end],
+            list(dense_vectors[start: end]),
+        ])
+    collection.flush()
+
+
+@prepare_milvus_oper(collection_name=CONCEPT_CENTROID_COLLECTION)
+def count_concept_centroids(collection) -> int:
+    """
+    概念中心向量数，尚未构建时为 0
+    """
+    return collection.num_entities
+
+
+@prepare_milvus_oper(collection_name=CONCEPT_CENTROID_COLLECTION)
+def query_concept_centroids(collection, queries: list, top_k: int = 5, batch_size: int = 64):
+    """
+    新闻在概念中心向量中检索（每个概念只有少数几个向量，一次检索即可得到分类）
+    queries: 新闻文本列表
+    top_k: 每条新闻返回的中心向量数（同一概念可能有多个）
+    batch_size: 每批向量化与检索的条数
+    
+    返回与 queries 一一对应的命中列表，按相关度排序
+    """
+    from pymilvus import RRFRanker, AnnSearchRequest
+    bge_m3_ef = get_bge_m3_ef()
+    search_params = {"metric_type": "IP"}
+    rst = []
+    for start in range(0, len(queries), batch_size):
+        query_embeddings = bge_m3_ef.encode_documents(queries[start: start + batch_size])
+        sparse_req = AnnSearchRequest(
+            query_embeddings["sparse"],
+            "sparse_vector",
+            search_params,
+            limit=top_k
+        )
+        dense_req = AnnSearchRequest(
+            query_embeddings["dense"],
+            "dense_vector",
+            search_params,
+            limit=top_k
+        )
+        res = collection.hybrid_search(
+            [sparse_req, dense_req],
+            rerank=RRFRanker(),
+            limit=top_k,
+            output_fields=["concept"]
+        )
+        rst.extend(
+            [{"distance": hit.distance, "concept": hit.fields["concept"]} for hit in hits]
+            for hits in res
+        )
+    return rst
+
+
+@prepare_milvus_oper
+def query_concept_stocks(collection, query: str, concept: str, top_k: int = 5):
+    """
+    在指定概念的个股记录中检索（分类后按需获取相关个股）
+    """
+    bge_m3_ef = get_bge_m3_ef()
+    search_params = {"metric_type": "IP"}
+    query_embeddings = bge_m3_ef.encode_documents([query])
+    concept = concept.replace("\\", "\\\\").replace('"', '\\"')
+    res = collection.search(
+        query_embeddings["dense"],
+        "dense_vector",
+        search_params,
+        limit=top_k,
+        expr=f'concept == "{concept}"',
+        output_fields=["content", "concept", "stock_code"]
+    )[0]
+    return [
+        {
+            "distance": hit.distance,
+            "content": hit.fields["content"],
+            "concept": hit.fields["concept"],
+            "stock_code": hit.fields["stock_code"],
+        }
+        for hit in res
+    ]
+
+
 @prepare_milvus_oper
 def delete_with_condition(collection, expr: str):
     collection.delete(expr)
@@ -98,6 +262,34 @@ def insert_job_requirements(collection, job_requirements: list):
     return res
 
 
+JOB_REQUIREMENT_FIELDS = [
+    "city", "salary", "seniority", "company_name",
+    "company_industry", "company_info", "job_title", "job_detail"
+]
+
+
+def _job_requirement_expr(city: str = None, salary: str = None,
+                          industry: str = None, expr: str = None):
+    """构建招聘要求的过滤表达式"""
+    filter_exprs = []
+    if city:
+        filter_exprs.append(f'city == "{city}"')
+    if salary:
+        filter_exprs.append(f'salary == "{salary}"')
+    if industry:
+        filter_exprs.append(f'company_industry == "{industry}"')
+    if expr:
+        filter_exprs.append(expr)
+    return " && ".join(filter_exprs) if filter_exprs else None
+
+
+def _job_requirement_hit(hit) -> dict:
+    return {
+        "distance": hit.distance,
+        **{field: hit.fields.get(field, "") for field in JOB_REQUIREMENT_FIELDS},
+    }
+
+
 @prepare_milvus_oper(collection_name=None)  # 将在装饰器内部从 config 获取 job_requirement_collection
 def query_job_requirements(collection, query: str, top_k: int = 10, 
                            city: str = None, salary: str = None, 
@@ -109,60 +301,94 @@ def query_job_requirements(collection, query: str, top_k: int = 10,
     city, salary, industry: 过滤条件
     expr: 自定义过滤表达式
     """
+    from pymilvus import RRFRanker, AnnSearchRequest
     search_params = {"metric_type": "IP"}
     bge_m3_ef = get_bge_m3_ef()
     query_embeddings = bge_m3_ef.encode_documents([query])
+    # hybrid_search 不接受过滤表达式，需设置在每一路召回上
+    filter_expr = _job_requirement_expr(city, salary, industry, expr)
     
     sparse_req = AnnSearchRequest(
         query_embeddings["sparse"],
         "sparse_vector",
         search_params,
-        limit=top_k
+        limit=top_k,
+        expr=filter_expr
     )
     dense_req = AnnSearchRequest(
         query_embeddings["dense"],
         "dense_vector",
         search_params,
-        limit=top_k
+        limit=top_k,
+        expr=filter_expr
     )
     
-    # 构建过滤表达式
-    filter_exprs = []
-    if city:
-        filter_exprs.append(f'city == "{city}"')
-    if salary:
-        filter_exprs.append(f'salary == "{salary}"')
-    if industry:
-        filter_exprs.append(f'company_industry == "{industry}"')
-    if expr:
-        filter_exprs.append(expr)
-    
-    filter_expr = " && ".join(filter_exprs) if filter_exprs else None
-    
     res = collection.hybrid_search(
         [sparse_req, dense_req],
         rerank=RRFRanker(),
         limit=top_k,
-        expr=filter_expr,
-        output_fields=["city", "salary", "seniority", "company_name", 
-                      "company_industry", "company_info", "job_title", "job_detail"]
+        output_fields=JOB_REQUIREMENT_FIELDS
     )[0]
     
-    rst = [
-        {
-            "distance": hit.distance,
-            "city": hit.fields.get("city", ""),
-            "salary": hit.fields.get("salary", ""),
-            "seniority": hit.fields.get("seniority", ""),
-            "company_name": hit.fields.get("company_name", ""),
-            "company_industry": hit.fields.get("company_industry", ""),
-            "company_info": hit.fields.get("company_info", ""),
-            "job_title": hit.fields.get("job_title", ""),
-            "job_detail": hit.fields.get("job_detail", ""),
-        }
-        for hit in res
-    ]
-    return rst
-
+    return [_job_requirement_hit(hit) for hit in res]
 
 
+@prepare_milvus_oper(collection_name=None)  # 将在装饰器内部从 config 获取 job_requirement_collection
+def query_job_requirements_batch(collection, queries: list, top_k: int = 10):
+    """
+    批量查询招聘要求
+    queries: list of dict，包含 query 及可选的 city, salary, industry 过滤条件
+    top_k: 每个查询的返回数量
+    
+    相同的查询文本只向量化一次（所有文本一次编码），
+    过滤条件相同的查询合并为一次多向量 hybrid_search。
+    返回与 queries 一一对应的结果列表
+    """
+    from pymilvus import RRFRanker, AnnSearchRequest
+    if not queries:
+        return []
+    
+    texts = list(dict.fromkeys(q["query"] for q in queries))
+    text_index = {text: i for i, text in enumerate(texts)}
+    bge_m3_ef = get_bge_m3_ef()
+    query_embeddings = bge_m3_ef.encode_documents(texts)
+    
+    # 过滤表达式 -> 该组内去重后的查询文本
+    groups = {}
+    for q in queries:
+        filter_expr = _job_requirement_expr(q.get("city"), q.get("salary"), q.get("industry"))
+        group = groups.setdefault(filter_expr, [])
+        if q["query"] not in group:
+            group.append(q["query"])
+    
+    search_params = {"metric_type": "IP"}
+    results = {}
+    for filter_expr, group in groups.items():
+        rows = [text_index[text] for text in group]
+        sparse_req = AnnSearchRequest(
+            query_embeddings["sparse"][rows],
+            "sparse_vector",
+            search_params,
+            limit=top_k,
+            expr=filter_expr
+        )
+        dense_req = AnnSearchRequest(
+            [query_embeddings["dense"][row] for row in rows],
+            "dense_vector",
+            search_params,
+            limit=top_k,
+            expr=filter_expr
+        )
+        res = collection.hybrid_search(
+            [sparse_req, dense_req],
+            rerank=RRFRanker(),
+            limit=top_k,
+            output_fields=JOB_REQUIREMENT_FIELDS
+        )
+        for text, hits in zip(group, res):
+            results[(filter_expr, text)] = [_job_requirement_hit(hit) for hit in hits]
+    
+    return [
+        results[(_job_requirement_expr(q.get("city"), q.get("salary"), q.get("industry")), q["query"])]
+        for q in queries
+    ]
@@ -1,6 +1,14 @@
+from typing import List
+
 from pydantic import BaseModel
 
 
 class QueryReqSchema(BaseModel):
     news: str
     top_k: int = 5
+    with_stocks: bool = False
+
+
+class BatchQueryReqSchema(BaseModel):
+    news: List[str]
+    top_k: int = 5
@@ -11,6 +11,26 @@ class GenerateResumeRequest(BaseModel):
     target_salary: Optional[str] = None  # 期望薪资
     target_industry: Optional[str] = None  # 目标行业
     template_id: Optional[str] = None  # 简历模板ID
+    use_cache: bool = True  # 是否使用 LLM 回复缓存
+    mode: Optional[str] = None  # 生成模式：two_pass（项目、简历两次调用）或 single（单次结构化调用），默认取配置
+
+
+class ResumeTarget(BaseModel):
+    """多目标生成中的单个目标"""
+    target_job_title: str  # 目标岗位
+    target_city: str  # 期望城市
+    target_salary: Optional[str] = None  # 期望薪资
+    target_industry: Optional[str] = None  # 目标行业
+    template_id: Optional[str] = None  # 简历模板ID，为空时使用请求的 template_id
+
+
+class GenerateMultiResumeRequest(BaseModel):
+    """同一份简历针对多个目标岗位生成多个版本"""
+    old_resume: ResumeInfo  # 旧简历信息
+    targets: List[ResumeTarget]  # 目标列表
+    template_id: Optional[str] = None  # 默认简历模板ID
+    use_cache: bool = True  # 是否使用 LLM 回复缓存
+    mode: Optional[str] = None  # 生成模式，同 GenerateResumeRequest
 
 
 class GenerateProjectRequest(BaseModel):
@@ -18,14 +38,26 @@ class GenerateProjectRequest(BaseModel):
     job_requirements: List[dict]  # 招聘要求列表
     open_source_projects: List[dict]  # 开源项目列表
     existing_projects: Optional[List[ProjectDetail]] = None  # 现有项目（可选）
+    target: Optional[str] = None  # 目标岗位与技术栈（用于压缩提示词）
+    use_cache: bool = True  # 是否使用 LLM 回复缓存
+
+
+class ResumeDocument(BaseModel):
+    """结构化简历（单次调用模式下 LLM 的输出），Markdown 在本地按模板渲染"""
+    summary: str = ""  # 个人简介
+    tech_stack: List[str] = []  # 技术栈
+    projects: List[ProjectDetail]  # 项目经验
+    work_experience: Optional[str] = None  # 工作经历
+    education: Optional[str] = None  # 教育经历
 
 
 class GenerateResumeResponse(BaseModel):
     """简历生成响应"""
     success: bool
     resume_content: Optional[str] = None  # 生成的简历内容（Markdown 或 HTML）
-    resume_pdf_path: Optional[str] = None  # 生成的 PDF 文件路径
+    resume_pdf_path: Optional[str] = None  # 已废弃：PDF 通过 /resume/render 在内存中生成
     new_projects: Optional[List[ProjectDetail]] = None  # 新生成的项目经验
+    result_id: Optional[str] = None  # 保存的生成结果ID，可用于换模板渲染或部分重新生成
     error: Optional[str] = None
 
 
@@ -35,3 +67,28 @@ class ProjectGenerationResponse(BaseModel):
     projects: List[ProjectDetail]
     error: Optional[str] = None
 
+
+class RenderResumeRequest(BaseModel):
+    """简历渲染请求（本地模板渲染，不调用 LLM）"""
+    old_resume: ResumeInfo  # 原简历信息（姓名、年龄等个人信息取自这里）
+    document: Optional[ResumeDocument] = None  # 生成的结构化简历，为空时按原简历渲染
+    template_id: Optional[str] = None  # 简历模板ID
+    format: str = "pdf"  # 输出格式：markdown、html、pdf
+
+
+class RenderResultRequest(BaseModel):
+    """按已保存的生成结果重新渲染"""
+    template_id: Optional[str] = None  # 简历模板ID
+    format: str = "pdf"  # 输出格式：markdown、html、pdf
+
+
+class RegenerateResumeRequest(BaseModel):
+    """基于已保存的生成结果修改部分参数后重新生成，未提供的字段沿用原请求"""
+    old_resume: Optional[ResumeInfo] = None
+    target_job_title: Optional[str] = None
+    target_city: Optional[str] = None
+    target_salary: Optional[str] = None
+    target_industry: Optional[str] = None
+    template_id: Optional[str] = None
+    use_cache: Optional[bool] = None
+    mode: Optional[str] = None
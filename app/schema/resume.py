@@ -34,5 +34,6 @@ class ResumeParseResponse(BaseModel):
     """简历解析响应"""
     success: bool
     resume_info: Optional[ResumeInfo] = None
+    cached: bool = False  # 是否命中解析缓存
     error: Optional[str] = None
 
@@ -0,0 +1,188 @@
+import json
+import zipfile
+import threading
+from pathlib import PurePath
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from app.service.resume_parser import ResumeParser, get_resume_parser
+from config import config
+
+
+# (文件名, 读取文件内容的函数)；内容在提交到线程池时才读取
+ParseSource = Tuple[str, Callable[[], bytes]]
+
+SUPPORTED_FILE_TYPES = {"pdf", "docx", "txt", "md"}
+
+
+def guess_file_type(filename: str) -> Optional[str]:
+    """根据扩展名判断简历文件类型"""
+    suffix = PurePath(filename).suffix.lower().lstrip(".")
+    return suffix if suffix in SUPPORTED_FILE_TYPES else None
+
+
+def _read_limited(fileobj: BinaryIO, max_size: int) -> bytes:
+    content = fileobj.read(max_size + 1)
+    if len(content) > max_size:
+        raise ValueError(f"文件大小超过限制 {max_size} 字节")
+    return content
+
+
+def iter_file_sources(files: Iterable[Tuple[str, BinaryIO]], max_size: int) -> Iterator[ParseSource]:
+    """
+    将上传的文件列表转换为解析任务
+
+    Args:
+        files: (文件名, 二进制文件对象) 列表
+        max_size: 单个文件的大小上限
+    """
+    for filename, fileobj in files:
+        yield filename, lambda fileobj=fileobj: _read_limited(fileobj, max_size)
+
+
+class ArchiveTooLarge(ValueError):
+    pass
+
+
+def _archive_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    # 跳过目录和 macOS 打包时附带的资源文件
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+    ]
+
+
+def open_archive(fileobj: BinaryIO, max_files: int, max_total_size: int) -> zipfile.ZipFile:
+    """
+    打开 zip 压缩包，按中央目录记录的文件数与解压后总大小检查上限（不解压）
+
+    Args:
+        fileobj: zip 文件对象（需要可 seek）
+        max_files: 文件数上限
+        max_total_size: 解压后的总大小上限
+
+    Raises:
+        ValueError: 不是有效的 zip 压缩包
+        ArchiveTooLarge: 文件数或解压后的总大小超过上限
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"无效的 zip 压缩包: {e}")
+
+    members = _archive_members(archive)
+    if len(members) > max_files:
+        raise ArchiveTooLarge(f"压缩包文件数 {len(members)} 超过限制 {max_files}")
+    total_size = sum(info.file_size for info in members)
+    if total_size > max_total_size:
+        raise ArchiveTooLarge(f"压缩包解压后大小 {total_size} 字节超过限制 {max_total_size} 字节")
+    return archive
+
+
+def iter_archive_sources(archive: zipfile.ZipFile, max_size: int) -> Iterator[ParseSource]:
+    """
+    将 zip 压缩包中的文件逐个转换为解析任务，不一次性解压
+
+    Args:
+        archive: open_archive 打开并检查过的压缩包
+        max_size: 单个文件解压后的大小上限
+    """
+    lock = threading.Lock()
+
+    def read_member(info: zipfile.ZipInfo) -> bytes:
+        if info.file_size > max_size:
+            raise ValueError(f"文件大小超过限制 {max_size} 字节")
+        with lock, archive.open(info) as member:
+            return _read_limited(member, max_size)
+
+    for info in _archive_members(archive):
+        yield info.filename, lambda info=info: read_member(info)
+
+
+class BatchParser:
+    """批量简历解析器，在线程池中并行解析，按完成顺序返回结果"""
+
+    def __init__(self, parser: ResumeParser, max_workers: int = 4):
+        self.parser = parser
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-parse")
+
+    def iter_parse(self, sources: Iterable[ParseSource]) -> Iterator[dict]:
+        """
+        并行解析，最多同时持有 2 * max_workers 个文件的内容
+
+        提前关闭时（客户端断开）取消未开始的任务并等待正在执行的任务结束，
+        之后调用方才能关闭上传的文件
+
+        Args:
+            sources: 解析任务
+
+        Returns:
+            每个文件的解析结果（按完成顺序）
+        """
+        max_in_flight = self.max_workers * 2
+        in_flight = set()
+        try:
+            for filename, read in sources:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                in_flight.add(self.executor.submit(self._parse_one, filename, read))
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            wait(in_flight)
+
+    def iter_ndjson(self, sources: Iterable[ParseSource]) -> Iterator[bytes]:
+        """以 NDJSON 行的形式返回解析结果，关闭时一并关闭 iter_parse（等待正在执行的任务）"""
+        with closing(self.iter_parse(sources)) as results:
+            for result in results:
+                yield (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _parse_one(self, filename: str, read: Callable[[], bytes]) -> dict:
+        result = {"filename": filename, "success": False}
+        # 不支持的文件不读取（不解压）
+        file_type = guess_file_type(filename)
+        if file_type is None:
+            result["error"] = f"不支持的文件类型: {filename}"
+            return result
+
+        try:
+            content = read()
+            parse_response = self.parser.parse(file_content=content, file_type=file_type)
+            if not parse_response.success:
+                result["error"] = parse_response.error or "解析失败"
+                return result
+
+            result.update(
+                success=True,
+                cached=parse_response.cached,
+                resume_info=parse_response.resume_info.dict()
+            )
+        except Exception as e:
+            logger.error(f"批量解析简历失败: {filename}, {e}")
+            result["error"] = str(e)
+        return result
+
+
+# 全局实例在首次使用时创建，导入时不初始化
+batch_parser: Optional[BatchParser] = None
+_batch_parser_lock = threading.Lock()
+
+
+def get_batch_parser() -> BatchParser:
+    """获取全局批量解析器，延迟创建"""
+    global batch_parser
+    with _batch_parser_lock:
+        if batch_parser is None:
+            batch_parser = BatchParser(get_resume_parser(), max_workers=getattr(config, "resume_parse_workers", 4))
+        return batch_parser
@@ -1,6 +1,19 @@
+import time
 from collections import Counter
+from typing import Callable, List, Optional, Tuple
 
+import numpy as np
 import requests
+from loguru import logger
+from scipy import sparse as sp
+
+from app.repositry.milvus import embedding_and_query_batch, count_concept_centroids, query_concept_centroids
+from config import config
+
+
+# 概念中心向量是否已构建（检查结果缓存 concept_centroid_check_interval 秒）
+_centroids_ready = False
+_centroids_checked_at = float("-inf")
 
 
 def get_most_relevant_concept(concepts: list):
@@ -16,6 +29,254 @@ def get_most_relevant_concept(concepts: list):
     return most_common_cname, score_average
 
 
+def vote_concepts(concepts_list: List[List[dict]]) -> List[Tuple[Optional[str], Optional[float]]]:
+    """
+    批量版 get_most_relevant_concept：对每条新闻的命中结果投票，用矩阵运算一次完成
+    
+    票数相同时取排名最靠前的概念（与 Counter.most_common 一致），
+    分数为该概念命中结果的平均距离。
+    
+    Args:
+        concepts_list: 每条新闻的命中列表（embedding_and_query_batch 的返回值）
+    
+    Returns:
+        每条新闻的 (概念名, 分数)，没有命中时为 (None, None)
+    """
+    lengths = np.array([len(concepts) for concepts in concepts_list], dtype=np.int64)
+    if not lengths.sum():
+        return [(None, None)] * len(concepts_list)
+    
+    names = [i["concept"] for concepts in concepts_list for i in concepts]
+    distances = np.array([i["distance"] for concepts in concepts_list for i in concepts], dtype=np.float64)
+    cnames, labels = np.unique(names, return_inverse=True)
+    rows = np.repeat(np.arange(len(concepts_list)), lengths)
+    ranks = np.arange(len(names)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    
+    shape = (len(concepts_list), len(cnames))
+    counts = np.zeros(shape, dtype=np.int64)
+    sums = np.zeros(shape, dtype=np.float64)
+    first = np.full(shape, lengths.max(), dtype=np.int64)
+    np.add.at(counts, (rows, labels), 1)
+    np.add.at(sums, (rows, labels), distances)
+    np.minimum.at(first, (rows, labels), ranks)
+    
+    # 票数优先，其次是首次出现的排名
+    best = (counts * (lengths.max() + 1) - first).argmax(axis=1)
+    index = np.arange(len(concepts_list))
+    best_counts = counts[index, best]
+    scores = sums[index, best] / np.maximum(best_counts, 1)
+    return [
+        (str(cnames[label]), float(score)) if count else (None, None)
+        for label, score, count in zip(best, scores, best_counts)
+    ]
+
+
+def centroids_ready() -> bool:
+    """概念中心向量是否已由定时任务构建（collection 不存在或为空时为 False）"""
+    global _centroids_ready, _centroids_checked_at
+    now = time.monotonic()
+    if now - _centroids_checked_at >= getattr(config, "concept_centroid_check_interval", 60):
+        try:
+            _centroids_ready = count_concept_centroids() > 0
+        except Exception as e:
+            logger.warning(f"概念中心向量不可用: {e}")
+            _centroids_ready = False
+        if not _centroids_ready:
+            logger.info("概念中心向量尚未构建，使用个股记录检索")
+        _centroids_checked_at = now
+    return _centroids_ready
+
+
+def classify_news(news: List[str], top_k: int = 5, batch_size: int = 64) -> Tuple[List[dict], float]:
+    """
+    批量新闻搜相关概念
+    
+    concept_index 为 centroid 时只在概念中心向量中检索一次，为 stock 时在个股记录中检索后投票；
+    概念中心向量尚未构建时同样在个股记录中检索
+    
+    Args:
+        news: 新闻文本列表
+        top_k: 每条新闻的检索数量
+        batch_size: 每批向量化与检索的条数
+    
+    Returns:
+        (与 news 一一对应的 {"concept", "distance"}, 吞吐量（条/秒）)
+    """
+    start = time.perf_counter()
+    if getattr(config, "concept_index", "centroid") == "centroid" and centroids_ready():
+        # 在概念中心向量中检索，最相关的中心向量所属的概念即为分类结果
+        results = [
+            {"concept": hits[0]["concept"], "distance": hits[0]["distance"]}
+            if hits else {"concept": None, "distance": None}
+            for hits in query_concept_centroids(news, top_k, batch_size)
+        ]
+    else:
+        # 在全部 概念 × 个股 记录中检索后投票
+        concepts_list = embedding_and_query_batch(news, top_k, batch_size)
+        results = [
+            {"concept": concept_name, "distance": score}
+            for concept_name, score in vote_concepts(concepts_list)
+        ]
+    elapsed = time.perf_counter() - start
+    throughput = len(news) / elapsed if elapsed > 0 else 0.0
+    logger.info(f"批量概念分类: {len(news)} 条，耗时 {elapsed:.2f}s，{throughput:.1f} 条/秒")
+    return results, throughput
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10) -> np.ndarray:
+    """
+    按余弦相似度聚类（向量需已归一化），初始中心均匀取自输入，结果确定
+    
+    Returns:
+        每个向量的簇编号
+    """
+    k = min(k, len(vectors))
+    if k <= 1:
+        return np.zeros(len(vectors), dtype=np.int64)
+    centers = vectors[np.linspace(0, len(vectors) - 1, k).astype(np.int64)]
+    labels = np.zeros(len(vectors), dtype=np.int64)
+    for _ in range(iterations):
+        new_labels = (vectors @ centers.T).argmax(axis=1)
+        if _ and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for i in range(k):
+            members = vectors[labels == i]
+            if len(members):
+                center = members.sum(axis=0)
+                centers[i] = center / max(np.linalg.norm(center), 1e-12)
+    return labels
+
+
+class ConceptCentroidBuilder:
+    """ 概念中心向量
+    
+    入库时逐批加入 概念 × 个股 记录的向量，每个概念的记录聚成至多 per_concept 簇，
+    每簇的稠密 / 稀疏向量均值作为该概念的代表向量。
+    记录按概念连续排列时，遇到新概念即计算上一个概念的中心向量并释放其记录，内存只保留一个概念的记录。
+    """
+    
+    def __init__(self, per_concept: int = 1):
+        """
+        Args:
+            per_concept: 每个概念的中心向量数上限
+        """
+        self.per_concept = per_concept
+        self._concept = None
+        self._sparse = []
+        self._dense = []
+        self.concepts: List[str] = []
+        self._sparse_centroids = []
+        self._dense_centroids = []
+    
+    def add(self, concepts: List[str], sparse_vectors, dense_vectors):
+        """
+        Args:
+            concepts: 每条记录所属的概念
+            sparse_vectors: 稀疏向量矩阵（scipy sparse）
+            dense_vectors: 稠密向量矩阵
+        """
+        sparse_vectors = sp.csr_array(sparse_vectors)
+        dense_vectors = np.asarray(dense_vectors, dtype=np.float32)
+        start = 0
+        for end in range(1, len(concepts) + 1):
+            if end == len(concepts) or concepts[end] != concepts[start]:
+                if concepts[start] != self._concept:
+                    self._flush()
+                    self._concept = concepts[start]
+                self._sparse.append(sparse_vectors[start: end])
+                self._dense.append(dense_vectors[start: end])
+                start = end
+    
+    def build(self) -> Tuple[List[str], sp.csr_array, np.ndarray]:
+        """
+        Returns:
+            (每个中心向量所属的概念, 稀疏中心向量矩阵, 稠密中心向量矩阵)
+        """
+        self._flush()
+        if not self.concepts:
+            return [], sp.csr_array((0, 0), dtype=np.float32), np.zeros((0, 0), dtype=np.float32)
+        return (
+            list(self.concepts),
+            sp.csr_array(sp.vstack(self._sparse_centroids)),
+            np.vstack(self._dense_centroids),
+        )
+    
+    def _flush(self):
+        if self._concept is None:
+            return
+        dense = np.vstack(self._dense)
+        dense /= np.maximum(np.linalg.norm(dense, axis=1, keepdims=True), 1e-12)
+        labels = spherical_kmeans(dense, self.per_concept)
+        
+        # 簇分配矩阵（簇 × 记录，权重为 1/簇大小），一次矩阵乘法得到全部簇的均值
+        clusters = labels.max() + 1
+        sizes = np.bincount(labels, minlength=clusters)
+        weights = sp.csr_array(
+            (1.0 / sizes[labels], (labels, np.arange(len(labels)))),
+            shape=(clusters, len(labels))
+        )
+        dense_centroids = weights @ dense
+        dense_centroids /= np.maximum(np.linalg.norm(dense_centroids, axis=1, keepdims=True), 1e-12)
+        
+        self.concepts.extend([self._concept] * clusters)
+        self._sparse_centroids.append(sp.csr_array(weights @ sp.vstack(self._sparse)))
+        self._dense_centroids.append(dense_centroids.astype(np.float32))
+        self._concept, self._sparse, self._dense = None, [], []
+
+
+def embed_concept_records(records: List[dict], encode: Optional[Callable[[List[str]], dict]] = None) -> dict:
+    """
+    向量化同一概念下的 概念 × 个股 记录
+    
+    每条记录的文本为 "概念: 定义。个股(代码), 入选理由"，其中较长的概念定义在每只个股中重复。
+    这里概念定义与各个股文本分别向量化，相同文本只向量化一次，再组合成每条记录的向量：
+    稀疏向量取两部分逐词的最大值（与 BGE-M3 对重复词取最大权重一致），
+    稠密向量按文本长度的平方根加权平均后归一化（与逐条向量化的检索结果对比见 tests/test_concept.py）。
+    
+    Args:
+        records: 同一概念的记录（get_concept_stocks 的返回项）
+        encode: 向量化函数，默认 BGE-M3 encode_documents
+    
+    Returns:
+        {"docs", "concepts", "stock_codes", "sparse", "dense", "encoded", "encoded_chars", "doc_chars"}，
+        encoded 为实际向量化的文本数，encoded_chars 为其字符数，doc_chars 为逐条向量化记录文本时的字符数
+    """
+    if encode is None:
+        from app.cache_pool import get_bge_m3_ef
+        encode = get_bge_m3_ef().encode_documents
+    
+    definition = f"{records[0]['name']}: {records[0]['definition']}"
+    stock_texts = [f"{i['stock_name']}({i['stock_code']}), {i['reason']}" for i in records]
+    unique_texts = list(dict.fromkeys([definition] + stock_texts))
+    index = {text: i for i, text in enumerate(unique_texts)}
+    embeddings = encode(unique_texts)
+    
+    rows = np.array([index[text] for text in stock_texts])
+    sparse = sp.csr_array(embeddings["sparse"])
+    dense = np.asarray(embeddings["dense"], dtype=np.float32)
+    definition_row = index[definition]
+    
+    records_sparse = sparse[rows].maximum(sparse[np.full(len(rows), definition_row)])
+    weights = np.sqrt([len(text) for text in unique_texts]).astype(np.float32)
+    records_dense = (
+        weights[definition_row] * dense[definition_row] + weights[rows, None] * dense[rows]
+    ) / (weights[definition_row] + weights[rows, None])
+    records_dense /= np.maximum(np.linalg.norm(records_dense, axis=1, keepdims=True), 1e-12)
+    
+    docs = [f"{definition}。{text}" for text in stock_texts]
+    return {
+        "docs": docs,
+        "concepts": [i["name"] for i in records],
+        "stock_codes": [i["stock_code"] for i in records],
+        "sparse": sp.csr_array(records_sparse),
+        "dense": records_dense,
+        "encoded": len(unique_texts),
+        "encoded_chars": sum(len(text) for text in unique_texts),
+        "doc_chars": sum(len(doc) for doc in docs),
+    }
+
+
 def fetch_concept_info() -> list:
     host = "https://t-flashnews.kuai008.cn/api/client-api/concept-manifest/10jqka-not-encrypted"
     params = {
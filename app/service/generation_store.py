@@ -0,0 +1,132 @@
+import json
+import time
+import uuid
+import hashlib
+from typing import Any, Optional
+
+from app.db.sqlite import SQLiteStore
+from config import config
+
+
+class GenerationStore(SQLiteStore):
+    """ 简历生成结果存储
+
+    stages：各生成阶段（检索、项目经验、简历内容）的结果，key 为该阶段全部输入的哈希，
+    输入部分变化时只有受影响的阶段需要重新执行；
+    results：每次生成的完整结果，可按 result_id 换模板重新渲染或修改部分参数后重新生成。
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS stages (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS results (
+            id TEXT PRIMARY KEY,
+            request TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+    ]
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600):
+        """
+        Args:
+            path: 数据库文件路径
+            ttl: 阶段结果与生成结果的保留时间（秒），<=0 表示不过期
+        """
+        super().__init__(path)
+        self.ttl = ttl
+        self._writes = 0
+
+    @staticmethod
+    def stage_key(stage: str, inputs: Any) -> str:
+        """阶段名 + 全部输入（可 JSON 序列化）的 SHA-256"""
+        payload = json.dumps([stage, inputs], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_stage(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self.db.execute("SELECT value, created_at FROM stages WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row["created_at"]):
+            return None
+        return json.loads(row["value"])
+
+    def set_stage(self, key: str, value: Any):
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO stages (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=str), time.time())
+            )
+        self._after_write()
+
+    def save_result(self, request: dict, result: dict) -> str:
+        """
+        保存一次生成的完整结果
+
+        Args:
+            request: 生成请求
+            result: 生成结果
+
+        Returns:
+            result_id
+        """
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO results (id, request, result, created_at) VALUES (?, ?, ?, ?)",
+                (
+                    result_id,
+                    json.dumps(request, ensure_ascii=False),
+                    json.dumps(result, ensure_ascii=False),
+                    time.time()
+                )
+            )
+        self._after_write()
+        return result_id
+
+    def get_result(self, result_id: str) -> Optional[dict]:
+        """
+        Returns:
+            {"id", "request", "result", "created_at"}，不存在或已过期时返回 None
+        """
+        with self._lock:
+            row = self.db.execute("SELECT * FROM results WHERE id = ?", (result_id,)).fetchone()
+        if row is None or self._expired(row["created_at"]):
+            return None
+        return {
+            "id": row["id"],
+            "request": json.loads(row["request"]),
+            "result": json.loads(row["result"]),
+            "created_at": row["created_at"],
+        }
+
+    def prune(self) -> int:
+        """删除过期的阶段结果与生成结果"""
+        if self.ttl <= 0:
+            return 0
+        expired_before = time.time() - self.ttl
+        with self._lock:
+            count = self.db.execute("DELETE FROM stages WHERE created_at < ?", (expired_before,)).rowcount
+            count += self.db.execute("DELETE FROM results WHERE created_at < ?", (expired_before,)).rowcount
+        return count
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and created_at < time.time() - self.ttl
+
+    def _after_write(self):
+        # 每写入 100 次清理一次过期数据
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune()
+
+
+generation_store = GenerationStore(
+    getattr(config, "generation_db_path", "data/generations.sqlite3"),
+    ttl=getattr(config, "generation_ttl", 7 * 24 * 3600),
+)
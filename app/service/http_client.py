@@ -0,0 +1,59 @@
+import asyncio
+import weakref
+
+import httpx
+
+from app.service.metrics import timed
+from config import config
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """ 按域名记录外部请求耗时（到收到响应头为止，流式响应的正文不计入） """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with timed("http", request.url.host):
+            return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# 每个事件循环一个共享的 AsyncClient（连接池绑定在创建它的事件循环上）
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    获取当前事件循环共享的 HTTP 客户端，连接 keep-alive 复用
+
+    Returns:
+        httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                getattr(config, "http_timeout", 60),
+                connect=getattr(config, "http_connect_timeout", 5),
+            ),
+            transport=TimedTransport(httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=getattr(config, "http_max_connections", 100),
+                    max_keepalive_connections=getattr(config, "http_max_keepalive_connections", 20),
+                    keepalive_expiry=60,
+                ),
+            )),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """关闭当前事件循环的共享客户端"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,219 @@
+import time
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from app.schema.generation import GenerateResumeRequest
+from app.service.resume_generator import get_resume_generator
+from app.service.job_store import JobStatus, JobStore, job_store
+from config import config
+
+
+JobHandler = Callable[[dict], Awaitable[dict]]
+
+
+class JobQueue:
+    """ 异步任务队列
+
+    任务写入 SQLite 后立即返回任务 ID，由本进程的调度协程认领执行。
+    按 LLM 服务分别限制并发，超出的任务留在队列中等待；
+    其他进程提交的任务通过定时轮询认领。
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_workers: int = 16,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 4,
+        poll_interval: float = 1.0,
+        stale_seconds: float = 600,
+        ttl: float = 7 * 24 * 3600,
+    ):
+        """
+        Args:
+            store: 任务存储
+            max_workers: 本进程同时执行的任务数上限
+            provider_concurrency: 每个 LLM 服务的并发上限，如 {"deepseek": 8}
+            default_concurrency: 未配置的 LLM 服务的并发上限
+            poll_interval: 队列为空时的轮询间隔（秒）
+            stale_seconds: running 状态超过该时间未刷新的任务视为失联，重新入队
+            ttl: 已完成任务的保留时间（秒）
+        """
+        self.store = store
+        self.max_workers = max_workers
+        self.provider_concurrency = dict(provider_concurrency or {})
+        self.default_concurrency = default_concurrency
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.ttl = ttl
+        self._handlers: Dict[str, JobHandler] = {}
+        self._active: Dict[str, int] = defaultdict(int)
+        self._running: Dict[str, asyncio.Task] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: JobHandler):
+        """注册任务类型的执行函数，执行函数接收任务参数并返回结果"""
+        self._handlers[kind] = handler
+
+    async def start(self):
+        """启动调度协程（在应用启动时调用）"""
+        if self._dispatcher is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Event()
+        requeued = await asyncio.to_thread(self.store.requeue_stale, self.stale_seconds)
+        if requeued:
+            logger.info(f"{requeued} 个失联任务重新入队")
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        """停止调度，未完成的任务放回队列"""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(self._dispatcher, *tasks, return_exceptions=True)
+        self._dispatcher = None
+
+    async def submit(self, kind: str, provider: str, request: dict) -> dict:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型
+            provider: 使用的 LLM 服务
+            request: 任务参数
+
+        Returns:
+            任务信息（含任务 ID）
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"未知的任务类型: {kind}")
+        job = await asyncio.to_thread(self.store.create, kind, provider, request)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        订阅任务状态，每次状态变化返回一次任务信息，任务完成后结束
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            任务信息的异步迭代器
+        """
+        last_status = None
+        while True:
+            changed = self._changed
+            job = await self.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield job
+            if job["status"] in JobStatus.FINISHED:
+                return
+            # 本进程内的状态变化立即唤醒，其他进程执行的任务靠轮询
+            if changed is None:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                try:
+                    await asyncio.wait_for(changed.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _limit(self, provider: str) -> int:
+        return self.provider_concurrency.get(provider, self.default_concurrency)
+
+    def _notify(self):
+        """唤醒所有订阅者"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _dispatch(self):
+        last_maintenance = 0.0
+        while True:
+            try:
+                now = time.time()
+                if now - last_maintenance > self.stale_seconds / 3:
+                    last_maintenance = now
+                    await asyncio.to_thread(self.store.touch, list(self._running))
+                    await asyncio.to_thread(self.store.requeue_stale, self.stale_seconds)
+                    await asyncio.to_thread(self.store.prune, self.ttl)
+
+                job = None
+                if len(self._running) < self.max_workers:
+                    full = [p for p, n in self._active.items() if n >= self._limit(p)]
+                    job = await asyncio.to_thread(self.store.claim, full)
+                if job is not None:
+                    self._active[job["provider"]] += 1
+                    self._running[job["id"]] = asyncio.create_task(self._run(job))
+                    self._notify()
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"任务调度失败: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job: dict):
+        result, error = None, None
+        try:
+            result = await self._handlers[job["kind"]](job["request"])
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(self.store.release, job["id"]))
+            raise
+        except Exception as e:
+            logger.error(f"任务 {job['id']} 执行失败: {e}")
+            error = str(e) or type(e).__name__
+        finally:
+            self._active[job["provider"]] -= 1
+            self._running.pop(job["id"], None)
+            self._wakeup.set()
+
+        await asyncio.to_thread(self.store.finish, job["id"], result, error)
+        self._notify()
+
+
+async def run_generate_resume(request: dict) -> dict:
+    """执行简历生成任务，返回与 /resume/generate 相同结构的数据"""
+    generate_response = await get_resume_generator().generate_resume(GenerateResumeRequest(**request))
+    if not generate_response.success:
+        raise RuntimeError(generate_response.error or "生成失败")
+    return {
+        "resume_content": generate_response.resume_content,
+        "resume_pdf_path": generate_response.resume_pdf_path,
+        "new_projects": [
+            project.dict() for project in generate_response.new_projects or []
+        ],
+        "result_id": generate_response.result_id
+    }
+
+
+job_queue = JobQueue(
+    store=job_store,
+    max_workers=getattr(config, "job_max_workers", 16),
+    provider_concurrency=getattr(config, "job_provider_concurrency", {}),
+    default_concurrency=getattr(config, "job_default_concurrency", 4),
+    poll_interval=getattr(config, "job_poll_interval", 1.0),
+    stale_seconds=getattr(config, "job_stale_seconds", 600),
+    ttl=getattr(config, "job_ttl", 7 * 24 * 3600),
+)
+job_queue.register("generate_resume", run_generate_resume)
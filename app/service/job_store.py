@@ -0,0 +1,178 @@
+import json
+import time
+import uuid
+import sqlite3
+from typing import Iterable, Optional
+
+from app.db.sqlite import SQLiteStore
+from config import config
+
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobStore(SQLiteStore):
+    """ 基于 SQLite 的任务存储
+
+    多个进程（uvicorn workers）共享同一个数据库文件，任务通过
+    `UPDATE ... WHERE status = 'pending'` 原子认领，保证只被执行一次。
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            status TEXT NOT NULL,
+            request TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)",
+    ]
+
+    def create(self, kind: str, provider: str, request: dict) -> dict:
+        """
+        创建待执行的任务
+
+        Args:
+            kind: 任务类型，如 "generate_resume"
+            provider: 执行任务使用的 LLM 服务，用于并发限制
+            request: 任务参数
+
+        Returns:
+            任务信息
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO jobs (id, kind, provider, status, request, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, provider, JobStatus.PENDING, json.dumps(request, ensure_ascii=False), now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim(self, exclude_providers: Iterable[str] = ()) -> Optional[dict]:
+        """
+        认领最早的一个待执行任务，将其标记为 running
+
+        Args:
+            exclude_providers: 跳过这些 LLM 服务的任务（并发已满）
+
+        Returns:
+            任务信息，没有可执行的任务时返回 None
+        """
+        exclude_providers = list(exclude_providers)
+        sql = "SELECT id FROM jobs WHERE status = ?"
+        args = [JobStatus.PENDING]
+        if exclude_providers:
+            sql += f" AND provider NOT IN ({', '.join('?' * len(exclude_providers))})"
+            args.extend(exclude_providers)
+        sql += " ORDER BY created_at LIMIT 1"
+
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute(sql, args).fetchone()
+                if row is not None:
+                    self.db.execute(
+                        "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                        (JobStatus.RUNNING, time.time(), row["id"])
+                    )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def finish(self, job_id: str, result: Optional[dict] = None, error: Optional[str] = None):
+        """记录任务结果，error 不为空时任务失败"""
+        status = JobStatus.FAILED if error is not None else JobStatus.SUCCEEDED
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id
+                )
+            )
+
+    def touch(self, job_ids: Iterable[str]):
+        """刷新 running 任务的更新时间（心跳），避免被当作失联任务重新入队"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with self._lock:
+            self.db.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE status = ? AND id IN ({', '.join('?' * len(job_ids))})",
+                (time.time(), JobStatus.RUNNING, *job_ids)
+            )
+
+    def release(self, job_id: str):
+        """将未执行完的任务放回队列（如服务关闭时）"""
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.PENDING, time.time(), job_id, JobStatus.RUNNING)
+            )
+
+    def requeue_stale(self, stale_seconds: float) -> int:
+        """
+        将长时间处于 running 的任务（执行它的进程已退出）重新置为 pending
+
+        Returns:
+            重新入队的任务数
+        """
+        with self._lock:
+            cursor = self.db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+                (JobStatus.PENDING, time.time(), JobStatus.RUNNING, time.time() - stale_seconds)
+            )
+        return cursor.rowcount
+
+    def prune(self, ttl: float) -> int:
+        """删除完成时间超过 ttl 秒的任务"""
+        with self._lock:
+            cursor = self.db.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(JobStatus.FINISHED))}) AND updated_at < ?",
+                (*JobStatus.FINISHED, time.time() - ttl)
+            )
+        return cursor.rowcount
+
+    def count_unfinished(self) -> dict:
+        """各 LLM 服务排队中与执行中的任务数：{(provider, status): count}"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT provider, status, COUNT(*) AS n FROM jobs WHERE status IN (?, ?) GROUP BY provider, status",
+                (JobStatus.PENDING, JobStatus.RUNNING)
+            ).fetchall()
+        return {(row["provider"], row["status"]): row["n"] for row in rows}
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+job_store = JobStore(getattr(config, "job_db_path", "data/jobs.sqlite3"))
@@ -0,0 +1,57 @@
+import json
+from typing import List
+
+
+class JSONObjectStream:
+    """ 增量 JSON 对象解析器
+
+    逐段喂入 LLM 的输出（如 `[{...}, {...}]`，允许包裹在 ```json 代码块中），
+    每当一个顶层对象的右括号到达时立即解析并返回该对象。
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        """
+        喂入一段文本
+
+        Args:
+            chunk: 新到达的文本
+
+        Returns:
+            本次新完成的顶层对象
+        """
+        objects = []
+        for char in chunk:
+            if self._depth == 0:
+                # 顶层对象之外的内容（数组括号、逗号、代码块标记）直接跳过
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        objects.append(json.loads("".join(self._buffer)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._buffer = []
+        return objects
@@ -0,0 +1,232 @@
+import re
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+from loguru import logger
+
+from app.cache_pool import CachePool, ThreadSafeObject, get_bge_m3_ef
+from config import config
+
+
+_whitespace_pattern = re.compile(r"\s+")
+
+# 最多暂存多少个未命中提示词的向量
+PENDING_VECTOR_NUM = 256
+
+
+def normalize_prompt(prompt: str) -> str:
+    """归一化提示词：合并空白字符"""
+    return _whitespace_pattern.sub(" ", prompt).strip()
+
+
+def default_embed(text: str) -> np.ndarray:
+    """使用 BGE-M3 的 dense 向量作为提示词的语义表示"""
+    return np.asarray(get_bge_m3_ef().encode_documents([text])["dense"][0], dtype=np.float32)
+
+
+class TTLCachePool(CachePool):
+    """带过期时间的 LRU 缓存"""
+
+    def __init__(self, cache_num: int = -1, ttl: float = -1):
+        super().__init__(cache_num=cache_num)
+        self._ttl = ttl
+
+    def get_value(self, key: str) -> Optional[str]:
+        with self.atomic:
+            item = self.get(key)
+            if item is None:
+                return None
+            expires_at, value = item.obj
+            if 0 < expires_at < time.time():
+                self.pop(key)
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def set_value(self, key: str, value: str):
+        expires_at = time.time() + self._ttl if self._ttl > 0 else 0
+        item = ThreadSafeObject(key, obj=(expires_at, value), pool=self)
+        item.finish_loading()
+        with self.atomic:
+            self.set(key, item)
+
+
+class SemanticCache:
+    """ 语义缓存
+
+    保存提示词向量，查询时与同一参数下的所有向量计算余弦相似度，
+    超过阈值则返回缓存的回复。按 LRU 与过期时间淘汰。
+    """
+
+    def __init__(self, cache_num: int = 1024, ttl: float = -1, threshold: float = 0.95):
+        self._cache_num = cache_num
+        self._ttl = ttl
+        self._threshold = threshold
+        # params_key -> {key: (expires_at, vector, value)}
+        self._entries: Dict[str, dict] = {}
+        # key -> params_key，按最近使用排序
+        self._order = OrderedDict()
+        # params_key -> (keys, 向量矩阵)，写入或淘汰后重建
+        self._matrices: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+
+    def lookup(self, params_key: str, vector: np.ndarray) -> Optional[str]:
+        with self._lock:
+            self._expire(params_key)
+            entries = self._entries.get(params_key)
+            if not entries:
+                return None
+            if params_key not in self._matrices:
+                keys = list(entries)
+                self._matrices[params_key] = (keys, np.stack([entries[key][1] for key in keys]))
+            keys, matrix = self._matrices[params_key]
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self._threshold:
+                return None
+            self._order.move_to_end(keys[best])
+            return entries[keys[best]][2]
+
+    def store(self, params_key: str, key: str, vector: np.ndarray, value: str):
+        expires_at = time.time() + self._ttl if self._ttl > 0 else 0
+        with self._lock:
+            self._entries.setdefault(params_key, {})[key] = (expires_at, vector, value)
+            self._order[key] = params_key
+            self._order.move_to_end(key)
+            self._matrices.pop(params_key, None)
+            while self._cache_num > 0 and len(self._order) > self._cache_num:
+                self._remove(*self._order.popitem(last=False))
+
+    def _remove(self, key: str, params_key: str):
+        self._entries.get(params_key, {}).pop(key, None)
+        self._matrices.pop(params_key, None)
+
+    def _expire(self, params_key: str):
+        now = time.time()
+        entries = self._entries.get(params_key, {})
+        for key in [key for key, (expires_at, _, _) in entries.items() if 0 < expires_at < now]:
+            self._order.pop(key, None)
+            self._remove(key, params_key)
+
+
+class LLMResponseCache:
+    """ LLM 回复缓存
+
+    精确层：归一化提示词 + 模型参数的 SHA-256 为 key；
+    语义层：提示词向量相似度超过阈值时复用回复，只对指定的 namespace 启用。
+    """
+
+    def __init__(
+        self,
+        cache_num: int = 1024,
+        ttl: float = -1,
+        semantic_cache_num: int = 1024,
+        semantic_threshold: float = 0.95,
+        semantic_namespaces: Iterable[str] = (),
+        embed: Callable[[str], np.ndarray] = default_embed,
+    ):
+        """
+        Args:
+            cache_num: 精确层最大条目数
+            ttl: 过期时间（秒），<=0 表示不过期
+            semantic_cache_num: 语义层最大条目数
+            semantic_threshold: 语义层余弦相似度阈值
+            semantic_namespaces: 启用语义层的 namespace（如 "project"）
+            embed: 文本向量化函数
+        """
+        self.exact = TTLCachePool(cache_num=cache_num, ttl=ttl)
+        self.semantic = SemanticCache(cache_num=semantic_cache_num, ttl=ttl, threshold=semantic_threshold)
+        self.semantic_namespaces = set(semantic_namespaces)
+        self._embed = embed
+        # get 未命中时计算的向量，set 时复用，避免同一提示词向量化两次
+        self._pending_vectors = OrderedDict()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def params_key(namespace: str, params: dict) -> str:
+        return f"{namespace}|{json.dumps(params, sort_keys=True)}"
+
+    @staticmethod
+    def exact_key(prompt: str, params_key: str) -> str:
+        return hashlib.sha256(f"{params_key}|{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    async def get(self, namespace: str, prompt: str, params: dict) -> Optional[str]:
+        """
+        查询缓存，先查精确层再查语义层
+
+        Args:
+            namespace: 调用场景，如 "project"、"resume"
+            prompt: 提示词
+            params: 影响输出的模型参数（模型名、temperature、max_tokens 等）
+        """
+        params_key = self.params_key(namespace, params)
+        key = self.exact_key(prompt, params_key)
+        value = self.exact.get_value(key)
+        if value is not None:
+            self._count("exact_hits")
+            return value
+
+        if namespace in self.semantic_namespaces:
+            vector = await self._aembed(prompt)
+            if vector is not None:
+                with self._lock:
+                    self._pending_vectors[key] = vector
+                    while len(self._pending_vectors) > PENDING_VECTOR_NUM:
+                        self._pending_vectors.popitem(last=False)
+                value = self.semantic.lookup(params_key, vector)
+                if value is not None:
+                    self._count("semantic_hits")
+                    return value
+
+        self._count("misses")
+        return None
+
+    async def set(self, namespace: str, prompt: str, params: dict, value: str):
+        """写入缓存"""
+        params_key = self.params_key(namespace, params)
+        key = self.exact_key(prompt, params_key)
+        self.exact.set_value(key, value)
+        if namespace in self.semantic_namespaces:
+            with self._lock:
+                vector = self._pending_vectors.pop(key, None)
+            if vector is None:
+                vector = await self._aembed(prompt)
+            if vector is not None:
+                self.semantic.store(params_key, key, vector, value)
+
+    def stats(self) -> dict:
+        """命中率统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        total = sum(stats.values())
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["semantic_hits"]) / total, 4) if total else 0.0
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    async def _aembed(self, prompt: str) -> Optional[np.ndarray]:
+        try:
+            vector = await asyncio.to_thread(self._embed, normalize_prompt(prompt))
+        except Exception as e:
+            logger.warning(f"提示词向量化失败，跳过语义缓存: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+
+llm_response_cache = LLMResponseCache(
+    cache_num=getattr(config, "llm_cache_num", 1024),
+    ttl=getattr(config, "llm_cache_ttl", 86400),
+    semantic_cache_num=getattr(config, "llm_semantic_cache_num", 1024),
+    semantic_threshold=getattr(config, "llm_semantic_cache_threshold", 0.95),
+    semantic_namespaces=getattr(config, "llm_semantic_cache_namespaces", ["project"]),
+)
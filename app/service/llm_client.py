@@ -0,0 +1,160 @@
+import json
+from typing import AsyncIterator
+
+from loguru import logger
+
+from app.service.http_client import get_async_client
+from config import config
+
+
+SYSTEM_PROMPT = "你是一个专业的简历生成助手。"
+
+
+class ChatClient:
+    """OpenAI 兼容 Chat Completions 接口的异步客户端（共享 keep-alive 连接池）"""
+
+    name = ""
+
+    def __init__(self, api_key: str, base_url: str, model: str, temperature: float = 0.7):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.temperature = temperature
+
+    def is_fallback(self, text: str) -> bool:
+        """是否为调用失败时的备用响应（不应被缓存）"""
+        return False
+
+    def _request_args(self, prompt: str, max_tokens: int, stream: bool) -> dict:
+        return {
+            "url": self.base_url,
+            "headers": {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.temperature,
+                "max_tokens": max_tokens,
+                "stream": stream
+            },
+        }
+
+    async def generate(self, prompt: str, max_tokens: int = 2000) -> str:
+        """生成完整回复"""
+        response = await get_async_client().post(**self._request_args(prompt, max_tokens, stream=False))
+        response.raise_for_status()
+        result = response.json()
+        return result["choices"][0]["message"]["content"]
+
+    async def stream(self, prompt: str, max_tokens: int = 2000) -> AsyncIterator[str]:
+        """
+        以 SSE 流式生成，逐段返回增量文本
+
+        Args:
+            prompt: 提示词
+            max_tokens: 最大生成 token 数
+
+        Returns:
+            增量文本的异步迭代器
+        """
+        async with get_async_client().stream("POST", **self._request_args(prompt, max_tokens, stream=True)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+
+class DeepSeekClient(ChatClient):
+    """DeepSeek API 客户端"""
+
+    name = "deepseek"
+
+    def __init__(self):
+        super().__init__(
+            api_key=getattr(config, "deepseek_api_key", ""),
+            base_url=getattr(config, "deepseek_base_url", "https://api.deepseek.com/v1/chat/completions"),
+            model=getattr(config, "deepseek_model", "deepseek-chat"),
+        )
+
+    async def generate(self, prompt: str, max_tokens: int = 2000) -> str:
+        """调用 DeepSeek API 生成文本"""
+        if not self.api_key:
+            logger.warning("DeepSeek API Key 未配置，返回示例文本")
+            return self._get_fallback_response()
+
+        try:
+            return await super().generate(prompt, max_tokens)
+        except Exception as e:
+            logger.error(f"DeepSeek API 调用失败: {e}")
+            return self._get_fallback_response()
+
+    async def stream(self, prompt: str, max_tokens: int = 2000) -> AsyncIterator[str]:
+        """调用 DeepSeek API 流式生成文本"""
+        if not self.api_key:
+            logger.warning("DeepSeek API Key 未配置，返回示例文本")
+            yield self._get_fallback_response()
+            return
+
+        started = False
+        try:
+            async for delta in super().stream(prompt, max_tokens):
+                started = True
+                yield delta
+        except Exception as e:
+            logger.error(f"DeepSeek API 调用失败: {e}")
+            # 已经输出部分内容时不能再拼接备用响应
+            if started:
+                raise
+            yield self._get_fallback_response()
+
+    def is_fallback(self, text: str) -> bool:
+        return text == self._get_fallback_response()
+
+    def _get_fallback_response(self) -> str:
+        """返回备用响应"""
+        return """[
+  {
+    "name": "示例项目",
+    "description": "这是一个示例项目描述",
+    "tech_stack": ["Python", "FastAPI"],
+    "responsibilities": ["负责后端开发", "实现 API 接口"]
+  }
+]"""
+
+
+class OpenAIClient(ChatClient):
+    """OpenAI API 客户端（备用）"""
+
+    name = "openai"
+
+    def __init__(self):
+        super().__init__(
+            api_key=getattr(config, "openai_api_key", ""),
+            base_url=getattr(config, "openai_base_url", "https://api.openai.com/v1/chat/completions"),
+            model=getattr(config, "openai_model", "gpt-3.5-turbo"),
+        )
+
+    async def generate(self, prompt: str, max_tokens: int = 2000) -> str:
+        """调用 OpenAI API"""
+        if not self.api_key:
+            raise ValueError("OpenAI API Key 未配置")
+        return await super().generate(prompt, max_tokens)
+
+    async def stream(self, prompt: str, max_tokens: int = 2000) -> AsyncIterator[str]:
+        """调用 OpenAI API 流式生成"""
+        if not self.api_key:
+            raise ValueError("OpenAI API Key 未配置")
+        async for delta in super().stream(prompt, max_tokens):
+            yield delta
@@ -0,0 +1,308 @@
+import time
+import random
+import asyncio
+from collections import deque
+from typing import AsyncIterator, List, Optional
+
+import httpx
+from loguru import logger
+
+from app.service.llm_client import ChatClient
+from config import config
+
+
+# 请求本身有问题（而不是服务不可用），换服务重试也不会成功
+NON_RETRYABLE_STATUS = {400, 413, 422}
+
+
+class LLMUnavailable(Exception):
+    pass
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code not in NON_RETRYABLE_STATUS
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ValueError, KeyError))
+
+
+class Endpoint:
+    """ 单个 LLM 服务地址 + API Key
+
+    记录最近调用的延迟与错误率，并维护熔断状态：
+    closed（正常）-> 连续失败或错误率过高 -> open（熔断 cooldown 秒）
+    -> half-open（放行一个探测请求）-> 成功则 closed，失败则重新 open。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: ChatClient,
+        window: int = 50,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        cooldown: float = 30,
+    ):
+        self.name = name
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self.latency: Optional[float] = None  # 成功调用延迟的指数移动平均（秒）
+        self.results = deque(maxlen=window)  # 最近调用是否成功
+        self.consecutive_failures = 0
+        self.in_flight = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def error_rate(self) -> float:
+        return self.results.count(False) / len(self.results) if self.results else 0.0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def available(self) -> bool:
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.probing)
+
+    def score(self) -> float:
+        """越小越优先：延迟按并发数放大，按错误率惩罚；未调用过的地址优先探索"""
+        latency = self.latency or 0.0
+        return latency * (1 + self.in_flight) / max(1e-3, 1 - self.error_rate)
+
+    def begin(self):
+        self.in_flight += 1
+        if self.state == "half-open":
+            self.probing = True
+
+    def record_success(self, latency: float):
+        self.in_flight -= 1
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.results.append(True)
+        self.consecutive_failures = 0
+        if self.opened_at is not None:
+            logger.info(f"LLM 服务 {self.name} 恢复")
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.in_flight -= 1
+        self.results.append(False)
+        self.consecutive_failures += 1
+        if self.probing or self.consecutive_failures >= self.failure_threshold or (
+            len(self.results) >= min(10, self.results.maxlen) and self.error_rate >= self.error_rate_threshold
+        ):
+            if self.state != "open":
+                logger.warning(f"LLM 服务 {self.name} 熔断 {self.cooldown} 秒")
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def record_cancel(self):
+        """对冲请求被取消，不计入统计"""
+        self.in_flight -= 1
+        self.probing = False
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "model": self.client.model,
+            "state": self.state,
+            "latency": round(self.latency, 4) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "in_flight": self.in_flight,
+        }
+
+
+class LLMRouter:
+    """ 多 LLM 服务 / 多 API Key 路由
+
+    每次调用发往评分最优（延迟低、错误少、并发少）的可用地址；
+    失败后带抖动的指数退避，换下一个地址重试；
+    可选对冲请求：首个请求 hedge_delay 秒内未返回时，向次优地址再发一次，取先返回的结果。
+    对外接口与 ChatClient 相同。
+    """
+
+    name = "router"
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        temperature: float = 0.7,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8,
+        hedge_delay: float = 0,
+    ):
+        """
+        Args:
+            endpoints: 服务地址列表
+            temperature: 采样温度
+            max_attempts: 最多尝试次数（含首次）
+            backoff: 退避基准时间（秒）
+            max_backoff: 退避时间上限（秒）
+            hedge_delay: 对冲延迟（秒），<=0 表示不对冲
+        """
+        self.endpoints = endpoints
+        self.temperature = temperature
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_delay = hedge_delay
+        for endpoint in endpoints:
+            endpoint.client.temperature = temperature
+        # 作为缓存 key 的一部分
+        self.model = ",".join(sorted({endpoint.client.model for endpoint in endpoints}))
+
+    @classmethod
+    def from_config(cls) -> "LLMRouter":
+        """
+        根据配置创建路由
+
+        优先使用 llm_endpoints（[{"name", "base_url", "api_key", "model"}, ...]），
+        未配置时按 llm_type 使用 <llm_type>_api_keys（或 <llm_type>_api_key）中的每个 Key
+        """
+        llm_type = getattr(config, "llm_type", "deepseek")
+        defaults = {
+            "deepseek": ("https://api.deepseek.com/v1/chat/completions", "deepseek-chat"),
+            "openai": ("https://api.openai.com/v1/chat/completions", "gpt-3.5-turbo"),
+        }
+        items = list(getattr(config, "llm_endpoints", None) or [])
+        if not items:
+            base_url, model = defaults.get(llm_type, defaults["deepseek"])
+            keys = getattr(config, f"{llm_type}_api_keys", None) or [getattr(config, f"{llm_type}_api_key", "")]
+            items = [
+                {
+                    "name": f"{llm_type}#{i}",
+                    "base_url": getattr(config, f"{llm_type}_base_url", base_url),
+                    "api_key": key,
+                    "model": getattr(config, f"{llm_type}_model", model),
+                }
+                for i, key in enumerate(keys) if key
+            ]
+
+        endpoints = [
+            Endpoint(
+                name=item.get("name") or f"endpoint#{i}",
+                client=ChatClient(api_key=item.get("api_key", ""), base_url=item["base_url"], model=item["model"]),
+                window=getattr(config, "llm_router_window", 50),
+                failure_threshold=getattr(config, "llm_router_failure_threshold", 5),
+                error_rate_threshold=getattr(config, "llm_router_error_rate_threshold", 0.5),
+                cooldown=getattr(config, "llm_router_cooldown", 30),
+            )
+            for i, item in enumerate(items)
+        ]
+        return cls(
+            endpoints,
+            max_attempts=getattr(config, "llm_router_max_attempts", 3),
+            backoff=getattr(config, "llm_router_backoff", 0.5),
+            max_backoff=getattr(config, "llm_router_max_backoff", 8),
+            hedge_delay=getattr(config, "llm_router_hedge_delay", 0),
+        )
+
+    def is_fallback(self, text: str) -> bool:
+        return False
+
+    def ranked(self) -> List[Endpoint]:
+        """可用地址按评分排序，评分相同的随机打散以分摊负载"""
+        endpoints = [endpoint for endpoint in self.endpoints if endpoint.available()]
+        random.shuffle(endpoints)
+        return sorted(endpoints, key=lambda endpoint: endpoint.score())
+
+    def stats(self) -> List[dict]:
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+    async def generate(self, prompt: str, max_tokens: int = 2000) -> str:
+        """生成完整回复，失败时换地址重试"""
+        last_error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                await self._sleep_backoff(attempt)
+            endpoints = self.ranked()
+            if not endpoints:
+                last_error = last_error or LLMUnavailable("所有 LLM 服务均已熔断")
+                continue
+            try:
+                if self.hedge_delay > 0 and len(endpoints) > 1:
+                    return await self._hedged(endpoints[0], endpoints[1], prompt, max_tokens)
+                return await self._call(endpoints[0], prompt, max_tokens)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(f"LLM 调用失败（第 {attempt + 1} 次）: {e}")
+        raise LLMUnavailable(f"LLM 调用失败: {last_error}")
+
+    async def stream(self, prompt: str, max_tokens: int = 2000) -> AsyncIterator[str]:
+        """流式生成，尚未输出任何内容时失败才会重试"""
+        last_error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                await self._sleep_backoff(attempt)
+            endpoints = self.ranked()
+            if not endpoints:
+                last_error = last_error or LLMUnavailable("所有 LLM 服务均已熔断")
+                continue
+            endpoint = endpoints[0]
+            started = False
+            endpoint.begin()
+            start = time.perf_counter()
+            try:
+                async for delta in endpoint.client.stream(prompt, max_tokens):
+                    started = True
+                    yield delta
+            except (asyncio.CancelledError, GeneratorExit):
+                endpoint.record_cancel()
+                raise
+            except Exception as e:
+                endpoint.record_failure()
+                if started or not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(f"LLM 流式调用失败（第 {attempt + 1} 次）: {e}")
+                continue
+            endpoint.record_success(time.perf_counter() - start)
+            return
+        raise LLMUnavailable(f"LLM 调用失败: {last_error}")
+
+    async def _call(self, endpoint: Endpoint, prompt: str, max_tokens: int) -> str:
+        endpoint.begin()
+        start = time.perf_counter()
+        try:
+            text = await endpoint.client.generate(prompt, max_tokens)
+        except asyncio.CancelledError:
+            endpoint.record_cancel()
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.perf_counter() - start)
+        return text
+
+    async def _hedged(self, primary: Endpoint, secondary: Endpoint, prompt: str, max_tokens: int) -> str:
+        """主请求超过 hedge_delay 未返回时向次优地址发出对冲请求，取先成功的结果"""
+        tasks = [asyncio.create_task(self._call(primary, prompt, max_tokens))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if not done:
+                tasks.append(asyncio.create_task(self._call(secondary, prompt, max_tokens)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _sleep_backoff(self, attempt: int):
+        """带抖动的指数退避（full jitter）"""
+        await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
@@ -0,0 +1,134 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from app.cache_pool import CachePool, ThreadSafeObject
+from app.schema.resume import ResumeInfo
+from app.service.metrics import registry
+from config import config
+
+
+# 每写入多少次磁盘缓存检查一次磁盘容量
+DISK_PRUNE_INTERVAL = 100
+
+parse_cache_lookups = registry.counter(
+    "genious_parse_cache_lookups_total", "简历解析缓存查询次数", ["result"]
+)
+
+
+class ParseResultCache(CachePool):
+    """ 简历解析结果缓存
+
+    key 为 文件内容 SHA-256 + 解析器版本 + 文件类型 + PDF 提取后端，
+    内存层按 LRU 淘汰，可选的磁盘层以 JSON 文件保存，按最近访问时间淘汰。
+    """
+
+    def __init__(self, cache_num: int = -1, cache_dir: Optional[str] = None, disk_cache_num: int = -1):
+        """
+        Args:
+            cache_num: 内存层最大条目数，<=0 表示不限制
+            cache_dir: 磁盘层目录，为空时不启用磁盘层
+            disk_cache_num: 磁盘层最大条目数，<=0 表示不限制
+        """
+        super().__init__(cache_num=cache_num)
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._disk_cache_num = disk_cache_num
+        self._disk_writes = 0
+        if self._cache_dir:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(content: bytes, file_type: str, parser_version: str) -> str:
+        """计算缓存 key"""
+        digest = hashlib.sha256(content)
+        backend = getattr(config, "pdf_extract_backend", "pdfium")
+        digest.update(f"|{parser_version}|{file_type.lower()}|{backend}".encode())
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Optional[ResumeInfo]:
+        """查询缓存，内存未命中时查磁盘并回填内存"""
+        with self.atomic:
+            item = self.get(key)
+            if item is not None:
+                self._cache.move_to_end(key)
+                parse_cache_lookups.inc(result="memory")
+                return item.obj.copy(deep=True)
+
+        resume_info = self._load_from_disk(key)
+        if resume_info is not None:
+            self._set_memory(key, resume_info)
+            parse_cache_lookups.inc(result="disk")
+            return resume_info.copy(deep=True)
+        parse_cache_lookups.inc(result="miss")
+        return None
+
+    def store(self, key: str, resume_info: ResumeInfo):
+        """写入缓存"""
+        resume_info = resume_info.copy(deep=True)
+        self._set_memory(key, resume_info)
+        self._save_to_disk(key, resume_info)
+
+    def _set_memory(self, key: str, resume_info: ResumeInfo):
+        item = ThreadSafeObject(key, obj=resume_info, pool=self)
+        item.finish_loading()
+        with self.atomic:
+            self.set(key, item)
+
+    def _disk_path(self, key: str) -> Path:
+        return self._cache_dir / key[:2] / f"{key}.json"
+
+    def _load_from_disk(self, key: str) -> Optional[ResumeInfo]:
+        if not self._cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            resume_info = ResumeInfo.parse_raw(path.read_bytes())
+            os.utime(path)
+            return resume_info
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取解析缓存失败: {path}, {e}")
+            return None
+
+    def _save_to_disk(self, key: str, resume_info: ResumeInfo):
+        if not self._cache_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(resume_info.json(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"写入解析缓存失败: {path}, {e}")
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """磁盘条目超过上限时删除最久未访问的文件"""
+        if self._disk_cache_num <= 0:
+            return
+        files = []
+        for path in self._cache_dir.glob("*/*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        files.sort()
+        for _, path in files[:max(0, len(files) - self._disk_cache_num)]:
+            path.unlink(missing_ok=True)
+
+
+parse_result_cache = ParseResultCache(
+    cache_num=getattr(config, "resume_cache_num", 1024),
+    cache_dir=getattr(config, "resume_cache_dir", None),
+    disk_cache_num=getattr(config, "resume_cache_disk_num", -1),
+)
@@ -0,0 +1,165 @@
+import re
+import threading
+from io import StringIO
+from typing import BinaryIO, Dict, List, Union
+
+from loguru import logger
+
+from app.service.metrics import timed
+from config import config
+
+
+PdfSource = Union[str, BinaryIO]
+
+# 空白页占比超过该值时认为快速解析结果不可用
+EMPTY_PAGE_RATIO = 0.5
+# 乱码字符占比超过该值时认为快速解析结果不可用
+GARBLED_CHAR_RATIO = 0.05
+
+# 替换字符、私有区字符（字体缺少 ToUnicode 映射时常见）、未映射的 (cid:123)
+_garbled_pattern = re.compile(r"\ufffd|[\ue000-\uf8ff]|\(cid:\d+\)")
+_whitespace_pattern = re.compile(r"\s+")
+
+# pdfium 不是线程安全的，同一进程内的调用需要串行
+_pdfium_lock = threading.Lock()
+
+
+class PdfExtractor:
+    """PDF 文本提取后端"""
+
+    name = ""
+
+    def extract_pages(self, source: PdfSource) -> List[str]:
+        """按页提取文本"""
+        raise NotImplementedError
+
+
+class PdfiumExtractor(PdfExtractor):
+    """基于 pypdfium2 的提取，不做版面分析，速度最快"""
+
+    name = "pdfium"
+
+    def extract_pages(self, source: PdfSource) -> List[str]:
+        import pypdfium2 as pdfium
+
+        pages = []
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(source)
+            try:
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
+                    pages.append(text.replace("\r\n", "\n").replace("\r", "\n"))
+            finally:
+                pdf.close()
+        return pages
+
+
+class PdfminerExtractor(PdfExtractor):
+    """pdfminer 原始文本模式（laparams=None），跳过版面分析"""
+
+    name = "pdfminer"
+
+    def extract_pages(self, source: PdfSource) -> List[str]:
+        if isinstance(source, str):
+            with open(source, "rb") as fp:
+                return self._extract(fp)
+        return self._extract(source)
+
+    def _extract(self, fp: BinaryIO) -> List[str]:
+        from pdfminer.converter import TextConverter
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        pages = []
+        rsrcmgr = PDFResourceManager()
+        for page in PDFPage.get_pages(fp):
+            output = StringIO()
+            device = TextConverter(rsrcmgr, output, laparams=None)
+            try:
+                PDFPageInterpreter(rsrcmgr, device).process_page(page)
+            finally:
+                device.close()
+            pages.append(output.getvalue())
+        return pages
+
+
+class PdfplumberExtractor(PdfExtractor):
+    """pdfplumber 版面分析提取，最慢但对复杂排版最稳"""
+
+    name = "pdfplumber"
+
+    def extract_pages(self, source: PdfSource) -> List[str]:
+        import pdfplumber
+
+        with pdfplumber.open(source) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
+
+
+EXTRACTORS: Dict[str, PdfExtractor] = {
+    extractor.name: extractor
+    for extractor in (PdfiumExtractor(), PdfminerExtractor(), PdfplumberExtractor())
+}
+FALLBACK_EXTRACTOR = EXTRACTORS["pdfplumber"]
+
+
+def looks_broken(pages: List[str]) -> bool:
+    """
+    判断提取结果是否不可用（空白页过多、乱码过多）
+
+    Args:
+        pages: 按页的文本
+
+    Returns:
+        True 表示需要回退到 pdfplumber
+    """
+    if not pages:
+        return True
+
+    empty_pages = sum(1 for page in pages if not page.strip())
+    if empty_pages / len(pages) > EMPTY_PAGE_RATIO:
+        return True
+
+    text = _whitespace_pattern.sub("", "".join(pages))
+    if not text:
+        return True
+    garbled = sum(len(match) for match in _garbled_pattern.findall(text))
+    return garbled / len(text) > GARBLED_CHAR_RATIO
+
+
+def extract_pdf_text(source: PdfSource, backend: str = None) -> str:
+    """
+    提取 PDF 文本，默认走快速后端，结果异常时回退到 pdfplumber
+
+    Args:
+        source: 文件路径或二进制文件对象
+        backend: 提取后端 ("pdfium", "pdfminer", "pdfplumber")，默认取配置 pdf_extract_backend
+
+    Returns:
+        文本内容，每页以换行结尾
+    """
+    backend = backend or getattr(config, "pdf_extract_backend", "pdfium")
+    extractor = EXTRACTORS.get(backend)
+    if extractor is None:
+        logger.warning(f"未知的 PDF 提取后端: {backend}，使用 pdfplumber")
+        extractor = FALLBACK_EXTRACTOR
+
+    try:
+        with timed("pdf_parse", extractor.name):
+            pages = extractor.extract_pages(source)
+    except Exception as e:
+        if extractor is FALLBACK_EXTRACTOR:
+            raise
+        logger.warning(f"{extractor.name} 提取 PDF 失败: {e}，回退到 pdfplumber")
+        pages = None
+
+    if extractor is not FALLBACK_EXTRACTOR and (pages is None or looks_broken(pages)):
+        logger.info(f"{extractor.name} 提取结果异常，回退到 pdfplumber")
+        if hasattr(source, "seek"):
+            source.seek(0)
+        with timed("pdf_parse", FALLBACK_EXTRACTOR.name):
+            pages = FALLBACK_EXTRACTOR.extract_pages(source)
+
+    return "".join(page + "\n" for page in pages if page)
@@ -0,0 +1,80 @@
+import asyncio
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from loguru import logger
+
+from app.service.metrics import timed
+from config import config
+
+
+class PdfUnavailable(Exception):
+    pass
+
+
+def html_to_pdf(html: str) -> bytes:
+    """HTML 转 PDF（在子进程中执行）"""
+    from weasyprint import HTML
+    return HTML(string=html).write_pdf()
+
+
+class PdfRenderPool:
+    """ PDF 转换进程池
+
+    HTML 转 PDF 是 CPU 密集型操作，放到固定大小的进程池中执行；
+    同时等待转换的请求数有上限，超出时排队，避免请求高峰占满内存。
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16):
+        """
+        Args:
+            max_workers: 进程数
+            max_pending: 同时提交到进程池的任务数上限
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.pending = 0  # 等待或正在转换的任务数
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("weasyprint") is not None
+
+    async def render(self, html: str) -> bytes:
+        """
+        将 HTML 转换为 PDF
+
+        Args:
+            html: 完整的 HTML 文档
+
+        Returns:
+            PDF 文件内容
+        """
+        if not self.available():
+            raise PdfUnavailable("未安装 weasyprint（见 requirements-pdf.txt），无法生成 PDF")
+        if self._executor is None:
+            # 进程池与信号量在首次使用时创建（信号量绑定当前事件循环）
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            logger.info(f"PDF 转换进程池已启动，进程数 {self.max_workers}")
+        self.pending += 1
+        try:
+            async with self._semaphore:
+                with timed("pdf_render"):
+                    return await asyncio.get_running_loop().run_in_executor(self._executor, html_to_pdf, html)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+
+pdf_render_pool = PdfRenderPool(
+    max_workers=getattr(config, "pdf_workers", 2),
+    max_pending=getattr(config, "pdf_max_pending", 16),
+)
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from typing import List, Optional
+
+from loguru import logger
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """ 采样式 CPU 分析
+
+    采集期间由后台线程按固定间隔读取所有线程的调用栈（sys._current_frames），
+    输出 flamegraph.pl / speedscope 可直接读取的 collapsed stack 格式；
+    不采集时没有任何开销。同一时间只允许一个采集。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float, interval: float = 0.01) -> str:
+        """
+        采集 seconds 秒（阻塞调用，应放到线程中执行）
+
+        Args:
+            seconds: 采集时长
+            interval: 采样间隔（秒）
+
+        Returns:
+            collapsed stack 文本，每行 "线程;外层函数;...;内层函数 次数"
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("已有正在进行的 CPU 采集")
+        try:
+            stacks = Counter()
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            samples = 0
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_name(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    stacks[";".join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(interval)
+            logger.info(f"CPU 采集完成：{seconds}s，{samples} 次采样")
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            self._lock.release()
+
+
+class MemoryTracer:
+    """ 基于 tracemalloc 的内存分配分析
+
+    tracemalloc 只在 start 之后开启（开启后每次分配都有额外开销），stop 后恢复无开销状态；
+    每次 snapshot 返回当前分配最多的位置，以及与上一次 snapshot 的差异。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last: Optional[tracemalloc.Snapshot] = None
+
+    @staticmethod
+    def tracing() -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._last = None
+                logger.info(f"tracemalloc 已开启，记录 {frames} 层调用栈")
+
+    def stop(self):
+        with self._lock:
+            tracemalloc.stop()
+            self._last = None
+            logger.info("tracemalloc 已关闭")
+
+    def snapshot(self, top: int = 20, key_type: str = "lineno") -> dict:
+        """
+        Args:
+            top: 返回的分配位置数
+            key_type: 聚合方式（lineno、filename、traceback）
+
+        Returns:
+            {"traced", "peak", "top": [...], "diff": [...]}，diff 为与上一次 snapshot 的差异
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc 未开启")
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            traced, peak = tracemalloc.get_traced_memory()
+            last, self._last = self._last, snapshot
+
+        return {
+            "traced": traced,
+            "peak": peak,
+            "top": [self._stat(stat) for stat in snapshot.statistics(key_type)[:top]],
+            "diff": [
+                self._stat(stat) for stat in snapshot.compare_to(last, key_type)[:top]
+            ] if last is not None else [],
+        }
+
+    @staticmethod
+    def _stat(stat) -> dict:
+        item = {
+            "trace": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            "size": stat.size,
+            "count": stat.count,
+        }
+        if isinstance(stat, tracemalloc.StatisticDiff):
+            item["size_diff"] = stat.size_diff
+            item["count_diff"] = stat.count_diff
+        return item
+
+
+cpu_profiler = SamplingProfiler()
+memory_tracer = MemoryTracer()
@@ -0,0 +1,168 @@
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from config import config
+
+
+# 英文句点只在其后是空白或文本结尾时断句，避免切开 "v1.2"、"Node.js"
+_sentence_pattern = re.compile(r"(?:[^。！？；!?;.\n]|\.(?!\s|$))+(?:[。！？；!?;]|\.(?=\s|$))?")
+_cjk_pattern = re.compile(r"[\u3000-\u303f\u3400-\u9fff\uff00-\uffef]")
+_word_pattern = re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_\u3000-\u303f\u3400-\u9fff\uff00-\uffef]")
+
+
+def split_sentences(text: str) -> List[str]:
+    """按中英文句末标点与换行切分句子"""
+    return [s.strip() for s in _sentence_pattern.findall(text or "") if s.strip()]
+
+
+def join_sentences(sentences: List[str]) -> str:
+    """拼接句子，英文句子之间补回空格"""
+    text = ""
+    for sentence in sentences:
+        if text and text[-1].isascii() and sentence[0].isascii():
+            text += " "
+        text += sentence
+    return text
+
+
+def estimate_tokens(text: str) -> int:
+    """没有分词器时的估算：每个中文字符约 1 个 token，英文单词约 1.3 个 token"""
+    cjk = len(_cjk_pattern.findall(text))
+    words = _word_pattern.findall(text)
+    return cjk + sum(max(1, round(len(word) / 4)) if word[0].isalnum() else 1 for word in words)
+
+
+class TokenCounter:
+    """ 使用模型的分词器统计 token 数
+
+    分词器（HuggingFace 名称或本地路径）在首次使用时加载，加载失败时退化为估算。
+    """
+
+    def __init__(self, tokenizer: str = ""):
+        self._tokenizer_name = tokenizer
+        self._tokenizer = None
+        self._loaded = not tokenizer
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                from transformers import AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(self._tokenizer_name)
+                logger.info(f"加载分词器 {self._tokenizer_name}")
+            except Exception as e:
+                logger.warning(f"加载分词器 {self._tokenizer_name} 失败，使用估算的 token 数: {e}")
+            self._loaded = True
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if not self._loaded:
+            self._load()
+        if self._tokenizer is None:
+            return estimate_tokens(text)
+        return len(self._tokenizer.encode(text, add_special_tokens=False))
+
+
+def default_embed(texts: List[str], query: str) -> tuple:
+    """使用 BGE-M3 的 dense 向量，返回 (句子向量矩阵, 查询向量)"""
+    from app.cache_pool import get_bge_m3_ef
+
+    ef = get_bge_m3_ef()
+    docs = np.asarray(ef.encode_documents(texts)["dense"], dtype=np.float32)
+    query_vector = np.asarray(ef.encode_queries([query])["dense"][0], dtype=np.float32)
+    return docs, query_vector
+
+
+class PromptCompressor:
+    """ 提示词预算与抽取式压缩
+
+    每个提示词分区（招聘要求、开源项目等）有各自的 token 预算，
+    超出预算的文本按句子与目标（岗位、技术栈）的向量相似度排序，
+    保留最相关的句子直到用满预算，再按原文顺序拼接。
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        budgets: Optional[Dict[str, int]] = None,
+        embed: Callable[[List[str], str], tuple] = default_embed,
+    ):
+        """
+        Args:
+            counter: token 计数器
+            budgets: 各分区的 token 预算，如 {"job_requirements": 600}，未配置的分区不限制
+            embed: 向量化函数，接收句子列表与查询文本，返回 (句子向量矩阵, 查询向量)
+        """
+        self.counter = counter
+        self.budgets = dict(budgets or {})
+        self._embed = embed
+
+    def item_budget(self, section: str, item_num: int) -> Optional[int]:
+        """分区预算平均分给其中的每一项，未配置预算时返回 None"""
+        budget = self.budgets.get(section)
+        if not budget or item_num <= 0:
+            return None
+        return max(1, budget // item_num)
+
+    def fit(self, text: str, query: str, budget: Optional[int]) -> str:
+        """
+        将文本压缩到预算以内
+
+        Args:
+            text: 原文
+            query: 目标描述，用于计算句子相关性
+            budget: token 预算，None 表示不限制
+
+        Returns:
+            压缩后的文本
+        """
+        if not text or budget is None or self.counter.count(text) <= budget:
+            return text or ""
+
+        sentences = split_sentences(text)
+        order = list(range(len(sentences)))
+        if query and len(sentences) > 1:
+            try:
+                vectors, query_vector = self._embed(sentences, query)
+                scores = self._cosine(vectors, query_vector)
+                order = sorted(order, key=lambda i: -scores[i])
+            except Exception as e:
+                logger.warning(f"句子向量化失败，按原文顺序截取: {e}")
+
+        kept, used = [], 0
+        for i in order:
+            tokens = self.counter.count(sentences[i])
+            if used + tokens > budget:
+                continue
+            kept.append(i)
+            used += tokens
+        if not kept:
+            # 单个句子就超出预算时，按字符比例截断最相关的句子
+            sentence = sentences[order[0]]
+            return sentence[:max(1, len(sentence) * budget // self.counter.count(sentence))]
+        return join_sentences([sentences[i] for i in sorted(kept)])
+
+    def fit_section(self, section: str, texts: List[str], query: str) -> List[str]:
+        """按分区预算压缩一组文本，每项分得相同的预算"""
+        budget = self.item_budget(section, len(texts))
+        return [self.fit(text, query, budget) for text in texts]
+
+    @staticmethod
+    def _cosine(vectors: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)
+        return vectors @ query_vector
+
+
+token_counter = TokenCounter(getattr(config, "llm_tokenizer", ""))
+prompt_compressor = PromptCompressor(
+    counter=token_counter,
+    budgets=getattr(config, "prompt_budgets", {}),
+)
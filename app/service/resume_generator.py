@@ -1,24 +1,54 @@
 import json
-from typing import List, Optional
+import asyncio
+import weakref
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from loguru import logger
+from pydantic import ValidationError
 
 from app.schema.generation import (
-    GenerateResumeRequest, GenerateResumeResponse,
-    GenerateProjectRequest, ProjectGenerationResponse
+    GenerateResumeRequest, GenerateResumeResponse, GenerateMultiResumeRequest,
+    GenerateProjectRequest, ProjectGenerationResponse, ResumeDocument
 )
 from app.schema.resume import ProjectDetail, ResumeInfo
-from app.service.search import search_by_resume_requirements
+from app.service.search import (
+    search_by_resume_requirements, search_by_targets, search_job_requirements, search_open_source_projects
+)
+from app.service.llm_client import DeepSeekClient, OpenAIClient
+from app.service.llm_router import LLMRouter
+from app.service.json_stream import JSONObjectStream
+from app.service.llm_cache import LLMResponseCache, llm_response_cache
+from app.service.resume_renderer import render_markdown
+from app.service.prompt_budget import PromptCompressor, TokenCounter, prompt_compressor
+from app.service.generation_store import GenerationStore, generation_store
+from app.service.metrics import timed
 from config import config
 
 
 class ResumeGenerator:
     """简历生成器（使用 LLM）"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        llm_cache: Optional[LLMResponseCache] = None,
+        prompt_compressor: Optional[PromptCompressor] = None,
+        generation_store: Optional[GenerationStore] = None
+    ):
         self.llm_client = self._init_llm_client()
+        self.llm_cache = llm_cache
+        self.generation_store = generation_store
+        # 未指定时只统计 token 数（估算），不压缩
+        self.prompt_compressor = prompt_compressor or PromptCompressor(TokenCounter())
+        # 每个事件循环一个信号量（信号量绑定创建时的事件循环）
+        self._llm_semaphores = weakref.WeakKeyDictionary()
     
     def _init_llm_client(self):
         """初始化 LLM 客户端"""
+        # 配置了可用的服务地址 / API Key 时使用多地址路由
+        router = LLMRouter.from_config()
+        if router.endpoints:
+            return router
+        
         # 根据配置选择 LLM 服务
         llm_type = getattr(config, "llm_type", "deepseek")
         
@@ -30,58 +60,254 @@ class ResumeGenerator:
             logger.warning(f"未知的 LLM 类型: {llm_type}，使用 DeepSeek")
             return DeepSeekClient()
     
-    def generate_resume(self, request: GenerateResumeRequest) -> GenerateResumeResponse:
+    def _llm_params(self, max_tokens: int) -> dict:
+        """影响 LLM 输出的参数，作为缓存 key 的一部分"""
+        return {
+            "provider": self.llm_client.name,
+            "model": self.llm_client.model,
+            "temperature": self.llm_client.temperature,
+            "max_tokens": max_tokens,
+        }
+    
+    def _llm_semaphore(self) -> asyncio.Semaphore:
+        """当前 LLM 服务的并发上限（llm_provider_concurrency），多目标生成时并发调用不超过该值"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._llm_semaphores.get(loop)
+        if semaphore is None:
+            limits = getattr(config, "llm_provider_concurrency", {})
+            semaphore = asyncio.Semaphore(
+                limits.get(self.llm_client.name, getattr(config, "llm_default_concurrency", 8))
+            )
+            self._llm_semaphores[loop] = semaphore
+        return semaphore
+    
+    async def _llm_generate(self, namespace: str, prompt: str, use_cache: bool = True, max_tokens: int = 2000) -> str:
+        """
+        调用 LLM 生成，命中缓存时直接返回
+        
+        Args:
+            namespace: 调用场景（"project"、"resume"），语义缓存按场景启用
+            prompt: 提示词
+            use_cache: 是否使用缓存
+            max_tokens: 最大生成 token 数
+        """
+        use_cache = use_cache and self.llm_cache is not None
+        params = self._llm_params(max_tokens)
+        if use_cache:
+            cached = await self.llm_cache.get(namespace, prompt, params)
+            if cached is not None:
+                await asyncio.to_thread(self._log_tokens, namespace, prompt, cached, True)
+                return cached
+        
+        async with self._llm_semaphore():
+            with timed("llm", self.llm_client.name):
+                text = await self.llm_client.generate(prompt, max_tokens)
+        await asyncio.to_thread(self._log_tokens, namespace, prompt, text)
+        if use_cache and not self.llm_client.is_fallback(text):
+            await self.llm_cache.set(namespace, prompt, params, text)
+        return text
+    
+    async def _llm_stream(
+        self, namespace: str, prompt: str, use_cache: bool = True, max_tokens: int = 2000
+    ) -> AsyncIterator[str]:
+        """
+        流式调用 LLM，命中缓存时一次返回缓存内容，完整生成后写入缓存
+        
+        LLM 的输出在后台任务中读取并缓冲，并发名额与 llm 耗时只计算 LLM 生成的时间，
+        不包括调用方（如较慢的 SSE 客户端）消费增量的时间
+        """
+        use_cache = use_cache and self.llm_cache is not None
+        params = self._llm_params(max_tokens)
+        if use_cache:
+            cached = await self.llm_cache.get(namespace, prompt, params)
+            if cached is not None:
+                await asyncio.to_thread(self._log_tokens, namespace, prompt, cached, True)
+                yield cached
+                return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce():
+            try:
+                async with self._llm_semaphore():
+                    with timed("llm", self.llm_client.name):
+                        async for delta in self.llm_client.stream(prompt, max_tokens):
+                            queue.put_nowait(delta)
+            finally:
+                # 结束标记，异常由 await producer 抛出
+                queue.put_nowait(None)
+        
+        chunks = []
+        producer = asyncio.create_task(produce())
+        try:
+            while (delta := await queue.get()) is not None:
+                chunks.append(delta)
+                yield delta
+            await producer
+        finally:
+            # 调用方提前停止消费时不再继续生成
+            producer.cancel()
+        
+        text = "".join(chunks)
+        await asyncio.to_thread(self._log_tokens, namespace, prompt, text)
+        if use_cache and not self.llm_client.is_fallback(text):
+            await self.llm_cache.set(namespace, prompt, params, text)
+    
+    def _log_tokens(self, namespace: str, prompt: str, completion: str, cached: bool = False):
+        """记录每次 LLM 调用的 token 数（分词器可能需要加载且编码较慢，在线程中调用）"""
+        counter = self.prompt_compressor.counter
+        logger.info(
+            f"LLM 调用 [{namespace}]{'（缓存）' if cached else ''}: "
+            f"prompt {counter.count(prompt)} tokens, completion {counter.count(completion)} tokens"
+        )
+    
+    @staticmethod
+    def _retrieval_inputs(request: GenerateResumeRequest) -> list:
+        """检索阶段的输入"""
+        tech_stack = ", ".join(request.old_resume.tech_stack) if request.old_resume.tech_stack else ""
+        return [
+            request.target_job_title, request.target_city,
+            request.target_salary, request.target_industry, tech_stack
+        ]
+    
+    @staticmethod
+    def _retrieval_savable(search_results: dict) -> bool:
+        """检索失败（Milvus、GitHub/Gitee 不可用）或结果为空时不保存，避免临时故障的结果被长期复用"""
+        return bool(
+            search_results.get("complete", True)
+            and search_results["job_requirements"]
+            and search_results["open_source_projects"]
+        )
+    
+    async def generate_resume(
+        self,
+        request: GenerateResumeRequest,
+        search_results: Optional[dict] = None
+    ) -> GenerateResumeResponse:
         """
         生成完整简历
         
         Args:
             request: 简历生成请求
+            search_results: 已完成的检索结果（多目标生成时批量检索），为空时在此检索
         
         Returns:
             GenerateResumeResponse
         """
         try:
-            # 1. 搜索相关的招聘要求和开源项目
-            search_results = search_by_resume_requirements(
-                job_title=request.target_job_title,
-                city=request.target_city,
-                salary=request.target_salary,
-                industry=request.target_industry,
-                tech_stack=", ".join(request.old_resume.tech_stack) if request.old_resume.tech_stack else None
-            )
+            old_resume = request.old_resume
+            use_cache = request.use_cache
+            tech_stack = ", ".join(old_resume.tech_stack) if old_resume.tech_stack else ""
+            target = f"{request.target_job_title} {tech_stack}".strip()
             
-            # 2. 生成新的项目经验
-            project_request = GenerateProjectRequest(
-                job_requirements=search_results["job_requirements"],
-                open_source_projects=search_results["open_source_projects"],
-                existing_projects=request.old_resume.projects
-            )
+            # 各阶段的输入，输入未变化的阶段直接复用已保存的结果（换模板、改姓名等不需要重新生成）
+            llm_params = self._llm_params(0)
+            llm_params.pop("max_tokens")
+            retrieval_inputs = self._retrieval_inputs(request)
             
-            project_response = self.generate_project_experience(project_request)
-            if not project_response.success:
-                return GenerateResumeResponse(
-                    success=False,
-                    error=project_response.error
+            # 1. 搜索相关的招聘要求和开源项目（同步 IO，放到线程中执行）
+            if search_results is None:
+                search_results = await self._stage(
+                    "retrieval", retrieval_inputs, use_cache,
+                    lambda: asyncio.to_thread(
+                        search_by_resume_requirements,
+                        job_title=request.target_job_title,
+                        city=request.target_city,
+                        salary=request.target_salary,
+                        industry=request.target_industry,
+                        tech_stack=tech_stack or None
+                    ),
+                    savable=self._retrieval_savable
                 )
+            # 后续阶段按实际使用的检索结果（而不是检索参数）计算 key，检索结果变化时重新生成
+            references = [search_results["job_requirements"], search_results["open_source_projects"], target]
             
-            # 3. 合成完整简历
-            resume_content = self._synthesize_resume(
-                old_resume=request.old_resume,
-                new_projects=project_response.projects,
-                job_requirements=search_results["job_requirements"][:3],  # 取前3个作为参考
-                template_id=request.template_id
-            )
+            # 单次调用模式：一次生成结构化简历，在本地渲染 Markdown
+            document = None
+            if self._generation_mode(request) == "single":
+                document_inputs = [
+                    references,
+                    old_resume.dict(include={"tech_stack", "projects", "education", "work_experience"}),
+                    llm_params
+                ]
+                
+                async def generate_document():
+                    document = await self._generate_document(request, search_results, target)
+                    return document.dict() if document is not None else None
+                
+                document_data = await self._stage("document", document_inputs, use_cache, generate_document)
+                document = ResumeDocument(**document_data) if document_data is not None else None
             
-            # 4. 生成 PDF（如果需要）
-            pdf_path = None
-            if getattr(config, "generate_pdf", True):
-                pdf_path = self._generate_pdf(resume_content, request.old_resume.name or "resume")
+            if document is not None:
+                new_projects = document.projects
+                resume_content = render_markdown(old_resume, document, request.template_id)
+            else:
+                # 2. 生成新的项目经验
+                project_inputs = [
+                    references, [project.dict() for project in old_resume.projects], llm_params
+                ]
+                responses = []
+                
+                async def generate_projects():
+                    projects, response_text = await self._generate_projects(GenerateProjectRequest(
+                        job_requirements=search_results["job_requirements"],
+                        open_source_projects=search_results["open_source_projects"],
+                        existing_projects=old_resume.projects,
+                        target=target,
+                        use_cache=use_cache
+                    ))
+                    responses.append(response_text)
+                    return [project.dict() for project in projects]
+                
+                new_projects = [
+                    ProjectDetail(**project)
+                    for project in await self._stage(
+                        "projects", project_inputs, use_cache, generate_projects,
+                        savable=lambda _: not any(self.llm_client.is_fallback(text) for text in responses)
+                    )
+                ]
+                
+                # 3. 合成完整简历
+                job_requirements = search_results["job_requirements"][:3]  # 取前3个作为参考
+                resume_inputs = [
+                    [project.dict() for project in new_projects],
+                    job_requirements,
+                    target,
+                    old_resume.dict(include={"name", "age", "tech_stack", "education", "work_experience"}),
+                    llm_params
+                ]
+                resume_content = await self._stage(
+                    "resume", resume_inputs, use_cache,
+                    lambda: self._synthesize_resume(
+                        old_resume=old_resume,
+                        new_projects=new_projects,
+                        job_requirements=job_requirements,
+                        template_id=request.template_id,
+                        target=target,
+                        use_cache=use_cache
+                    ),
+                    savable=lambda text: not self.llm_client.is_fallback(text)
+                )
+            
+            # 4. 保存结果，之后可按 result_id 换模板渲染或修改部分参数重新生成
+            result_id = None
+            if self.generation_store is not None:
+                result_id = await asyncio.to_thread(
+                    self.generation_store.save_result,
+                    request.dict(),
+                    {
+                        "resume_content": resume_content,
+                        "new_projects": [project.dict() for project in new_projects],
+                        "document": document.dict() if document is not None else None
+                    }
+                )
             
+            # PDF 不在此生成，通过 /resume/render 按模板在内存中渲染
             return GenerateResumeResponse(
                 success=True,
                 resume_content=resume_content,
-                resume_pdf_path=pdf_path,
-                new_projects=project_response.projects
+                new_projects=new_projects,
+                result_id=result_id
             )
         
         except Exception as e:
@@ -91,7 +317,249 @@ class ResumeGenerator:
                 error=str(e)
             )
     
-    def generate_project_experience(
+    async def generate_resumes(self, request: GenerateMultiResumeRequest) -> List[GenerateResumeResponse]:
+        """
+        同一份简历针对多个目标生成多个版本
+        
+        所有目标先一次批量检索（共享查询向量化与开源项目搜索），
+        再并发生成各版本，LLM 并发数受 llm_provider_concurrency 限制；
+        完全相同的目标只生成一次。
+        
+        Args:
+            request: 多目标生成请求
+        
+        Returns:
+            与 request.targets 一一对应的 GenerateResumeResponse
+        """
+        requests = [
+            GenerateResumeRequest(
+                old_resume=request.old_resume,
+                target_job_title=target.target_job_title,
+                target_city=target.target_city,
+                target_salary=target.target_salary,
+                target_industry=target.target_industry,
+                template_id=target.template_id or request.template_id,
+                use_cache=request.use_cache,
+                mode=request.mode
+            )
+            for target in request.targets
+        ]
+        unique = list({json.dumps(r.dict(), sort_keys=True, ensure_ascii=False): r for r in requests}.items())
+        
+        try:
+            search_results = await self._search_targets([r for _, r in unique], request.use_cache)
+        except Exception as e:
+            logger.error(f"批量检索失败: {e}")
+            return [GenerateResumeResponse(success=False, error=str(e)) for _ in requests]
+        
+        responses = await asyncio.gather(*(
+            self.generate_resume(r, search_results=results)
+            for (_, r), results in zip(unique, search_results)
+        ))
+        by_key = {key: response for (key, _), response in zip(unique, responses)}
+        return [by_key[json.dumps(r.dict(), sort_keys=True, ensure_ascii=False)] for r in requests]
+    
+    async def _search_targets(self, requests: List[GenerateResumeRequest], use_cache: bool) -> List[dict]:
+        """多个目标的检索阶段：已保存的结果直接复用，其余目标一次批量检索"""
+        results: List[Optional[dict]] = [None] * len(requests)
+        keys = []
+        if self.generation_store is not None:
+            keys = [
+                self.generation_store.stage_key("retrieval", self._retrieval_inputs(r)) for r in requests
+            ]
+            if use_cache:
+                results = await asyncio.gather(*(
+                    asyncio.to_thread(self.generation_store.get_stage, key) for key in keys
+                ))
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            tech_stack = self._retrieval_inputs(requests[0])[-1]
+            searched = await asyncio.to_thread(
+                search_by_targets,
+                [
+                    {
+                        "job_title": requests[i].target_job_title,
+                        "city": requests[i].target_city,
+                        "salary": requests[i].target_salary,
+                        "industry": requests[i].target_industry,
+                    }
+                    for i in missing
+                ],
+                tech_stack=tech_stack or None
+            )
+            for i, result in zip(missing, searched):
+                results[i] = result
+                if keys and self._retrieval_savable(result):
+                    await asyncio.to_thread(self.generation_store.set_stage, keys[i], result)
+        logger.info(f"多目标检索: {len(requests)} 个目标，{len(missing)} 个重新检索")
+        return results
+    
+    async def _stage(
+        self,
+        stage: str,
+        inputs: Any,
+        use_cache: bool,
+        compute: Callable[[], Awaitable[Any]],
+        savable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        执行一个生成阶段，相同输入的结果已保存时直接复用
+        
+        Args:
+            stage: 阶段名（retrieval、projects、resume、document）
+            inputs: 该阶段实际使用的全部输入（可 JSON 序列化）
+            use_cache: 为 False 时强制重新执行（结果仍会保存）
+            compute: 执行该阶段的协程函数，返回值为 None 时不保存
+            savable: 判断结果是否可以保存（检索失败、LLM 备用响应等不保存）
+        """
+        if self.generation_store is None:
+            return await compute()
+        key = self.generation_store.stage_key(stage, inputs)
+        if use_cache:
+            value = await asyncio.to_thread(self.generation_store.get_stage, key)
+            if value is not None:
+                logger.info(f"复用已保存的生成结果: {stage}")
+                return value
+        value = await compute()
+        if value is not None and (savable is None or savable(value)):
+            await asyncio.to_thread(self.generation_store.set_stage, key, value)
+        return value
+    
+    async def stream_resume(self, request: GenerateResumeRequest) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        流式生成简历，每个阶段的结果就绪后立即返回
+        
+        事件依次为：
+            ("retrieval", {"job_requirements": [...]}) 与 ("retrieval", {"open_source_projects": [...]})，先完成的先返回
+            ("project", {...})：每个项目的 JSON 对象在 token 流中完整到达时返回
+            ("resume", {"delta": "..."})：简历 Markdown 的增量文本
+            ("done", {})
+        
+        Args:
+            request: 简历生成请求
+        
+        Returns:
+            (事件名, 数据) 的异步迭代器
+        """
+        # 1. 招聘要求与开源项目并行检索
+        tech_stack = ", ".join(request.old_resume.tech_stack) if request.old_resume.tech_stack else None
+        query_text = f"{request.target_job_title} {tech_stack or ''}"
+        tasks = {
+            asyncio.create_task(asyncio.to_thread(
+                search_job_requirements,
+                query=query_text,
+                city=request.target_city,
+                salary=request.target_salary,
+                industry=request.target_industry,
+                top_k=5
+            )): "job_requirements",
+            asyncio.create_task(asyncio.to_thread(
+                search_open_source_projects,
+                query=query_text,
+                industry=request.target_industry,
+                tech_stack=tech_stack,
+                top_k=5
+            )): "open_source_projects",
+        }
+        search_results = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    search_results[tasks[task]] = task.result()
+                    yield "retrieval", {tasks[task]: search_results[tasks[task]]}
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        # 单次调用模式：结构化简历生成完成后依次返回项目与本地渲染的 Markdown
+        if self._generation_mode(request) == "single":
+            document = await self._generate_document(request, search_results, query_text)
+            if document is not None:
+                for project in document.projects:
+                    yield "project", project.dict()
+                yield "resume", {"delta": render_markdown(request.old_resume, document, request.template_id)}
+                yield "done", {}
+                return
+        
+        # 2. 流式生成项目经验，每个项目完整后立即返回
+        prompt = await asyncio.to_thread(
+            self._build_project_prompt,
+            job_requirements=search_results["job_requirements"],
+            open_source_projects=search_results["open_source_projects"],
+            existing_projects=request.old_resume.projects,
+            target=query_text
+        )
+        object_stream = JSONObjectStream()
+        chunks = []
+        projects = []
+        async for delta in self._llm_stream("project", prompt, use_cache=request.use_cache):
+            chunks.append(delta)
+            for item in object_stream.feed(delta):
+                if len(projects) < 5:
+                    projects.append(self._project_from_dict(item))
+                    yield "project", projects[-1].dict()
+        if not projects:
+            # 增量解析失败时按完整文本再解析一次
+            projects = self._parse_project_response("".join(chunks))
+            for project in projects:
+                yield "project", project.dict()
+        
+        # 3. 流式合成简历
+        prompt = await asyncio.to_thread(
+            self._build_resume_prompt,
+            old_resume=request.old_resume,
+            new_projects=projects,
+            job_requirements=search_results["job_requirements"][:3],
+            template_id=request.template_id,
+            target=query_text
+        )
+        async for delta in self._llm_stream("resume", prompt, use_cache=request.use_cache):
+            yield "resume", {"delta": delta}
+        
+        yield "done", {}
+    
+    @staticmethod
+    def _generation_mode(request: GenerateResumeRequest) -> str:
+        return request.mode or getattr(config, "resume_generation_mode", "two_pass")
+    
+    async def _generate_document(
+        self,
+        request: GenerateResumeRequest,
+        search_results: dict,
+        target: str
+    ) -> Optional[ResumeDocument]:
+        """
+        单次 LLM 调用生成结构化简历（项目经验 + 简历各部分）
+        
+        Args:
+            request: 简历生成请求
+            search_results: 检索到的招聘要求与开源项目
+            target: 目标岗位与技术栈
+        
+        Returns:
+            ResumeDocument，输出不符合结构时返回 None（由调用方退回两次调用模式）
+        """
+        prompt = await asyncio.to_thread(
+            self._build_document_prompt,
+            old_resume=request.old_resume,
+            job_requirements=search_results["job_requirements"],
+            open_source_projects=search_results["open_source_projects"],
+            target=target
+        )
+        response_text = await self._llm_generate("document", prompt, use_cache=request.use_cache, max_tokens=4000)
+        try:
+            data = json.loads(self._strip_code_fence(response_text))
+            document = ResumeDocument(**data)
+            document.projects = document.projects[:5]
+            return document
+        except (json.JSONDecodeError, TypeError, ValidationError) as e:
+            logger.warning(f"结构化简历解析失败，退回两次调用模式: {e}")
+            return None
+    
+    async def generate_project_experience(
         self, 
         request: GenerateProjectRequest
     ) -> ProjectGenerationResponse:
@@ -105,18 +573,7 @@ class ResumeGenerator:
             ProjectGenerationResponse
         """
         try:
-            # 构建提示词
-            prompt = self._build_project_prompt(
-                job_requirements=request.job_requirements,
-                open_source_projects=request.open_source_projects,
-                existing_projects=request.existing_projects
-            )
-            
-            # 调用 LLM 生成
-            response_text = self.llm_client.generate(prompt)
-            
-            # 解析响应
-            projects = self._parse_project_response(response_text)
+            projects, _ = await self._generate_projects(request)
             
             return ProjectGenerationResponse(
                 success=True,
@@ -131,66 +588,171 @@ class ResumeGenerator:
                 projects=[]
             )
     
+    async def _generate_projects(self, request: GenerateProjectRequest) -> Tuple[List[ProjectDetail], str]:
+        """生成项目经验，返回 (项目列表, LLM 原始回复)"""
+        # 构建提示词（压缩需要计算句子向量，放到线程中执行）
+        prompt = await asyncio.to_thread(
+            self._build_project_prompt,
+            job_requirements=request.job_requirements,
+            open_source_projects=request.open_source_projects,
+            existing_projects=request.existing_projects,
+            target=request.target
+        )
+        
+        # 调用 LLM 生成
+        response_text = await self._llm_generate("project", prompt, use_cache=request.use_cache)
+        
+        # 解析响应
+        return self._parse_project_response(response_text), response_text
+    
     def _build_project_prompt(
         self,
         job_requirements: List[dict],
         open_source_projects: List[dict],
-        existing_projects: Optional[List[ProjectDetail]] = None
+        existing_projects: Optional[List[ProjectDetail]] = None,
+        target: Optional[str] = None
     ) -> str:
         """构建项目生成提示词"""
-        prompt = """你是一个专业的简历生成助手。根据招聘要求和开源项目信息，生成或增强项目经验。
+        prompt = "你是一个专业的简历生成助手。根据招聘要求和开源项目信息，生成或增强项目经验。\n\n"
+        prompt += self._build_reference_prompt(job_requirements, open_source_projects, existing_projects, target)
+        prompt += """
+## 要求：
+1. 项目名称要专业、具体
+2. 技术栈要匹配招聘要求
+3. 项目描述要详细，包含核心功能和技术难点
+4. 职责描述要具体，体现技术深度
+5. 如果是增强现有项目，要自然融合新功能
 
-## 招聘要求（参考）：
+请以 JSON 格式返回，格式如下：
+[
+  {
+    "name": "项目名称",
+    "description": "项目描述（200-500字）",
+    "tech_stack": ["技术1", "技术2", ...],
+    "responsibilities": ["职责1", "职责2", ...],
+    "duration": "项目时长（可选）"
+  }
+]
 """
-        for i, jr in enumerate(job_requirements[:3], 1):
+        return prompt
+    
+    def _build_reference_prompt(
+        self,
+        job_requirements: List[dict],
+        open_source_projects: List[dict],
+        existing_projects: Optional[List[ProjectDetail]] = None,
+        target: Optional[str] = None
+    ) -> str:
+        """
+        构建参考资料部分（招聘要求、开源项目、现有项目）
+        
+        招聘要求、开源项目描述、现有项目描述按各自的 token 预算压缩，
+        保留与 target（目标岗位、技术栈）最相关的句子
+        """
+        compressor = self.prompt_compressor
+        job_requirements = job_requirements[:3]
+        open_source_projects = open_source_projects[:3]
+        existing_projects = (existing_projects or [])[:2]
+        if not target:
+            target = " ".join(jr.get("job_title", "") for jr in job_requirements)
+        job_details = compressor.fit_section(
+            "job_requirements", [jr.get("job_detail", "") for jr in job_requirements], target
+        )
+        descriptions = compressor.fit_section(
+            "open_source_projects",
+            [project.get("description", "") for project in open_source_projects],
+            target
+        )
+        if compressor.item_budget("open_source_projects", len(descriptions)) is None:
+            descriptions = [description[:200] for description in descriptions]
+        existing_descriptions = compressor.fit_section(
+            "existing_projects", [project.description for project in existing_projects], target
+        )
+        
+        prompt = "## 招聘要求（参考）：\n"
+        for i, (jr, job_detail) in enumerate(zip(job_requirements, job_details), 1):
             prompt += f"""
 {i}. 岗位：{jr.get('job_title', '')}
    公司：{jr.get('company_name', '')}
    行业：{jr.get('company_industry', '')}
-   要求：{jr.get('job_detail', '')}
+   要求：{job_detail}
 """
         
         prompt += "\n## 开源项目（参考）：\n"
-        for i, project in enumerate(open_source_projects[:3], 1):
+        for i, (project, description) in enumerate(zip(open_source_projects, descriptions), 1):
             prompt += f"""
 {i}. 项目名称：{project.get('project_name', '')}
    技术栈：{project.get('tech_stack', '')}
-   描述：{project.get('description', '')[:200]}
+   描述：{description}
 """
         
         if existing_projects:
             prompt += "\n## 现有项目经验（可在此基础上增强）：\n"
-            for i, project in enumerate(existing_projects[:2], 1):
+            for i, (project, description) in enumerate(zip(existing_projects, existing_descriptions), 1):
                 prompt += f"""
 {i}. {project.name}
    技术栈：{', '.join(project.tech_stack)}
-   描述：{project.description}
+   描述：{description}
 """
             prompt += "\n请基于现有项目，添加新的功能点，使其更符合招聘要求。\n"
         else:
             prompt += "\n请根据招聘要求和开源项目，生成2-3个新的项目经验。\n"
-        
+        return prompt
+    
+    def _build_document_prompt(
+        self,
+        old_resume: ResumeInfo,
+        job_requirements: List[dict],
+        open_source_projects: List[dict],
+        target: Optional[str] = None
+    ) -> str:
+        """构建单次调用模式的提示词：一次生成项目经验与简历各部分的结构化内容"""
+        prompt = f"""你是一个专业的简历生成助手。根据候选人信息、招聘要求和开源项目信息，生成一份针对目标岗位的简历内容。
+
+## 候选人信息
+- 技术栈：{', '.join(old_resume.tech_stack) if old_resume.tech_stack else '待补充'}
+"""
+        if old_resume.work_experience:
+            prompt += f"- 工作经历：{old_resume.work_experience}\n"
+        if old_resume.education:
+            prompt += f"- 教育经历：{old_resume.education}\n"
+        prompt += "\n"
+        prompt += self._build_reference_prompt(job_requirements, open_source_projects, old_resume.projects, target)
         prompt += """
 ## 要求：
-1. 项目名称要专业、具体
-2. 技术栈要匹配招聘要求
-3. 项目描述要详细，包含核心功能和技术难点
-4. 职责描述要具体，体现技术深度
-5. 如果是增强现有项目，要自然融合新功能
+1. 项目名称要专业、具体，技术栈要匹配招聘要求
+2. 项目描述要详细，包含核心功能和技术难点；职责描述要具体，体现技术深度
+3. 个人简介 2-3 句话，突出与目标岗位匹配的经验
+4. 工作经历、教育经历在原有内容基础上润色，不得编造公司、学校或时间
 
-请以 JSON 格式返回，格式如下：
-[
-  {
-    "name": "项目名称",
-    "description": "项目描述（200-500字）",
-    "tech_stack": ["技术1", "技术2", ...],
-    "responsibilities": ["职责1", "职责2", ...],
-    "duration": "项目时长（可选）"
-  }
-]
+只返回一个 JSON 对象，不要输出其他内容，格式如下：
+{
+  "summary": "个人简介",
+  "tech_stack": ["技术1", "技术2", ...],
+  "projects": [
+    {
+      "name": "项目名称",
+      "description": "项目描述（200-500字）",
+      "tech_stack": ["技术1", "技术2", ...],
+      "responsibilities": ["职责1", "职责2", ...],
+      "duration": "项目时长（可选）"
+    }
+  ],
+  "work_experience": "工作经历（可选）",
+  "education": "教育经历（可选）"
+}
 """
         return prompt
     
+    @staticmethod
+    def _strip_code_fence(response_text: str) -> str:
+        """移除可能的 markdown 代码块标记"""
+        text = response_text.strip()
+        if text.startswith("```"):
+            lines = text.split("\n")
+            text = "\n".join(lines[1:-1]) if lines[-1].strip() == "```" else "\n".join(lines[1:])
+        return text
+    
     def _parse_project_response(self, response_text: str) -> List[ProjectDetail]:
         """解析 LLM 返回的项目经验"""
         projects = []
@@ -198,35 +760,16 @@ class ResumeGenerator:
         try:
             # 尝试提取 JSON
             # 移除可能的 markdown 代码块标记
-            text = response_text.strip()
-            if text.startswith("```"):
-                # 移除代码块标记
-                lines = text.split("\n")
-                text = "\n".join(lines[1:-1]) if lines[-1].strip() == "```" else "\n".join(lines[1:])
+            text = self._strip_code_fence(response_text)
             
             # 尝试解析 JSON
             data = json.loads(text)
             
             if isinstance(data, list):
-                for item in data:
-                    project = ProjectDetail(
-                        name=item.get("name", "未命名项目"),
-                        description=item.get("description", ""),
-                        tech_stack=item.get("tech_stack", []),
-                        responsibilities=item.get("responsibilities", []),
-                        duration=item.get("duration")
-                    )
-                    projects.append(project)
+                projects = [self._project_from_dict(item) for item in data]
             elif isinstance(data, dict):
                 # 单个项目
-                project = ProjectDetail(
-                    name=data.get("name", "未命名项目"),
-                    description=data.get("description", ""),
-                    tech_stack=data.get("tech_stack", []),
-                    responsibilities=data.get("responsibilities", []),
-                    duration=data.get("duration")
-                )
-                projects.append(project)
+                projects = [self._project_from_dict(data)]
         
         except json.JSONDecodeError:
             # 如果 JSON 解析失败，尝试用正则表达式提取
@@ -235,6 +778,17 @@ class ResumeGenerator:
         
         return projects[:5]  # 最多返回5个项目
     
+    @staticmethod
+    def _project_from_dict(item: dict) -> ProjectDetail:
+        """将 LLM 返回的单个项目对象转换为 ProjectDetail"""
+        return ProjectDetail(
+            name=item.get("name", "未命名项目"),
+            description=item.get("description", ""),
+            tech_stack=item.get("tech_stack", []),
+            responsibilities=item.get("responsibilities", []),
+            duration=item.get("duration")
+        )
+    
     def _extract_projects_from_text(self, text: str) -> List[ProjectDetail]:
         """从文本中提取项目信息（备用方法）"""
         projects = []
@@ -242,14 +796,36 @@ class ResumeGenerator:
         # 这里可以实现更复杂的解析
         return projects
     
-    def _synthesize_resume(
+    async def _synthesize_resume(
         self,
         old_resume: ResumeInfo,
         new_projects: List[ProjectDetail],
         job_requirements: List[dict],
-        template_id: Optional[str] = None
+        template_id: Optional[str] = None,
+        target: Optional[str] = None,
+        use_cache: bool = True
     ) -> str:
         """合成完整简历"""
+        prompt = await asyncio.to_thread(
+            self._build_resume_prompt, old_resume, new_projects, job_requirements, template_id, target
+        )
+        
+        # 调用 LLM 生成简历
+        resume_content = await self._llm_generate("resume", prompt, use_cache=use_cache)
+        return resume_content
+    
+    def _build_resume_prompt(
+        self,
+        old_resume: ResumeInfo,
+        new_projects: List[ProjectDetail],
+        job_requirements: List[dict],
+        template_id: Optional[str] = None,
+        target: Optional[str] = None
+    ) -> str:
+        """构建简历合成提示词，项目描述按 resume_projects 分区的预算压缩"""
+        descriptions = self.prompt_compressor.fit_section(
+            "resume_projects", [project.description for project in new_projects], target or ""
+        )
         prompt = f"""根据以下信息生成一份完整的简历（Markdown 格式）：
 
 ## 个人信息
@@ -261,11 +837,11 @@ class ResumeGenerator:
 
 ## 项目经验
 """
-        for i, project in enumerate(new_projects, 1):
+        for i, (project, description) in enumerate(zip(new_projects, descriptions), 1):
             prompt += f"""
 ### {i}. {project.name}
 **技术栈：** {', '.join(project.tech_stack)}
-**项目描述：** {project.description}
+**项目描述：** {description}
 **主要职责：**
 """
             for resp in project.responsibilities:
@@ -278,112 +854,22 @@ class ResumeGenerator:
             prompt += f"\n## 工作经历\n{old_resume.work_experience}\n"
         
         prompt += "\n请生成格式良好的 Markdown 简历，包含所有必要部分。"
-        
-        # 调用 LLM 生成简历
-        resume_content = self.llm_client.generate(prompt)
-        return resume_content
-    
-    def _generate_pdf(self, content: str, filename: str) -> Optional[str]:
-        """生成 PDF 文件"""
-        try:
-            # 这里可以使用 markdown2pdf 或 weasyprint
-            # 暂时返回 None，后续实现
-            logger.info(f"PDF 生成功能待实现: {filename}")
-            return None
-        except Exception as e:
-            logger.error(f"生成 PDF 失败: {e}")
-            return None
-
-
-class DeepSeekClient:
-    """DeepSeek API 客户端"""
-    
-    def __init__(self):
-        self.api_key = getattr(config, "deepseek_api_key", "")
-        self.base_url = getattr(config, "deepseek_base_url", "https://api.deepseek.com/v1/chat/completions")
-    
-    def generate(self, prompt: str, max_tokens: int = 2000) -> str:
-        """调用 DeepSeek API 生成文本"""
-        import requests
-        
-        if not self.api_key:
-            logger.warning("DeepSeek API Key 未配置，返回示例文本")
-            return self._get_fallback_response()
-        
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": getattr(config, "deepseek_model", "deepseek-chat"),
-                "messages": [
-                    {"role": "system", "content": "你是一个专业的简历生成助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": max_tokens
-            }
-            
-            response = requests.post(self.base_url, json=data, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-        
-        except Exception as e:
-            logger.error(f"DeepSeek API 调用失败: {e}")
-            return self._get_fallback_response()
-    
-    def _get_fallback_response(self) -> str:
-        """返回备用响应"""
-        return """[
-  {
-    "name": "示例项目",
-    "description": "这是一个示例项目描述",
-    "tech_stack": ["Python", "FastAPI"],
-    "responsibilities": ["负责后端开发", "实现 API 接口"]
-  }
-]"""
-
+        return prompt
 
-class OpenAIClient:
-    """OpenAI API 客户端（备用）"""
-    
-    def __init__(self):
-        self.api_key = getattr(config, "openai_api_key", "")
-        self.base_url = "https://api.openai.com/v1/chat/completions"
-    
-    def generate(self, prompt: str, max_tokens: int = 2000) -> str:
-        """调用 OpenAI API"""
-        import requests
-        
-        if not self.api_key:
-            raise ValueError("OpenAI API Key 未配置")
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "gpt-3.5-turbo",
-            "messages": [
-                {"role": "system", "content": "你是一个专业的简历生成助手。"},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.7,
-            "max_tokens": max_tokens
-        }
-        
-        response = requests.post(self.base_url, json=data, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
 
+# 全局实例在首次使用（或启动预热）时创建，导入时不初始化
+resume_generator: Optional[ResumeGenerator] = None
+_resume_generator_lock = threading.Lock()
 
-# 创建全局实例
-resume_generator = ResumeGenerator()
 
+def get_resume_generator() -> ResumeGenerator:
+    """获取全局简历生成器，延迟创建"""
+    global resume_generator
+    with _resume_generator_lock:
+        if resume_generator is None:
+            resume_generator = ResumeGenerator(
+                llm_cache=llm_response_cache,
+                prompt_compressor=prompt_compressor,
+                generation_store=generation_store
+            )
+        return resume_generator
@@ -1,19 +1,31 @@
+import io
 import re
-import os
-from typing import Optional
+import threading
+from typing import Optional, Union, BinaryIO
 from pathlib import Path
 
-import pdfplumber
-from docx import Document
-
 from app.schema.resume import ResumeInfo, ProjectDetail, ResumeParseResponse
+from app.service.pdf_extractor import extract_pdf_text
+from app.service.parse_cache import ParseResultCache, parse_result_cache
+from app.service.resume_sectionizer import KeywordMatcher, SectionKind, sectionize, section_text
 from loguru import logger
 
 
+# 解析逻辑变化时递增，使旧的解析缓存失效
+PARSER_VERSION = "2"
+
+_name_pattern = re.compile(r"^[\u4e00-\u9fa5]{2,4}$")
+_age_pattern = re.compile(r"年龄[：:]\s*(\d+)|(\d+)岁|age[：:]\s*(\d+)", re.IGNORECASE)
+_education_field_pattern = re.compile(r"(?:学历|毕业院校|毕业学校)[：:]\s*([^\n]+)")
+_project_item_pattern = re.compile(r"^[ \t]*项目(?:名称)?[：:][ \t]*", re.MULTILINE)
+_responsibility_pattern = re.compile(r"负责|实现|开发|设计|优化")
+
+
 class ResumeParser:
     """简历解析器"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseResultCache] = None):
+        self.cache = cache
         self.tech_keywords = [
             "Python", "Java", "Golang", "Go", "JavaScript", "TypeScript",
             "React", "Vue", "Angular", "Spring", "Django", "Flask",
@@ -21,10 +33,13 @@ class ResumeParser:
             "Docker", "Kubernetes", "Linux", "Git",
             "微服务", "分布式", "高并发", "大数据", "AI", "机器学习"
         ]
+        # 创建时编译（约 1ms），不放到首个解析请求中
+        self.tech_matcher = KeywordMatcher(self.tech_keywords)
     
     def parse(self, file_path: Optional[str] = None, 
               file_content: Optional[bytes] = None,
-              file_type: str = "pdf") -> ResumeParseResponse:
+              file_type: str = "pdf",
+              use_cache: bool = True) -> ResumeParseResponse:
         """
         解析简历文件
         
@@ -32,10 +47,22 @@ class ResumeParser:
             file_path: 文件路径
             file_content: 文件内容（bytes）
             file_type: 文件类型 ("pdf", "txt", "docx", "md")
+            use_cache: 是否使用解析缓存（仅对 file_content 生效）
         
         Returns:
             ResumeParseResponse
         """
+        cache_key = None
+        if self.cache is not None and use_cache and file_content and not file_path:
+            cache_key = self.cache.make_key(file_content, file_type, PARSER_VERSION)
+            resume_info = self.cache.lookup(cache_key)
+            if resume_info is not None:
+                return ResumeParseResponse(
+                    success=True,
+                    resume_info=resume_info,
+                    cached=True
+                )
+        
         try:
             if file_path:
                 text = self._read_file(file_path, file_type)
@@ -57,6 +84,9 @@ class ResumeParser:
             resume_info = self._parse_resume_text(text)
             resume_info.raw_text = text
             
+            if cache_key:
+                self.cache.store(cache_key, resume_info)
+            
             return ResumeParseResponse(
                 success=True,
                 resume_info=resume_info
@@ -85,51 +115,37 @@ class ResumeParser:
             raise ValueError(f"不支持的文件类型: {file_type}")
     
     def _read_content(self, content: bytes, file_type: str) -> str:
-        """从 bytes 读取内容"""
+        """从 bytes 读取内容（直接在内存中解析，不落盘）"""
         if file_type.lower() == "pdf":
-            # 对于 PDF，需要先保存到临时文件
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(content)
-                tmp_path = tmp.name
-            try:
-                text = self._read_pdf(tmp_path)
-            finally:
-                os.unlink(tmp_path)
-            return text
+            return self._read_pdf(io.BytesIO(content))
         elif file_type.lower() in ["txt", "md"]:
             return content.decode("utf-8")
         elif file_type.lower() == "docx":
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                tmp.write(content)
-                tmp_path = tmp.name
-            try:
-                text = self._read_docx(tmp_path)
-            finally:
-                os.unlink(tmp_path)
-            return text
+            return self._read_docx(io.BytesIO(content))
         else:
             raise ValueError(f"不支持的文件类型: {file_type}")
     
-    def _read_pdf(self, file_path: str) -> str:
-        """读取 PDF 文件"""
-        text = ""
+    def _read_pdf(self, source: Union[str, BinaryIO]) -> str:
+        """读取 PDF 文件（默认快速后端，结果异常时回退 pdfplumber）
+        
+        Args:
+            source: 文件路径或二进制文件对象（如 BytesIO）
+        """
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            return extract_pdf_text(source)
         except Exception as e:
             logger.error(f"读取 PDF 失败: {e}")
             raise
-        return text
     
-    def _read_docx(self, file_path: str) -> str:
-        """读取 Word 文档"""
+    def _read_docx(self, source: Union[str, BinaryIO]) -> str:
+        """读取 Word 文档
+        
+        Args:
+            source: 文件路径或二进制文件对象（如 BytesIO）
+        """
         try:
-            doc = Document(file_path)
+            from docx import Document
+            doc = Document(source)
             text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             return text
         except Exception as e:
@@ -137,37 +153,43 @@ class ResumeParser:
             raise
     
     def _parse_resume_text(self, text: str) -> ResumeInfo:
-        """解析简历文本"""
+        """解析简历文本（先一次切分段落，各字段只在各自的段落中提取）"""
         resume_info = ResumeInfo()
+        sections = sectionize(text)
+        basic = section_text(sections, SectionKind.BASIC)
         
         # 提取姓名
-        resume_info.name = self._extract_name(text)
+        resume_info.name = self._extract_name(basic)
         
         # 提取年龄
-        resume_info.age = self._extract_age(text)
+        resume_info.age = self._extract_age(basic)
         
-        # 提取技术栈
+        # 提取技术栈（全文一次扫描）
         resume_info.tech_stack = self._extract_tech_stack(text)
         
-        # 提取项目经验
-        resume_info.projects = self._extract_projects(text)
+        # 提取项目经验，没有项目段落时退化为全文逐行识别
+        projects = section_text(sections, SectionKind.PROJECTS)
+        resume_info.projects = self._extract_projects(projects or text, has_section=bool(projects))
         
         # 提取教育经历
-        resume_info.education = self._extract_education(text)
+        resume_info.education = self._extract_education(
+            section_text(sections, SectionKind.EDUCATION), basic
+        )
         
         # 提取工作经历
-        resume_info.work_experience = self._extract_work_experience(text)
+        resume_info.work_experience = self._extract_work_experience(
+            section_text(sections, SectionKind.WORK)
+        )
         
         return resume_info
     
     def _extract_name(self, text: str) -> Optional[str]:
         """提取姓名"""
         # 尝试从开头提取姓名（通常在简历开头）
-        lines = text.split("\n")[:5]
+        lines = text.split("\n", 5)[:5]
         for line in lines:
-            line = line.strip()
             # 匹配中文姓名（2-4个字符）
-            match = re.search(r"^[\u4e00-\u9fa5]{2,4}$", line)
+            match = _name_pattern.match(line.strip())
             if match:
                 return match.group()
         return None
@@ -175,73 +197,48 @@ class ResumeParser:
     def _extract_age(self, text: str) -> Optional[int]:
         """提取年龄"""
         # 匹配年龄模式：年龄：25、25岁、age: 25 等
-        patterns = [
-            r"年龄[：:]\s*(\d+)",
-            r"(\d+)岁",
-            r"age[：:]\s*(\d+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    age = int(match.group(1))
-                    if 18 <= age <= 100:  # 合理年龄范围
-                        return age
-                except:
-                    pass
+        for match in _age_pattern.finditer(text):
+            age = int(next(group for group in match.groups() if group))
+            if 18 <= age <= 100:  # 合理年龄范围
+                return age
         return None
     
     def _extract_tech_stack(self, text: str) -> list:
-        """提取技术栈"""
-        found_tech = []
-        text_lower = text.lower()
-        
-        for tech in self.tech_keywords:
-            # 检查技术关键词是否在文本中
-            if tech.lower() in text_lower or tech in text:
-                found_tech.append(tech)
-        
-        # 去重并保持顺序
-        seen = set()
-        result = []
-        for tech in found_tech:
-            if tech not in seen:
-                seen.add(tech)
-                result.append(tech)
-        
-        return result
+        """提取技术栈（去重并保持关键词顺序）"""
+        return self.tech_matcher.find_all(text)
     
-    def _extract_projects(self, text: str) -> list:
-        """提取项目经验"""
-        projects = []
+    def _extract_projects(self, text: str, has_section: bool = True) -> list:
+        """提取项目经验
         
-        # 查找项目相关的段落
-        # 匹配模式：项目名称、项目描述等
-        project_sections = re.split(
-            r"(项目[名称]?[：:]\s*|项目经验|项目经历|Project)",
-            text,
-            flags=re.IGNORECASE
-        )
+        Args:
+            text: 项目经验段落；没有识别到段落时为全文
+            has_section: 是否识别到了项目经验段落
+        """
+        projects = []
         
-        for i, section in enumerate(project_sections[1:], 1):
-            if i % 2 == 0:  # 取项目内容部分
-                project = self._parse_project_section(section)
-                if project:
-                    projects.append(project)
+        # 按“项目名称：”等标记切分单个项目，没有标记时整段视为一个项目
+        markers = list(_project_item_pattern.finditer(text)) if has_section else []
+        bounds = [(marker.end(), following.start()) for marker, following in zip(markers, markers[1:])]
+        if markers:
+            bounds.append((markers[-1].end(), len(text)))
+        elif has_section:
+            bounds.append((0, len(text)))
+        for start, end in bounds:
+            project = self._parse_project_section(text[start:end])
+            if project:
+                projects.append(project)
         
-        # 如果没有找到明确的项目段落，尝试从整个文本中提取
+        # 如果没有找到明确的项目段落，逐行识别包含技术栈的内容
         if not projects:
-            # 查找包含技术栈的段落作为项目
-            lines = text.split("\n")
             current_project = None
             
-            for line in lines:
+            for line in text.split("\n"):
                 line = line.strip()
                 if not line:
                     continue
                 
                 # 检查是否包含技术关键词
-                has_tech = any(tech.lower() in line.lower() for tech in self.tech_keywords)
+                has_tech = self.tech_matcher.search(line)
                 
                 if has_tech and len(line) > 10:
                     if current_project is None:
@@ -267,9 +264,7 @@ class ResumeParser:
     
     def _parse_project_section(self, section: str) -> Optional[ProjectDetail]:
         """解析单个项目段落"""
-        lines = section.split("\n")
-        if not lines:
-            return None
+        lines = section.strip().split("\n")
         
         # 第一行通常是项目名称
         name = lines[0].strip()[:100]
@@ -283,10 +278,11 @@ class ResumeParser:
         tech_stack = self._extract_tech_stack(section)
         
         # 提取职责（包含"负责"、"实现"等关键词的句子）
-        responsibilities = []
-        for line in lines:
-            if any(keyword in line for keyword in ["负责", "实现", "开发", "设计", "优化"]):
-                responsibilities.append(line.strip()[:200])
+        responsibilities = [
+            line.strip()[:200]
+            for line in lines
+            if _responsibility_pattern.search(line)
+        ]
         
         return ProjectDetail(
             name=name,
@@ -295,38 +291,38 @@ class ResumeParser:
             responsibilities=responsibilities[:5]  # 最多5条职责
         )
     
-    def _extract_education(self, text: str) -> Optional[str]:
-        """提取教育经历"""
-        # 查找教育相关的段落
-        patterns = [
-            r"教育[背景经历]?[：:]\s*([^\n]+(?:\n[^\n]+){0,3})",
-            r"学历[：:]\s*([^\n]+)",
-            r"毕业[院校]?[：:]\s*([^\n]+)",
-        ]
+    def _extract_education(self, text: str, basic: str = "") -> Optional[str]:
+        """提取教育经历
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()[:200]
+        Args:
+            text: 教育经历段落
+            basic: 基本信息段落，没有教育经历段落时从“学历：”等字段中提取
+        """
+        if text.strip():
+            return text.strip()[:200]
+        
+        match = _education_field_pattern.search(basic)
+        if match:
+            return match.group(1).strip()[:200]
         
         return None
     
     def _extract_work_experience(self, text: str) -> Optional[str]:
         """提取工作经历"""
-        # 查找工作经历相关的段落
-        patterns = [
-            r"工作[经历经验]?[：:]\s*([^\n]+(?:\n[^\n]+){0,5})",
-            r"工作[经历经验][：:]\s*([^\n]+(?:\n[^\n]+){0,5})",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()[:500]
-        
+        if text.strip():
+            return text.strip()[:500]
         return None
 
 
-# 创建全局实例
-resume_parser = ResumeParser()
+# 全局实例在首次使用（或启动预热）时创建，导入时不初始化
+resume_parser: Optional[ResumeParser] = None
+_resume_parser_lock = threading.Lock()
+
 
+def get_resume_parser() -> ResumeParser:
+    """获取全局简历解析器，延迟创建"""
+    global resume_parser
+    with _resume_parser_lock:
+        if resume_parser is None:
+            resume_parser = ResumeParser(cache=parse_result_cache)
+        return resume_parser
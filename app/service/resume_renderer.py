@@ -0,0 +1,102 @@
+import os
+from typing import List, Optional
+
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound, select_autoescape
+
+from app.schema.generation import ResumeDocument
+from app.schema.resume import ResumeInfo
+from config import config
+
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "resume")
+DEFAULT_TEMPLATE = "default"
+
+# 输出格式 -> 模板文件后缀
+FORMAT_SUFFIXES = {"markdown": "md", "html": "html"}
+
+
+class TemplateNotExists(Exception):
+    pass
+
+
+class ResumeRenderer:
+    """ 简历模板渲染
+
+    模板为 `<template_id>.md.j2` / `<template_id>.html.j2`（Jinja2），首次使用时编译并缓存，
+    渲染只依赖输入数据，不调用 LLM，相同输入的输出相同。
+    """
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html.j2"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            # 模板只在启动后编译一次，不检查文件修改
+            auto_reload=False,
+            cache_size=-1,
+        )
+
+    def templates(self) -> List[str]:
+        """可用的模板ID（以 _ 开头的是基础模板，不单独使用）"""
+        suffix = f".{FORMAT_SUFFIXES['markdown']}.j2"
+        return sorted(
+            name[:-len(suffix)] for name in self.env.list_templates()
+            if name.endswith(suffix) and not name.startswith("_")
+        )
+
+    def render(
+        self,
+        old_resume: ResumeInfo,
+        document: ResumeDocument,
+        template_id: Optional[str] = None,
+        fmt: str = "markdown"
+    ) -> str:
+        """
+        渲染简历
+
+        个人信息（姓名、年龄）始终取自原简历，不使用 LLM 的输出
+
+        Args:
+            old_resume: 原简历信息
+            document: 生成的结构化简历（项目经验、简介等）
+            template_id: 模板ID，默认 "default"
+            fmt: 输出格式（markdown, html）
+
+        Returns:
+            渲染结果
+        """
+        template_id = template_id or DEFAULT_TEMPLATE
+        if fmt not in FORMAT_SUFFIXES or template_id.startswith("_") or "/" in template_id:
+            raise TemplateNotExists(f"模板 {template_id} 不支持格式 {fmt}")
+        try:
+            template = self.env.get_template(f"{template_id}.{FORMAT_SUFFIXES[fmt]}.j2")
+        except TemplateNotFound:
+            raise TemplateNotExists(f"模板 {template_id} 不存在")
+        return template.render(**self._context(old_resume, document)).rstrip() + "\n"
+
+    @staticmethod
+    def _context(old_resume: ResumeInfo, document: ResumeDocument) -> dict:
+        """模板变量：LLM 未生成的部分使用原简历的内容"""
+        return {
+            "name": old_resume.name or "待填写",
+            "age": old_resume.age,
+            "summary": (document.summary or "").strip(),
+            "tech_stack": document.tech_stack or old_resume.tech_stack,
+            "work_experience": (document.work_experience or old_resume.work_experience or "").strip(),
+            "education": (document.education or old_resume.education or "").strip(),
+            "projects": document.projects,
+        }
+
+
+resume_renderer = ResumeRenderer(getattr(config, "resume_template_dir", "") or TEMPLATE_DIR)
+
+
+def render_markdown(
+    old_resume: ResumeInfo,
+    document: ResumeDocument,
+    template_id: Optional[str] = None
+) -> str:
+    """在本地将结构化简历渲染为 Markdown，不调用 LLM"""
+    return resume_renderer.render(old_resume, document, template_id, fmt="markdown")
@@ -0,0 +1,119 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+
+class SectionKind:
+    BASIC = "basic"
+    EDUCATION = "education"
+    WORK = "work"
+    PROJECTS = "projects"
+    SKILLS = "skills"
+
+
+# 各类段落的标题关键词，长的写在前面
+SECTION_HEADERS: Dict[str, List[str]] = {
+    SectionKind.BASIC: ["基本信息", "个人信息", "个人资料"],
+    SectionKind.EDUCATION: ["教育背景", "教育经历", "Education"],
+    SectionKind.WORK: ["工作经历", "工作经验", "实习经历", "工作", "Work Experience", "Experience"],
+    SectionKind.PROJECTS: ["项目经验", "项目经历", "Project Experience", "Projects", "Project"],
+    SectionKind.SKILLS: ["专业技能", "技能特长", "技术栈", "技能", "Skills"],
+}
+
+
+def _compile_header_pattern() -> re.Pattern:
+    groups = "|".join(
+        f"(?P<{kind}>{'|'.join(map(re.escape, headers))})"
+        for kind, headers in SECTION_HEADERS.items()
+    )
+    # 标题位于行首（允许常见的装饰符号），后面紧跟冒号或行尾
+    return re.compile(
+        rf"^[ \t#*■●◆【\[]*(?:{groups})[ \t】\]]*(?:[：:][ \t]*|$)",
+        re.MULTILINE | re.IGNORECASE
+    )
+
+
+_header_pattern = _compile_header_pattern()
+
+
+@dataclass
+class Section:
+    """简历段落，start/end 为正文（不含标题）在原文中的偏移"""
+    kind: str
+    start: int
+    end: int
+    text: str
+
+
+def sectionize(text: str) -> List[Section]:
+    """
+    一次扫描将简历文本切分为带类型的段落
+
+    第一个标题之前的内容视为基本信息。
+
+    Args:
+        text: 简历全文
+
+    Returns:
+        按出现顺序排列的段落
+    """
+    sections = []
+    kind, start = SectionKind.BASIC, 0
+    for match in _header_pattern.finditer(text):
+        sections.append(Section(kind, start, match.start(), text[start:match.start()]))
+        kind, start = match.lastgroup, match.end()
+    sections.append(Section(kind, start, len(text), text[start:]))
+    return [section for section in sections if section.text.strip()]
+
+
+def section_text(sections: Iterable[Section], kind: str) -> str:
+    """合并同一类型的所有段落"""
+    return "\n".join(section.text for section in sections if section.kind == kind)
+
+
+class KeywordMatcher:
+    """ 关键词匹配器
+
+    所有关键词编译为一个前缀树形式的正则，一次扫描即可找出全部命中的关键词；
+    语义与逐个关键词做大小写不敏感的子串判断一致。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        lowered = {keyword.lower() for keyword in self.keywords}
+        # 在每个位置匹配最长的关键词
+        self._pattern = re.compile(f"(?=({self._trie_pattern(lowered) or '(?!)'}))", re.IGNORECASE)
+        # 命中较长的关键词时，其中包含的较短关键词也视为命中（如 Golang 包含 Go）
+        self._implied = {
+            keyword: {other for other in lowered if other in keyword}
+            for keyword in lowered
+        }
+
+    @staticmethod
+    def _trie_pattern(words: Iterable[str]) -> str:
+        trie = {}
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            return f"(?:{body})?" if "" in node else body
+
+        return build(trie)
+
+    def search(self, text: str) -> bool:
+        """文本中是否包含任一关键词"""
+        return self._pattern.search(text) is not None
+
+    def find_all(self, text: str) -> List[str]:
+        """返回文本中出现的关键词，按关键词列表的顺序"""
+        hits = set()
+        for match in self._pattern.finditer(text):
+            hits.update(self._implied[match.group(1).lower()])
+        return [keyword for keyword in self.keywords if keyword.lower() in hits]
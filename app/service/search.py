@@ -1,17 +1,29 @@
-from typing import List, Optional
+import contextvars
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 import requests
 
-from app.repositry.milvus import query_job_requirements
+from app.repositry.milvus import query_job_requirements, query_job_requirements_batch
+from app.service.metrics import timed
 from config import config
 
 
+class SearchError(Exception):
+    """检索失败（Milvus、GitHub/Gitee 不可用），results 为失败前已取得的部分结果"""
+
+    def __init__(self, message: str, results: Optional[List[dict]] = None):
+        super().__init__(message)
+        self.results = results or []
+
+
 def search_job_requirements(
     query: str,
     city: Optional[str] = None,
     salary: Optional[str] = None,
     industry: Optional[str] = None,
-    top_k: int = 10
+    top_k: int = 10,
+    strict: bool = False
 ) -> List[dict]:
     """
     搜索招聘要求
@@ -22,20 +34,14 @@ def search_job_requirements(
         salary: 薪资过滤
         industry: 行业过滤
         top_k: 返回数量
+        strict: 为 True 时检索失败抛出 SearchError，否则返回空列表
     
     Returns:
         招聘要求列表
     """
     try:
-        # 这里需要指定使用哪个 collection
-        # 暂时使用配置中的 collection，后续需要根据实际需求调整
-        from app.db.milvus import prepare_milvus_oper
-        from pymilvus import Collection
-        
-        # 直接调用 repository 方法
-        # 注意：这里需要确保 collection 已经加载
+        # collection 由 prepare_milvus_oper 按函数名选择 job_requirement_collection 并作为第一个参数传入
         results = query_job_requirements(
-            collection=None,  # prepare_milvus_oper 会自动处理
             query=query,
             top_k=top_k,
             city=city,
@@ -45,6 +51,8 @@ def search_job_requirements(
         return results
     except Exception as e:
         logger.error(f"搜索招聘要求失败: {e}")
+        if strict:
+            raise SearchError(f"搜索招聘要求失败: {e}") from e
         return []
 
 
@@ -52,7 +60,8 @@ def search_open_source_projects(
     query: str,
     industry: Optional[str] = None,
     tech_stack: Optional[str] = None,
-    top_k: int = 10
+    top_k: int = 10,
+    strict: bool = False
 ) -> List[dict]:
     """
     实时搜索开源项目（从 GitHub/Gitee API）
@@ -62,77 +71,78 @@ def search_open_source_projects(
         industry: 行业过滤（暂不支持）
         tech_stack: 技术栈过滤
         top_k: 返回数量
+        strict: 为 True 时 GitHub 或 Gitee 搜索失败抛出 SearchError（附带已取得的结果），否则忽略失败
     
     Returns:
         开源项目列表
     """
-    try:
-        projects = []
-        
-        # 构建搜索关键词
-        search_keywords = tech_stack or query
-        
-        # 从 GitHub 搜索
-        github_projects = _search_github(search_keywords, limit=top_k)
-        projects.extend(github_projects)
-        
-        # 如果还需要更多，从 Gitee 搜索
-        if len(projects) < top_k:
-            gitee_projects = _search_gitee(search_keywords, limit=top_k - len(projects))
-            projects.extend(gitee_projects)
-        
-        return projects[:top_k]
+    projects = []
+    errors = []
+    
+    # 构建搜索关键词
+    search_keywords = tech_stack or query
     
+    # 从 GitHub 搜索
+    try:
+        projects.extend(_search_github(search_keywords, limit=top_k))
     except Exception as e:
-        logger.error(f"搜索开源项目失败: {e}")
-        return []
+        logger.warning(f"GitHub 搜索失败: {e}")
+        errors.append(f"GitHub: {e}")
+    
+    # 如果还需要更多，从 Gitee 搜索
+    if len(projects) < top_k:
+        try:
+            projects.extend(_search_gitee(search_keywords, limit=top_k - len(projects)))
+        except Exception as e:
+            logger.warning(f"Gitee 搜索失败: {e}")
+            errors.append(f"Gitee: {e}")
+    
+    if errors and strict:
+        raise SearchError(f"搜索开源项目失败: {'; '.join(errors)}", projects[:top_k])
+    return projects[:top_k]
 
 
 def _search_github(keywords: str, language: Optional[str] = None, limit: int = 10) -> List[dict]:
-    """从 GitHub API 搜索项目"""
-    try:
-        # GitHub Search API: https://api.github.com/search/repositories
-        url = "https://api.github.com/search/repositories"
-        params = {
-            "q": keywords,
-            "sort": "stars",
-            "order": "desc",
-            "per_page": min(limit, 100)  # GitHub API 限制每页最多100
-        }
-        
-        if language:
-            params["q"] = f"{keywords} language:{language}"
-        
-        # 可以添加 token 提高速率限制
-        headers = {}
-        github_token = getattr(config, "github_token", None)
-        if github_token:
-            headers["Authorization"] = f"token {github_token}"
-        
+    """从 GitHub API 搜索项目，请求失败时抛出异常"""
+    # GitHub Search API: https://api.github.com/search/repositories
+    url = "https://api.github.com/search/repositories"
+    params = {
+        "q": keywords,
+        "sort": "stars",
+        "order": "desc",
+        "per_page": min(limit, 100)  # GitHub API 限制每页最多100
+    }
+    
+    if language:
+        params["q"] = f"{keywords} language:{language}"
+    
+    # 可以添加 token 提高速率限制
+    headers = {}
+    github_token = getattr(config, "github_token", None)
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    
+    with timed("http", "api.github.com"):
         response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        projects = []
-        
-        for item in data.get("items", [])[:limit]:
-            # 获取 README 内容（可选，因为可能比较慢）
-            readme_content = _fetch_github_readme(item["full_name"])
-            
-            projects.append({
-                "project_name": item["name"],
-                "project_url": item["html_url"],
-                "tech_stack": item.get("language", "") or keywords,
-                "industry": "",  # GitHub 不提供行业信息
-                "description": item.get("description", "")[:500],
-                "readme_content": readme_content[:2000] if readme_content else ""
-            })
+    response.raise_for_status()
+    
+    data = response.json()
+    projects = []
+    
+    for item in data.get("items", [])[:limit]:
+        # 获取 README 内容（可选，因为可能比较慢）
+        readme_content = _fetch_github_readme(item["full_name"])
         
-        return projects
+        projects.append({
+            "project_name": item["name"],
+            "project_url": item["html_url"],
+            "tech_stack": item.get("language", "") or keywords,
+            "industry": "",  # GitHub 不提供行业信息
+            "description": item.get("description", "")[:500],
+            "readme_content": readme_content[:2000] if readme_content else ""
+        })
     
-    except Exception as e:
-        logger.warning(f"GitHub 搜索失败: {e}")
-        return []
+    return projects
 
 
 def _fetch_github_readme(repo_full_name: str) -> Optional[str]:
@@ -145,7 +155,8 @@ def _fetch_github_readme(repo_full_name: str) -> Optional[str]:
         if github_token:
             headers["Authorization"] = f"token {github_token}"
         
-        response = requests.get(url, headers=headers, timeout=5)
+        with timed("http", "api.github.com"):
+            response = requests.get(url, headers=headers, timeout=5)
         if response.status_code == 200:
             return response.text[:2000]  # 限制长度
     except:
@@ -154,39 +165,35 @@ def _fetch_github_readme(repo_full_name: str) -> Optional[str]:
 
 
 def _search_gitee(keywords: str, limit: int = 10) -> List[dict]:
-    """从 Gitee API 搜索项目"""
-    try:
-        # Gitee Search API: https://gitee.com/api/v5/search/repositories
-        url = "https://gitee.com/api/v5/search/repositories"
-        params = {
-            "q": keywords,
-            "sort": "stars_count",
-            "order": "desc",
-            "per_page": min(limit, 100),
-            "page": 1
-        }
-        
+    """从 Gitee API 搜索项目，请求失败时抛出异常"""
+    # Gitee Search API: https://gitee.com/api/v5/search/repositories
+    url = "https://gitee.com/api/v5/search/repositories"
+    params = {
+        "q": keywords,
+        "sort": "stars_count",
+        "order": "desc",
+        "per_page": min(limit, 100),
+        "page": 1
+    }
+    
+    with timed("http", "gitee.com"):
         response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        projects = []
-        
-        for item in data.get("items", [])[:limit]:
-            projects.append({
-                "project_name": item.get("name", ""),
-                "project_url": item.get("html_url", ""),
-                "tech_stack": keywords,  # Gitee API 不直接提供语言信息
-                "industry": "",
-                "description": item.get("description", "")[:500],
-                "readme_content": ""  # Gitee 的 README 需要单独请求，暂时不获取
-            })
-        
-        return projects
+    response.raise_for_status()
     
-    except Exception as e:
-        logger.warning(f"Gitee 搜索失败: {e}")
-        return []
+    data = response.json()
+    projects = []
+    
+    for item in data.get("items", [])[:limit]:
+        projects.append({
+            "project_name": item.get("name", ""),
+            "project_url": item.get("html_url", ""),
+            "tech_stack": keywords,  # Gitee API 不直接提供语言信息
+            "industry": "",
+            "description": item.get("description", "")[:500],
+            "readme_content": ""  # Gitee 的 README 需要单独请求，暂时不获取
+        })
+    
+    return projects
 
 
 def search_by_resume_requirements(
@@ -213,14 +220,16 @@ def search_by_resume_requirements(
     Returns:
         {
             "job_requirements": [...],
-            "open_source_projects": [...]
+            "open_source_projects": [...],
+            "complete": 是否全部检索成功（失败的部分为空或只有部分结果，不应长期保存）
         }
     """
     # 构建查询文本
     query_text = f"{job_title} {tech_stack or ''}"
     
     # 搜索招聘要求
-    job_requirements = search_job_requirements(
+    job_requirements, jobs_complete = _search_partial(
+        search_job_requirements,
         query=query_text,
         city=city,
         salary=salary,
@@ -229,7 +238,8 @@ def search_by_resume_requirements(
     )
     
     # 搜索开源项目
-    open_source_projects = search_open_source_projects(
+    open_source_projects, projects_complete = _search_partial(
+        search_open_source_projects,
         query=query_text,
         industry=industry,
         tech_stack=tech_stack,
@@ -238,6 +248,83 @@ def search_by_resume_requirements(
     
     return {
         "job_requirements": job_requirements,
-        "open_source_projects": open_source_projects
+        "open_source_projects": open_source_projects,
+        "complete": jobs_complete and projects_complete
     }
 
+
+def _search_partial(search: Callable[..., List[dict]], **kwargs) -> Tuple[List[dict], bool]:
+    """以 strict 模式检索，返回 (结果, 是否成功)，失败时结果为已取得的部分"""
+    try:
+        return search(strict=True, **kwargs), True
+    except SearchError as e:
+        return e.results, False
+
+
+def search_by_targets(
+    targets: List[dict],
+    tech_stack: Optional[str] = None,
+    job_top_k: int = 5,
+    project_top_k: int = 5
+) -> List[dict]:
+    """
+    多个目标共享一次检索
+    
+    所有目标的招聘要求一次批量检索（相同查询文本只向量化一次，过滤条件相同的查询合并为一次搜索），
+    开源项目按搜索关键词去重（关键词只取决于技术栈，通常所有目标共用一次搜索），
+    招聘要求与各开源项目搜索并发执行。
+    
+    Args:
+        targets: 目标列表，每项包含 job_title 及可选的 city, salary, industry
+        tech_stack: 技术栈
+        job_top_k: 招聘要求返回数量
+        project_top_k: 开源项目返回数量
+    
+    Returns:
+        与 targets 一一对应的 {"job_requirements": [...], "open_source_projects": [...], "complete": bool}，
+        complete 含义同 search_by_resume_requirements
+    """
+    queries = [
+        {
+            "query": f"{target['job_title']} {tech_stack or ''}",
+            "city": target.get("city"),
+            "salary": target.get("salary"),
+            "industry": target.get("industry"),
+        }
+        for target in targets
+    ]
+    # search_open_source_projects 只使用 tech_stack 或 query 作为关键词
+    keywords = [tech_stack or query["query"] for query in queries]
+    
+    def search_jobs() -> Tuple[List[List[dict]], bool]:
+        try:
+            return query_job_requirements_batch(queries=queries, top_k=job_top_k), True
+        except Exception as e:
+            logger.error(f"批量搜索招聘要求失败: {e}")
+            return [[] for _ in queries], False
+    
+    unique_keywords = list(dict.fromkeys(keywords))
+    with ThreadPoolExecutor(max_workers=1 + len(unique_keywords)) as executor:
+        # 在调用方上下文的副本中执行（同 asyncio.to_thread），线程中的耗时计入当前请求的 Server-Timing
+        def submit(func, *args, **kwargs):
+            return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        
+        job_future = submit(search_jobs)
+        project_futures = {
+            keyword: submit(
+                _search_partial, search_open_source_projects,
+                query=keyword, tech_stack=tech_stack, top_k=project_top_k
+            )
+            for keyword in unique_keywords
+        }
+        job_results, jobs_complete = job_future.result()
+        project_results = {keyword: future.result() for keyword, future in project_futures.items()}
+    
+    return [
+        {
+            "job_requirements": job_requirements,
+            "open_source_projects": project_results[keyword][0],
+            "complete": jobs_complete and project_results[keyword][1]
+        }
+        for job_requirements, keyword in zip(job_results, keywords)
+    ]
@@ -0,0 +1,34 @@
+import time
+import importlib
+
+from loguru import logger
+
+
+# 解析上传文件时才需要的库（导入 app 时不加载）
+PARSER_MODULES = ["pypdfium2", "pdfminer.pdfinterp", "pdfplumber", "docx"]
+
+
+def warmup():
+    """
+    预先加载首个请求才会用到的依赖：简历解析器与生成器、PDF / Word 解析库、分词器与 embedding 模型
+
+    在 worker 启动时调用（warmup_on_startup），worker 就绪后的第一个请求不再承担数秒的加载耗时；
+    单项加载失败只记录日志，实际使用时会再次尝试。
+    """
+    from app.cache_pool import get_bge_m3_ef
+    from app.service.batch_parser import get_batch_parser
+    from app.service.resume_generator import get_resume_generator
+
+    steps = [
+        ("services", lambda: (get_batch_parser(), get_resume_generator())),
+        ("parsers", lambda: [importlib.import_module(name) for name in PARSER_MODULES]),
+        ("tokenizer", lambda: get_resume_generator().prompt_compressor.counter.count("warmup")),
+        ("embedding", get_bge_m3_ef),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+            logger.info(f"预热 {name} 完成，耗时 {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            logger.warning(f"预热 {name} 失败: {e}")
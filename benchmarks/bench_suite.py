@@ -0,0 +1,312 @@
+"""
+端到端基准测试（不依赖网络、Milvus 与模型文件）
+
+Milvus、BGE-M3、LLM 与 GitHub / Gitee 均替换为本地替身（见 stand_ins.py），
+分别测量简历解析、向量化、检索、概念分类、简历生成与 API 端到端的吞吐与延迟分位数，
+结果保存为 JSON，可与其他提交的结果对比。
+
+用法：
+    python benchmarks/bench_suite.py [--iterations 50] [--llm-latency 0.05] [--json result.json]
+    python benchmarks/bench_suite.py --compare baseline.json --json result.json
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+from loguru import logger
+
+from benchmarks.stand_ins import (
+    MockLLMServer, install_stand_ins, make_docx, make_pdf,
+    synthetic_concept_records, synthetic_job_requirements,
+    SAMPLE_PDF_LINES, SAMPLE_RESUME_LINES,
+)
+
+STAGES = [
+    "parse_txt", "parse_docx", "parse_pdf", "embed", "search_jobs", "search_targets", "classify",
+    "generate_two_pass", "generate_single", "api_generate", "api_concept_query",
+]
+
+
+def _summary(latencies: List[float], elapsed: float) -> dict:
+    """
+    Args:
+        latencies: 每次操作的耗时（秒）
+        elapsed: 总耗时（秒），并发执行时小于各次耗时之和
+
+    Returns:
+        {"n", "ops_per_sec", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}
+    """
+    ms = np.asarray(latencies) * 1000
+    return {
+        "n": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def bench_sync(func: Callable[[int], object], iterations: int, warmup: int = 2) -> dict:
+    for i in range(warmup):
+        func(i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - t)
+    return _summary(latencies, time.perf_counter() - start)
+
+
+async def bench_async(func: Callable[[int], Awaitable], iterations: int, concurrency: int, warmup: int = 2) -> dict:
+    for i in range(warmup):
+        await func(i)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            t = time.perf_counter()
+            await func(i)
+            latencies.append(time.perf_counter() - t)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    return _summary(latencies, time.perf_counter() - start)
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _sample_request(i: int, mode: str = None) -> dict:
+    from benchmarks.stand_ins import CITIES, JOB_TITLES
+
+    return {
+        "old_resume": {
+            "name": "张三",
+            "age": 28,
+            "tech_stack": ["Python", "Django", "Redis"],
+            "projects": [{
+                "name": "订单中心重构",
+                "description": "订单缓存与异步任务改造",
+                "tech_stack": ["Python", "Redis"],
+                "responsibilities": ["实现订单缓存", "接口延迟降低 60%"],
+            }],
+            "education": "某某大学 计算机科学与技术 本科",
+            "work_experience": "某某科技有限公司 后端开发工程师 2019-至今",
+        },
+        "target_job_title": JOB_TITLES[i % len(JOB_TITLES)],
+        "target_city": CITIES[i % len(CITIES)],
+        "use_cache": False,
+        "mode": mode,
+    }
+
+
+def seed(job_count: int, stocks_per_concept: int):
+    """写入合成的招聘要求、概念与概念中心向量"""
+    from app.repositry.milvus import insert_job_requirements, insert_concepts, replace_concept_centroids
+    from app.service.concept import ConceptCentroidBuilder, embed_concept_records
+    from config import config
+
+    insert_job_requirements(synthetic_job_requirements(job_count))
+
+    embedded = embed_concept_records(synthetic_concept_records(stocks_per_concept))
+    insert_concepts(
+        embedded["docs"], embedded["concepts"], embedded["stock_codes"], embedded["sparse"], embedded["dense"]
+    )
+    builder = ConceptCentroidBuilder(getattr(config, "concept_centroids_per_concept", 3))
+    builder.add(embedded["concepts"], embedded["sparse"], embedded["dense"])
+    replace_concept_centroids(*builder.build())
+
+
+def run(args) -> dict:
+    # 每次 LLM 调用的 INFO 日志会影响计时
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    stand_ins = install_stand_ins(embed_latency=args.embed_latency, http_latency=args.http_latency)
+    llm = MockLLMServer(latency=args.llm_latency).start()
+
+    from app.cache_pool import get_bge_m3_ef
+    from app.schema.generation import GenerateResumeRequest
+    from app.service.concept import classify_news
+    from app.service.generation_store import GenerationStore
+    from app.service.llm_client import ChatClient
+    from app.service.llm_router import Endpoint, LLMRouter
+    from app.service.prompt_budget import PromptCompressor, TokenCounter
+    from app.service.resume_generator import ResumeGenerator, get_resume_generator
+    from app.service.resume_parser import ResumeParser
+    from app.service.search import search_by_resume_requirements, search_by_targets
+    from benchmarks.stand_ins import CITIES, JOB_TITLES
+
+    seed(args.jobs, args.stocks_per_concept)
+    results: Dict[str, dict] = {}
+    selected = set(args.stages or STAGES)
+
+    def record(stage: str, func: Callable[[], dict]):
+        if stage in selected:
+            results[stage] = func()
+            print(f"{stage:<20} {json.dumps(results[stage], ensure_ascii=False)}")
+
+    # 1. 简历解析（不使用解析缓存）
+    parser = ResumeParser(cache=None)
+    txt = "\n".join(SAMPLE_RESUME_LINES).encode("utf-8")
+    docx = make_docx()
+    pdf = make_pdf(SAMPLE_PDF_LINES)
+    record("parse_txt", lambda: bench_sync(lambda i: parser.parse(file_content=txt, file_type="txt"), args.iterations))
+    record("parse_docx", lambda: bench_sync(lambda i: parser.parse(file_content=docx, file_type="docx"), args.iterations))
+    record("parse_pdf", lambda: bench_sync(lambda i: parser.parse(file_content=pdf, file_type="pdf"), args.iterations))
+
+    # 2. 向量化与检索
+    ef = get_bge_m3_ef()
+    texts = [job["job_detail"] for job in synthetic_job_requirements(args.batch_size, seed=1)]
+    record("embed", lambda: bench_sync(lambda i: ef.encode_queries(texts), args.iterations))
+    record("search_jobs", lambda: bench_sync(
+        lambda i: search_by_resume_requirements(
+            JOB_TITLES[i % len(JOB_TITLES)], city=CITIES[i % len(CITIES)], tech_stack="Python, Redis"
+        ),
+        args.iterations
+    ))
+    targets = [{"job_title": title, "city": CITIES[0]} for title in JOB_TITLES[:3]]
+    record("search_targets", lambda: bench_sync(
+        lambda i: search_by_targets(targets, tech_stack="Python, Redis"), args.iterations
+    ))
+    news = [item["reason"] for item in synthetic_concept_records(4)][:args.batch_size]
+    record("classify", lambda: bench_sync(lambda i: classify_news(news, 5, args.batch_size), args.iterations))
+
+    # 3. 简历生成（LLM 为本地模拟服务，不使用缓存）
+    llm_client = LLMRouter([Endpoint("mock", ChatClient(api_key="bench", base_url=llm.url, model="mock"))])
+    tmpdir = tempfile.TemporaryDirectory()
+    store = GenerationStore(os.path.join(tmpdir.name, "generations.sqlite3"))
+    generator = ResumeGenerator(llm_cache=None, prompt_compressor=PromptCompressor(TokenCounter()), generation_store=store)
+    generator.llm_client = llm_client
+
+    async def generate(i: int, mode: str):
+        response = await generator.generate_resume(GenerateResumeRequest(**_sample_request(i, mode)))
+        if not response.success:
+            raise RuntimeError(response.error)
+
+    for mode in ("two_pass", "single"):
+        record(f"generate_{mode}", lambda: asyncio.run(
+            bench_async(lambda i: generate(i, mode), args.iterations, args.concurrency)
+        ))
+
+    # 4. API 端到端（进程内 ASGI 调用，包含中间件、参数校验与序列化）
+    if selected & {"api_generate", "api_concept_query"}:
+        import httpx
+        from app import app
+        from app.schema import ReqStatus
+
+        resume_generator = get_resume_generator()
+        resume_generator.llm_client = llm_client
+        resume_generator.llm_cache = None
+        resume_generator.prompt_compressor = generator.prompt_compressor
+        resume_generator.generation_store = store
+
+        async def api_benchmarks():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                async def post(path: str, body: dict):
+                    response = await client.post(path, json=body)
+                    data = response.json()
+                    if response.status_code != 200 or data.get("code") != int(ReqStatus.SUCCESS):
+                        raise RuntimeError(f"{path}: {response.status_code} {data}")
+
+                if "api_generate" in selected:
+                    results["api_generate"] = await bench_async(
+                        lambda i: post("/api/v1/resume/generate", _sample_request(i)),
+                        args.iterations, args.concurrency
+                    )
+                    print(f"{'api_generate':<20} {json.dumps(results['api_generate'])}")
+                if "api_concept_query" in selected:
+                    results["api_concept_query"] = await bench_async(
+                        lambda i: post("/api/v1/concept/query", {"news": news[i % len(news)]}),
+                        args.iterations, args.concurrency
+                    )
+                    print(f"{'api_concept_query':<20} {json.dumps(results['api_concept_query'])}")
+
+        asyncio.run(api_benchmarks())
+
+    llm.stop()
+    tmpdir.cleanup()
+    return {
+        "meta": {
+            "commit": _commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": vars(args),
+            "llm_calls": llm.calls,
+            "http_calls": stand_ins["requests"].calls,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """打印与基准结果的对比（p50 / p95 延迟与吞吐的变化百分比）"""
+    print(f"\n对比 {baseline['meta'].get('commit') or '基准'} -> {current['meta'].get('commit') or '当前'}")
+    print(f"{'stage':<20} {'p50_ms':>20} {'p95_ms':>20} {'ops_per_sec':>22}")
+
+    def delta(old, new) -> str:
+        if old is None or new is None:
+            return "-"
+        change = (new - old) / old * 100 if old else 0.0
+        return f"{old:.2f}->{new:.2f} ({change:+.0f}%)"
+
+    for stage, result in current["results"].items():
+        old = baseline["results"].get(stage)
+        if old is None:
+            continue
+        print(
+            f"{stage:<20} {delta(old['p50_ms'], result['p50_ms']):>20} "
+            f"{delta(old['p95_ms'], result['p95_ms']):>20} {delta(old['ops_per_sec'], result['ops_per_sec']):>22}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端基准测试（本地替身）")
+    parser.add_argument("--iterations", type=int, default=50, help="每个阶段的执行次数")
+    parser.add_argument("--concurrency", type=int, default=8, help="异步阶段（生成、API）的并发数")
+    parser.add_argument("--batch-size", type=int, default=32, help="向量化与概念分类的批大小")
+    parser.add_argument("--jobs", type=int, default=2000, help="写入的招聘要求条数")
+    parser.add_argument("--stocks-per-concept", type=int, default=30, help="每个概念写入的个股条数")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="模拟 LLM 每次调用的延迟（秒）")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="模拟每段文本的向量化耗时（秒）")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="模拟 GitHub / Gitee 每次请求的延迟（秒）")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, help="只运行指定阶段")
+    parser.add_argument("--json", help="结果输出到 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
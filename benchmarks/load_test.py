@@ -0,0 +1,324 @@
+"""
+API 压测（开环负载，延迟 SLO 报告）
+
+启动替换了外部依赖的服务（uvicorn benchmarks.stub_app:app --workers N，LLM 为本地模拟服务），
+按请求配比（简历解析上传、概念查询、简历生成）以逐级提高的目标 RPS 发送请求。
+请求按固定间隔发出、不等待前一个请求完成，服务跟不上时延迟与错误率上升，从而找到饱和点。
+每级报告吞吐、p50/p95/p99 与错误率，结果可保存为 JSON。
+
+用法：
+    python benchmarks/load_test.py --workers 4 --rps 10 20 40 80 --duration 20 --mix parse=3,concept=5,generate=1
+    python benchmarks/load_test.py --url http://127.0.0.1:7890 --rps 50   # 压测已启动的服务
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_suite import _commit, _sample_request
+from benchmarks.stand_ins import (
+    MockLLMServer, make_docx, make_pdf, synthetic_concept_records, SAMPLE_PDF_LINES, SAMPLE_RESUME_LINES,
+)
+
+SUCCESS_CODE = 100001  # ReqStatus.SUCCESS，避免在压测进程中导入 app
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"parse=3,concept=5,generate=1" -> {"parse": 3.0, "concept": 5.0, "generate": 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in RequestFactory.KINDS:
+            raise argparse.ArgumentTypeError(f"未知的请求类型: {name}（可选 {', '.join(RequestFactory.KINDS)}）")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class RequestFactory:
+    """ 按类型生成请求参数
+
+    上传的文件有若干个不同版本，解析缓存的命中率接近实际使用（而不是每次都命中）。
+    """
+
+    KINDS = ("parse", "concept", "generate")
+
+    def __init__(self, variants: int = 20):
+        self._files = []
+        for i in range(variants):
+            suffix = f"备注：{i}"
+            self._files.append(("txt", ("\n".join(SAMPLE_RESUME_LINES + [suffix])).encode("utf-8")))
+            self._files.append(("docx", make_docx(SAMPLE_RESUME_LINES + [suffix])))
+            self._files.append(("pdf", make_pdf(SAMPLE_PDF_LINES + [f"Note: {i}"])))
+        self._news = [item["reason"] for item in synthetic_concept_records(5)]
+
+    def build(self, kind: str, i: int) -> dict:
+        """httpx 请求参数 {"method", "url", ...}"""
+        if kind == "parse":
+            file_type, content = self._files[i % len(self._files)]
+            return {
+                "method": "POST", "url": "/api/v1/resume/parse",
+                "files": {"file": (f"resume.{file_type}", content)}, "data": {"file_type": file_type},
+            }
+        if kind == "concept":
+            return {"method": "POST", "url": "/api/v1/concept/query", "json": {"news": self._news[i % len(self._news)]}}
+        return {"method": "POST", "url": "/api/v1/resume/generate", "json": _sample_request(i)}
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    mix: Dict[str, float],
+    rps: float,
+    duration: float,
+    max_inflight: int,
+    seed: int = 0,
+) -> dict:
+    """
+    以固定速率发送 duration 秒请求，等待全部完成后统计
+
+    Args:
+        rps: 目标每秒请求数
+        duration: 持续时间（秒）
+        max_inflight: 未完成请求数上限，超过时直接记为错误（client_overload），避免压测端自身成为瓶颈
+
+    Returns:
+        {"target_rps", "sent", "throughput", "drain_seconds", "error_rate", "overall": {...}, "by_kind": {kind: {...}}, "errors": {...}}
+    """
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    counts: Dict[str, int] = defaultdict(int)
+    inflight = 0
+    tasks = []
+
+    async def one(kind: str, i: int):
+        nonlocal inflight
+        inflight += 1
+        start = time.perf_counter()
+        error = None
+        try:
+            response = await client.request(**factory.build(kind, i))
+            if response.status_code != 200:
+                error = f"http_{response.status_code}"
+            elif response.json().get("code") != SUCCESS_CODE:
+                error = f"code_{response.json().get('code')}"
+        except httpx.TimeoutException:
+            error = "timeout"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        finally:
+            inflight -= 1
+        elapsed = time.perf_counter() - start
+        if error is None:
+            latencies[kind].append(elapsed)
+        else:
+            errors[kind][error] += 1
+
+    total = int(rps * duration)
+    start = time.perf_counter()
+    for i in range(total):
+        # 按计划时间发送（开环），不因服务变慢而降低发送速率
+        delay = start + i / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = rng.choices(kinds, weights)[0]
+        counts[kind] += 1
+        if inflight >= max_inflight:
+            errors[kind]["client_overload"] += 1
+            continue
+        tasks.append(asyncio.create_task(one(kind, i)))
+    sent_at = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    def summary(values: List[float], sent: int, failed: int) -> dict:
+        ms = np.asarray(values) * 1000
+        return {
+            "sent": sent,
+            "ok": len(values),
+            "error_rate": round(failed / sent, 4) if sent else 0.0,
+            "p50_ms": round(float(np.percentile(ms, 50)), 1) if len(ms) else None,
+            "p95_ms": round(float(np.percentile(ms, 95)), 1) if len(ms) else None,
+            "p99_ms": round(float(np.percentile(ms, 99)), 1) if len(ms) else None,
+        }
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    failed = sum(sum(kind_errors.values()) for kind_errors in errors.values())
+    return {
+        "target_rps": rps,
+        "sent": total,
+        # 完成请求数 / 从开始发送到全部完成的时间
+        "throughput": round(len(all_latencies) / elapsed, 2),
+        # 发送结束后等待剩余请求完成的时间，服务跟不上时请求排队，该值随负载持续增长
+        "drain_seconds": round(elapsed - (sent_at - start), 3),
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "overall": summary(all_latencies, total, failed),
+        "by_kind": {
+            kind: summary(latencies[kind], counts[kind], sum(errors[kind].values())) for kind in kinds if counts[kind]
+        },
+        "errors": {kind: dict(kind_errors) for kind, kind_errors in errors.items() if kind_errors},
+    }
+
+
+def saturated(step: dict, slo_p99_ms: float, max_error_rate: float) -> List[str]:
+    """该级负载不满足的条件（为空表示未饱和）"""
+    reasons = []
+    # 未排队时剩余请求在一个请求的耗时内完成
+    if step["drain_seconds"] * 1000 > slo_p99_ms:
+        reasons.append(f"请求排队，发送结束后 {step['drain_seconds']}s 才全部完成")
+    if step["error_rate"] > max_error_rate:
+        reasons.append(f"错误率 {step['error_rate']:.2%}")
+    p99 = step["overall"]["p99_ms"]
+    if p99 is not None and p99 > slo_p99_ms:
+        reasons.append(f"p99 {p99}ms > SLO {slo_p99_ms}ms")
+    return reasons
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, llm_url: str) -> Tuple[subprocess.Popen, str]:
+    """启动替换了外部依赖的服务，等待就绪后返回 (进程, 地址)"""
+    port = args.port or _free_port()
+    env = {
+        **os.environ,
+        "BENCH_LLM_URL": llm_url,
+        "BENCH_EMBED_LATENCY": str(args.embed_latency),
+        "BENCH_HTTP_LATENCY": str(args.http_latency),
+        "BENCH_JOBS": str(args.jobs),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=project_root, env=env,
+        stdout=open(args.server_log, "ab") if args.server_log else subprocess.DEVNULL,
+        stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"服务启动失败，退出码 {process.returncode}")
+        try:
+            if httpx.get(f"{url}/metrics", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"服务在 {args.startup_timeout}s 内未就绪")
+
+
+async def run_load(args, url: str) -> List[dict]:
+    factory = RequestFactory()
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    steps = []
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        # 预热：每种请求各发送一次
+        for kind in args.mix:
+            await client.request(**factory.build(kind, 0))
+        for rps in args.rps:
+            step = await run_step(client, factory, args.mix, rps, args.duration, args.max_inflight)
+            step["saturated"] = saturated(step, args.slo_p99_ms, args.max_error_rate)
+            steps.append(step)
+            print_step(step)
+            if step["saturated"] and args.stop_on_saturation:
+                break
+    return steps
+
+
+def print_step(step: dict):
+    overall = step["overall"]
+    status = "饱和: " + "；".join(step["saturated"]) if step["saturated"] else "正常"
+    print(
+        f"rps={step['target_rps']:<6} 吞吐={step['throughput']:<8} 错误率={step['error_rate']:<7.2%} "
+        f"drain={step['drain_seconds']}s "
+        f"p50={overall['p50_ms']}ms p95={overall['p95_ms']}ms p99={overall['p99_ms']}ms  {status}"
+    )
+    for kind, result in step["by_kind"].items():
+        print(
+            f"    {kind:<9} sent={result['sent']:<5} error_rate={result['error_rate']:<7.2%} "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms"
+        )
+    for kind, kind_errors in step["errors"].items():
+        print(f"    {kind:<9} errors={kind_errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 压测（开环负载，延迟 SLO 报告）")
+    parser.add_argument("--url", help="压测已启动的服务；不指定时启动替换了外部依赖的服务")
+    parser.add_argument("--workers", type=int, default=1, help="启动的服务 worker 数")
+    parser.add_argument("--port", type=int, help="启动的服务端口，默认随机")
+    parser.add_argument("--rps", type=float, nargs="+", default=[5, 10, 20, 40], help="逐级的目标每秒请求数")
+    parser.add_argument("--duration", type=float, default=10, help="每级持续时间（秒）")
+    parser.add_argument("--mix", type=parse_mix, default="parse=3,concept=5,generate=1", help="请求配比")
+    parser.add_argument("--timeout", type=float, default=30, help="单个请求超时（秒）")
+    parser.add_argument("--max-inflight", type=int, default=512, help="压测端未完成请求数上限")
+    parser.add_argument("--slo-p99-ms", type=float, default=2000, help="p99 延迟 SLO（毫秒）")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="可接受的错误率")
+    parser.add_argument("--stop-on-saturation", action="store_true", help="达到饱和后不再提高负载")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="模拟 LLM 每次调用的延迟（秒）")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="模拟每段文本的向量化耗时（秒）")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="模拟 GitHub / Gitee 每次请求的延迟（秒）")
+    parser.add_argument("--jobs", type=int, default=2000, help="写入的招聘要求条数")
+    parser.add_argument("--server-log", help="启动的服务的输出写入该文件，默认丢弃")
+    parser.add_argument("--startup-timeout", type=float, default=120, help="等待服务就绪的时间（秒）")
+    parser.add_argument("--json", help="结果输出到 JSON 文件")
+    args = parser.parse_args()
+
+    llm: Optional[MockLLMServer] = None
+    process = None
+    url = args.url
+    try:
+        if url is None:
+            llm = MockLLMServer(latency=args.llm_latency).start()
+            process, url = start_server(args, llm.url)
+        steps = asyncio.run(run_load(args, url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if llm is not None:
+            llm.stop()
+
+    saturation = next((step["target_rps"] for step in steps if step["saturated"]), None)
+    print(f"\n饱和点: {f'{saturation} rps' if saturation is not None else '未达到'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "commit": _commit(),
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "params": {**vars(args), "url": url},
+                },
+                "saturation_rps": saturation,
+                "steps": steps,
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
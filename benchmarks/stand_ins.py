@@ -0,0 +1,353 @@
+"""
+基准测试用的本地替身（不依赖网络、Milvus 与模型文件）
+
+- HashingEmbeddingFunction：与 BGE-M3 接口相同的确定性向量化（特征哈希），可模拟模型耗时
+- Milvus 使用进程内检索（vector_backend = "local"，app/db/local_vector.py），数据写入临时目录，仓储层代码原样执行
+- MockLLMServer：OpenAI / DeepSeek 兼容的本地服务，延迟可配置，支持流式
+- RecordedRequests：按 URL 返回 fixtures 中录制的 GitHub / Gitee 响应
+"""
+import os
+import re
+import json
+import atexit
+import shutil
+import tempfile
+import time
+import zlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse as sp
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+DENSE_DIM = 1024
+# 与 BGE-M3 的词表大小一致
+SPARSE_DIM = 250002
+
+_token_pattern = re.compile(r"[A-Za-z0-9_+#.]+|[一-鿿]")
+
+
+def _tokens(text: str) -> List[str]:
+    """英文按词，中文按单字与相邻二字"""
+    tokens = _token_pattern.findall(text.lower())
+    return tokens + [a + b for a, b in zip(tokens, tokens[1:]) if len(a) == 1 and len(b) == 1]
+
+
+def _hash(token: str, seed: int) -> int:
+    return zlib.crc32(f"{seed}:{token}".encode("utf-8"))
+
+
+class HashingEmbeddingFunction:
+    """ BGE-M3 的替身：特征哈希得到稠密 / 稀疏向量，相同文本结果相同 """
+
+    def __init__(self, latency_per_text: float = 0.0):
+        """
+        Args:
+            latency_per_text: 每段文本模拟的模型耗时（秒）
+        """
+        self.latency_per_text = latency_per_text
+
+    def _encode(self, texts: List[str]) -> dict:
+        if self.latency_per_text:
+            time.sleep(self.latency_per_text * len(texts))
+        dense = np.zeros((len(texts), DENSE_DIM), dtype=np.float32)
+        rows, cols, values = [], [], []
+        for i, text in enumerate(texts):
+            weights: Dict[int, float] = {}
+            for token in _tokens(text):
+                h = _hash(token, 0)
+                dense[i, h % DENSE_DIM] += 1.0 if h & 1 else -1.0
+                col = _hash(token, 1) % SPARSE_DIM
+                weights[col] = max(weights.get(col, 0.0), 0.1 + (h % 100) / 400)
+            rows.extend([i] * len(weights))
+            cols.extend(weights)
+            values.extend(weights.values())
+        dense /= np.maximum(np.linalg.norm(dense, axis=1, keepdims=True), 1e-12)
+        sparse = sp.csr_array((values, (rows, cols)), shape=(len(texts), SPARSE_DIM), dtype=np.float32)
+        return {"dense": list(dense), "sparse": sparse}
+
+    def encode_documents(self, documents: List[str]) -> dict:
+        return self._encode(documents)
+
+    def encode_queries(self, queries: List[str]) -> dict:
+        return self._encode(queries)
+
+
+class MockLLMServer:
+    """ OpenAI / DeepSeek 兼容的本地模拟服务
+
+    按提示词返回结构合法的内容：项目经验 -> JSON 数组，单次调用模式 -> JSON 简历，其余 -> Markdown 简历。
+    """
+
+    PROJECTS = [
+        {
+            "name": "分布式任务调度平台",
+            "description": "基于消息队列的分布式任务调度与重试平台，支撑日均千万级任务。",
+            "tech_stack": ["Python", "Redis", "Kafka"],
+            "responsibilities": ["设计任务分片与重试机制", "实现基于 Redis 的分布式锁"],
+        },
+        {
+            "name": "实时数据看板",
+            "description": "实时聚合业务指标并推送到前端的数据看板。",
+            "tech_stack": ["Go", "ClickHouse"],
+            "responsibilities": ["负责流式聚合服务", "优化查询延迟"],
+        },
+    ]
+
+    def __init__(self, latency: float = 0.0, stream_chunk_size: int = 16):
+        """
+        Args:
+            latency: 每次调用在返回前等待的时间（秒）
+            stream_chunk_size: 流式响应每个增量的字符数
+        """
+        self.latency = latency
+        self.stream_chunk_size = stream_chunk_size
+        self.calls = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1/chat/completions"
+
+    def reply(self, prompt: str) -> str:
+        if "JSON 格式返回" in prompt:
+            return json.dumps(self.PROJECTS, ensure_ascii=False)
+        if "生成一份针对目标岗位的简历内容" in prompt:
+            return json.dumps({
+                "summary": "5 年后端开发经验，熟悉分布式系统。",
+                "tech_stack": ["Python", "Go", "Redis"],
+                "projects": self.PROJECTS,
+            }, ensure_ascii=False)
+        return "# 简历\n\n## 项目经验\n\n" + "\n\n".join(
+            f"### {project['name']}\n\n{project['description']}" for project in self.PROJECTS
+        )
+
+    def start(self) -> "MockLLMServer":
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                mock.calls += 1
+                time.sleep(mock.latency)
+                reply = mock.reply(body["messages"][-1]["content"])
+                if body.get("stream"):
+                    chunks = [
+                        reply[i: i + mock.stream_chunk_size] for i in range(0, len(reply), mock.stream_chunk_size)
+                    ]
+                    payload = "".join(
+                        f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]}, ensure_ascii=False)}\n\n"
+                        for chunk in chunks
+                    ) + "data: [DONE]\n\n"
+                    content_type = "text/event-stream"
+                else:
+                    payload = json.dumps({"choices": [{"message": {"content": reply}}]}, ensure_ascii=False)
+                    content_type = "application/json"
+                data = payload.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._server.handle_error = lambda request, client_address: None
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class RecordedResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} 错误")
+
+
+class RecordedRequests:
+    """ requests 模块的替身：按 URL 返回录制的 GitHub / Gitee 响应 """
+
+    def __init__(self, latency: float = 0.0, fixture_dir: str = FIXTURE_DIR):
+        """
+        Args:
+            latency: 每次请求模拟的网络耗时（秒）
+        """
+        self.latency = latency
+        self.calls = 0
+
+        def read(name: str) -> str:
+            with open(os.path.join(fixture_dir, name), encoding="utf-8") as f:
+                return f.read()
+
+        self._routes = [
+            ("https://api.github.com/search/repositories", read("github_search_repositories.json")),
+            ("https://gitee.com/api/v5/search/repositories", read("gitee_search_repositories.json")),
+        ]
+        self._readme = read("github_readme.md")
+
+    def get(self, url: str, params: dict = None, headers: dict = None, timeout: float = None) -> RecordedResponse:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        for prefix, text in self._routes:
+            if url.startswith(prefix):
+                return RecordedResponse(200, text)
+        if url.startswith("https://api.github.com/repos/") and url.endswith("/readme"):
+            return RecordedResponse(200, self._readme)
+        return RecordedResponse(404, "{}")
+
+
+def install_stand_ins(embed_latency: float = 0.0, http_latency: float = 0.0, vector_path: Optional[str] = None) -> dict:
+    """
+    用替身替换外部依赖（在导入 app 模块之后、发出请求之前调用）
+
+    Args:
+        embed_latency: 每段文本模拟的向量化耗时（秒）
+        http_latency: 每次 GitHub / Gitee 请求模拟的网络耗时（秒）
+        vector_path: 本地向量检索的数据目录，为空时使用新建的临时目录（进程退出时删除）
+
+    Returns:
+        {"vector_path": 数据目录, "embedding": ..., "requests": RecordedRequests}
+    """
+    from app import cache_pool
+    from app.service import search
+    from config import config
+
+    if vector_path is None:
+        vector_path = tempfile.mkdtemp(prefix="bench-vectors-")
+        atexit.register(shutil.rmtree, vector_path, ignore_errors=True)
+    config.vector_backend = "local"
+    config.local_vector_path = vector_path
+
+    embedding = HashingEmbeddingFunction(latency_per_text=embed_latency)
+    cache_pool.bge_m3_ef = cache_pool.TimedEmbeddingFunction(embedding)
+
+    recorded = RecordedRequests(latency=http_latency)
+    search.requests = recorded
+    return {"vector_path": vector_path, "embedding": embedding, "requests": recorded}
+
+
+# 合成数据：招聘要求与概念
+CITIES = ["北京", "上海", "深圳", "杭州", "广州"]
+JOB_TITLES = ["Python开发", "Java开发", "Golang开发", "前端开发", "数据工程师", "算法工程师"]
+SKILLS = ["Django", "FastAPI", "Redis", "Kafka", "MySQL", "Kubernetes", "React", "Spark", "PyTorch", "Spring"]
+CONCEPTS = ["芯片", "光伏", "锂电池", "算力", "机器人", "创新药", "储能", "低空经济"]
+
+
+def synthetic_job_requirements(count: int, seed: int = 0) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    jobs = []
+    for i in range(count):
+        title = JOB_TITLES[i % len(JOB_TITLES)]
+        skills = rng.choice(SKILLS, size=3, replace=False)
+        jobs.append({
+            "city": CITIES[i % len(CITIES)],
+            "salary": f"{15 + i % 20}-{25 + i % 20}K",
+            "seniority": f"{1 + i % 5}-{3 + i % 5}年",
+            "company_name": f"公司{i}",
+            "company_industry": "互联网",
+            "company_info": "",
+            "job_title": title,
+            "job_detail": f"负责{title}相关系统的设计与开发，熟悉 {'、'.join(skills)}，有高并发系统经验优先。",
+        })
+    return jobs
+
+
+def synthetic_concept_records(stocks_per_concept: int = 30) -> List[dict]:
+    return [
+        {
+            "id": c,
+            "name": concept,
+            "definition": f"{concept}产业链相关公司，涵盖上游材料、中游制造与下游应用，受政策与技术迭代驱动。" * 3,
+            "stock_code": f"{c:02d}{s:04d}",
+            "stock_name": f"{concept}股份{s}",
+            "reason": f"公司主营业务涉及{concept}，{s} 号产品线已量产。",
+        }
+        for c, concept in enumerate(CONCEPTS)
+        for s in range(stocks_per_concept)
+    ]
+
+
+SAMPLE_RESUME_LINES = [
+    "张三",
+    "年龄：28",
+    "教育背景：某某大学 计算机科学与技术 本科",
+    "工作经历：某某科技有限公司 后端开发工程师 2019-至今",
+    "项目经验",
+    "订单中心重构",
+    "负责使用 Python、Django 和 Redis 实现订单缓存与异步任务，接口延迟降低 60%。",
+    "实时推荐服务",
+    "基于 Kafka 与 Go 实现实时特征计算，支撑日均 2 亿次请求。",
+]
+
+
+def make_docx(lines: List[str] = SAMPLE_RESUME_LINES) -> bytes:
+    import io
+    from docx import Document
+
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """生成单页 PDF（Helvetica，仅支持 ASCII 文本）"""
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = "BT /F1 11 Tf 14 TL 56 780 Td " + " ".join(f"({escape(line)}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{i} 0 obj\n{obj}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+
+SAMPLE_PDF_LINES = [
+    "Zhang San",
+    "Age: 28",
+    "Education: Some University, Computer Science, Bachelor",
+    "Work Experience: Some Tech Co., Backend Engineer, 2019-present",
+    "Projects",
+    "Order Center Refactor",
+    "Built order caching and async jobs with Python, Django and Redis; cut API latency by 60%.",
+    "Realtime Recommendation Service",
+    "Realtime feature computation with Kafka and Go serving 200M requests per day.",
+]
@@ -0,0 +1,45 @@
+"""
+替换外部依赖后的 FastAPI 应用，供压测启动（uvicorn benchmarks.stub_app:app --workers N）
+
+每个 worker 进程导入本模块时安装本地替身并写入合成数据，参数通过环境变量传入：
+    BENCH_LLM_URL          模拟 LLM 服务地址（必填，由 load_test.py 启动）
+    BENCH_EMBED_LATENCY    每段文本模拟的向量化耗时（秒）
+    BENCH_HTTP_LATENCY     GitHub / Gitee 每次请求模拟的延迟（秒）
+    BENCH_JOBS             写入的招聘要求条数
+    BENCH_STOCKS_PER_CONCEPT  每个概念写入的个股条数
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.stand_ins import install_stand_ins
+from benchmarks.bench_suite import seed
+from config import PLog
+
+# 与 server.py 相同的日志配置，日志开销计入压测结果
+PLog()
+
+install_stand_ins(
+    embed_latency=float(os.environ.get("BENCH_EMBED_LATENCY", 0)),
+    http_latency=float(os.environ.get("BENCH_HTTP_LATENCY", 0)),
+)
+seed(int(os.environ.get("BENCH_JOBS", 2000)), int(os.environ.get("BENCH_STOCKS_PER_CONCEPT", 30)))
+
+from app import app
+from app.service.llm_client import ChatClient
+from app.service.llm_router import Endpoint, LLMRouter
+from app.service.prompt_budget import PromptCompressor, TokenCounter
+from app.service.resume_generator import get_resume_generator
+
+resume_generator = get_resume_generator()
+resume_generator.llm_client = LLMRouter(
+    [Endpoint("mock", ChatClient(api_key="bench", base_url=os.environ["BENCH_LLM_URL"], model="mock"))]
+)
+# 不加载分词器（估算 token 数），避免下载模型
+resume_generator.prompt_compressor = PromptCompressor(TokenCounter())
+
+__all__ = ["app"]
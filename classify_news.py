@@ -0,0 +1,77 @@
+"""
+离线批量新闻概念分类
+
+输入为 JSON 数组或 NDJSON 文件，每项是新闻文本或包含 "news" 字段的对象；
+输出为 NDJSON，每行是输入项附加 concept、distance。
+
+用法:
+    python classify_news.py news.ndjson -o result.ndjson --top-k 5 --batch-size 64
+"""
+import sys
+import json
+import time
+import argparse
+from typing import Iterator, List
+
+from loguru import logger
+
+from app.service.concept import classify_news
+from config import config
+
+
+def iter_items(path: str) -> Iterator[dict]:
+    """逐条读取 JSON 数组或 NDJSON"""
+    with open(path, encoding="utf-8") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == "[":
+            items = json.load(f)
+        else:
+            items = (json.loads(line) for line in f if line.strip())
+        for item in items:
+            yield item if isinstance(item, dict) else {"news": item}
+
+
+def iter_chunks(items: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线批量新闻概念分类")
+    parser.add_argument("input", help="JSON 数组或 NDJSON 文件")
+    parser.add_argument("-o", "--output", help="结果 NDJSON 文件，默认输出到 stdout")
+    parser.add_argument("--top-k", type=int, default=5, help="每条新闻参与投票的命中数")
+    parser.add_argument(
+        "--batch-size", type=int, default=getattr(config, "concept_batch_size", 64),
+        help="每批向量化与检索的条数"
+    )
+    args = parser.parse_args()
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    total, start = 0, time.perf_counter()
+    try:
+        # 每次读取若干批，避免大文件全部读入内存
+        for chunk in iter_chunks(iter_items(args.input), args.batch_size * 16):
+            results, _ = classify_news([item["news"] for item in chunk], args.top_k, args.batch_size)
+            for item, result in zip(chunk, results):
+                output.write(json.dumps({**item, **result}, ensure_ascii=False) + "\n")
+            total += len(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"共 {total} 条，耗时 {elapsed:.2f}s，{total / elapsed if elapsed else 0:.1f} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,9 @@ config = {
 # log-config
 class PLog:
     """ 自定义的日志配置
+
+    日志写入放到后台线程（enqueue），请求线程只负责入队；
+    文件日志默认输出 JSON（每行一条），便于采集与检索。
     """
     
     log_format = (
@@ -33,43 +36,36 @@ class PLog:
         logger.remove()
         self._log_path = "logs"
         os.makedirs(self._log_path, exist_ok=True)
+        self._enqueue = getattr(config, "log_enqueue", True)
+        self._serialize = getattr(config, "log_json", True)
+        # diagnose 会在异常日志中展开每一层的变量值，开销大且可能泄露请求内容
+        self._diagnose = getattr(config, "log_diagnose", False)
         self._init_stdout_log()
         self._init_debug_log()
         self._init_info_log()
         self._init_error_log()
 
-    def _init_info_log(self):
+    def _add_file_log(self, name: str, level: str, retention: str):
         logger.add(
-            os.path.join(self._log_path, "info.log.{time:YYYY-MM-DD}"),
+            os.path.join(self._log_path, f"{name}.log.{{time:YYYY-MM-DD}}"),
             format=self.log_format,
-            level="INFO",
+            level=level,
             rotation="00:00",
-            retention="3 days",
+            retention=retention,
+            enqueue=self._enqueue,
+            serialize=self._serialize,
             backtrace=True,
-            diagnose=True,
+            diagnose=self._diagnose,
         )
+
+    def _init_info_log(self):
+        self._add_file_log("info", "INFO", "3 days")
     
     def _init_error_log(self):
-        logger.add(
-            os.path.join(self._log_path, "error.log.{time:YYYY-MM-DD}"),
-            format=self.log_format,
-            level="ERROR",
-            rotation="00:00",
-            retention="3 days",
-            backtrace=True,
-            diagnose=True,
-        )
+        self._add_file_log("error", "ERROR", "3 days")
 
     def _init_debug_log(self):
-        logger.add(
-            os.path.join(self._log_path, "debug.log.{time:YYYY-MM-DD}"),
-            format=self.log_format,
-            level="DEBUG",
-            rotation="00:00",
-            retention="1 days",
-            backtrace=True,
-            diagnose=True,
-        )
+        self._add_file_log("debug", "DEBUG", "1 days")
     
     def _init_stdout_log(self):
         logger.add(
@@ -77,4 +73,5 @@ class PLog:
             format=self.log_format,
             level="INFO",
             colorize=True,
+            enqueue=self._enqueue,
         )
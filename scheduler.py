@@ -3,19 +3,25 @@ import time
 from datetime import datetime
 
 from tqdm import tqdm
+from loguru import logger
 
-from app.model.concept import ConceptSchema, JobRequirementSchema
+from app.model.concept import ConceptSchema, ConceptCentroidSchema, JobRequirementSchema
 from app.db.milvus import init_milvus_db, init_milvus_collection
-from app.service.concept import get_concept_stocks
+from app.service.concept import ConceptCentroidBuilder, embed_concept_records, get_concept_stocks
 from app.service.data_collector import data_collector
-from app.repositry.milvus import delete_with_condition, embedding_and_insert
-from utils.utils import average_split
+from app.repositry.milvus import (
+    CONCEPT_CENTROID_COLLECTION, delete_with_condition, insert_concepts, replace_concept_centroids
+)
 from config import config
 
 
 def init_milvus():
+    # 本地向量检索在首次写入时创建数据目录
+    if getattr(config, "vector_backend", "milvus") == "local":
+        return
     client = init_milvus_db()
     init_milvus_collection(client, config.milvus_collection, ConceptSchema)
+    init_milvus_collection(client, CONCEPT_CENTROID_COLLECTION, ConceptCentroidSchema)
 
 
 def update_concept_collection():
@@ -23,17 +29,33 @@ def update_concept_collection():
     
     delete_with_condition("pk>=0")
     
-    group = average_split(data, 50)
-    with tqdm(total=len(group)) as pbar:
-        for item in group:
-            docs = [
-                f"{i['name']}: {i['definition']}。{i['stock_name']}({i['stock_code']}), {i['reason']}"
-                for i in item
-            ]
-            stock_codes = [i["stock_code"] for i in item]
-            concepts = [i["name"] for i in item]
-            embedding_and_insert(docs, concepts, stock_codes)
+    # 按概念分组：概念定义每个概念只向量化一次
+    groups = {}
+    for record in data:
+        groups.setdefault(record["id"], []).append(record)
+    
+    centroid_builder = ConceptCentroidBuilder(getattr(config, "concept_centroids_per_concept", 3))
+    encoded, encoded_chars, doc_chars = 0, 0, 0
+    with tqdm(total=len(groups)) as pbar:
+        for records in groups.values():
+            embeddings = embed_concept_records(records)
+            insert_concepts(
+                embeddings["docs"], embeddings["concepts"], embeddings["stock_codes"],
+                embeddings["sparse"], embeddings["dense"]
+            )
+            centroid_builder.add(embeddings["concepts"], embeddings["sparse"], embeddings["dense"])
+            encoded += embeddings["encoded"]
+            encoded_chars += embeddings["encoded_chars"]
+            doc_chars += embeddings["doc_chars"]
             pbar.update(1)
+    # 记录数与实际向量化的不重复文本数；字符数对比逐条向量化记录文本时的工作量
+    logger.info(
+        f"概念入库 {len(data)} 条记录（{len(groups)} 个概念），向量化 {encoded} 段不重复文本，"
+        f"共 {encoded_chars} 字（逐条向量化需 {doc_chars} 字）"
+    )
+    
+    # 每个概念的中心向量，新闻分类只需在这些向量中检索
+    replace_concept_centroids(*centroid_builder.build())
 
 
 def update_concept_collection_everyday():
@@ -1,7 +1,7 @@
 import uvicorn
 
 from app.db.milvus import init_milvus_collection, init_milvus_db
-from app.model.concept import ConceptSchema, JobRequirementSchema
+from app.model.concept import ConceptSchema, ConceptCentroidSchema, JobRequirementSchema
 from config import config, PLog
 
 PLog()
@@ -11,12 +11,21 @@ def init_milvus():
     """初始化 Milvus 连接和必要的 Collections"""
     from loguru import logger
     
+    if getattr(config, "vector_backend", "milvus") == "local":
+        logger.info(f"使用本地向量检索，数据目录 {getattr(config, 'local_vector_path', 'data/vectors')}")
+        return
+    
     try:
         client = init_milvus_db()
         
         # 初始化 ConceptSchema（向后兼容）
         init_milvus_collection(client, config.milvus_collection, ConceptSchema)
         
+        # 初始化概念中心向量（新闻分类）
+        init_milvus_collection(
+            client, getattr(config, "concept_centroid_collection", "concept_centroids"), ConceptCentroidSchema
+        )
+        
         # 初始化 JobRequirementSchema（招聘要求）
         job_collection = getattr(config, "job_requirement_collection", "job_requirements")
         from app.model.concept import JobRequirementSchema
@@ -0,0 +1,202 @@
+"""
+概念分类测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.service.concept import get_most_relevant_concept, vote_concepts
+
+
+def test_vote_concepts_matches_single_item_vote():
+    """批量投票与逐条 get_most_relevant_concept 的结果一致（含票数相同的情况）"""
+    import random
+
+    rng = random.Random(0)
+    concepts_list = [
+        [
+            {"concept": rng.choice(["芯片", "光伏", "锂电池", "算力"]), "distance": rng.random()}
+            for _ in range(rng.randint(1, 6))
+        ]
+        for _ in range(200)
+    ] + [[]]
+
+    results = vote_concepts(concepts_list)
+    assert results[-1] == (None, None)
+    for concepts, (concept_name, score) in zip(concepts_list, results):
+        if concepts:
+            expected_name, expected_score = get_most_relevant_concept(concepts)
+            assert concept_name == expected_name
+            assert abs(score - expected_score) < 1e-9
+
+
+def test_concept_centroid_builder_across_batches():
+    """跨批次的同一概念合并计算；每个概念至多 per_concept 个中心向量，稀疏向量取簇内均值"""
+    import numpy as np
+    from scipy import sparse as sp
+    from app.service.concept import ConceptCentroidBuilder
+
+    builder = ConceptCentroidBuilder(per_concept=2)
+    # 芯片的记录分成两个方向，光伏只有一条记录
+    dense = np.array([[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0], [0, 0.9, 0.1], [0, 0, 1]], dtype=np.float32)
+    sparse = sp.csr_array(np.array([[2, 0], [4, 0], [0, 2], [0, 4], [1, 1]], dtype=np.float32))
+    concepts = ["芯片", "芯片", "芯片", "芯片", "光伏"]
+    builder.add(concepts[:3], sparse[:3], dense[:3])
+    builder.add(concepts[3:], sparse[3:], dense[3:])
+
+    names, sparse_centroids, dense_centroids = builder.build()
+    assert names == ["芯片", "芯片", "光伏"]
+    assert np.allclose(np.linalg.norm(dense_centroids, axis=1), 1)
+    assert np.allclose(dense_centroids[:2].argmax(axis=1), [0, 1])
+    assert np.allclose(sparse_centroids.toarray(), [[3, 0], [0, 3], [1, 1]])
+
+
+def test_embed_concept_records_encodes_each_text_once():
+    """概念定义只向量化一次，记录向量由定义与个股文本的向量组合而成"""
+    import numpy as np
+    from scipy import sparse as sp
+    from app.service.concept import embed_concept_records
+
+    encoded = []
+
+    def encode(texts):
+        encoded.extend(texts)
+        vocab = ["芯片", "半导体", "A", "B"]
+        sparse = np.array([[float(text.count(word)) for word in vocab] for text in texts])
+        return {"sparse": sp.csr_array(sparse), "dense": list(sparse + 1)}
+
+    records = [
+        {"name": "芯片", "definition": "半导体 半导体", "stock_name": name, "stock_code": code, "reason": "芯片"}
+        for name, code in [("A", "001"), ("B", "002"), ("A", "001")]
+    ]
+    embeddings = embed_concept_records(records, encode)
+
+    assert encoded == ["芯片: 半导体 半导体", "A(001), 芯片", "B(002), 芯片"]
+    assert embeddings["encoded"] == 3
+    assert embeddings["docs"][0] == "芯片: 半导体 半导体。A(001), 芯片"
+    assert embeddings["stock_codes"] == ["001", "002", "001"]
+    # 稀疏向量逐词取最大值
+    assert np.allclose(embeddings["sparse"].toarray()[0], [1, 2, 1, 0])
+    assert np.allclose(np.linalg.norm(embeddings["dense"], axis=1), 1)
+    assert np.allclose(embeddings["dense"][0], embeddings["dense"][2])
+
+
+def _pooled_encode(texts):
+    """
+    与 BGE-M3 输出形式相同的简化模型：字符二元组为 token，
+    稀疏向量为每个 token 的权重（重复出现取最大值），稠密向量为 token 向量的均值（归一化）
+    """
+    import zlib
+    import numpy as np
+    from scipy import sparse as sp
+
+    vocab, dim = 4096, 64
+    rng = np.random.default_rng(0)
+    table = rng.standard_normal((vocab, dim)).astype(np.float32)
+    token_weights = rng.uniform(0.05, 0.4, vocab)
+
+    rows, cols, values, dense = [], [], [], []
+    for row, text in enumerate(texts):
+        tokens = [zlib.crc32(text[i:i + 2].encode()) % vocab for i in range(len(text) - 1)]
+        unique = sorted(set(tokens))
+        rows += [row] * len(unique)
+        cols += unique
+        values += [token_weights[token] for token in unique]
+        vector = table[tokens].mean(axis=0)
+        dense.append(vector / np.linalg.norm(vector))
+    return {"sparse": sp.csr_array((values, (rows, cols)), shape=(len(texts), vocab)), "dense": dense}
+
+
+def test_composed_concept_vectors_preserve_search_quality():
+    """组合向量与逐条向量化整段记录文本的检索结果基本一致（召回不下降）"""
+    import random
+    import numpy as np
+    from scipy import sparse as sp
+    from app.service.concept import embed_concept_records
+
+    rng = random.Random(0)
+    chars = [chr(code) for code in range(0x4e00, 0x4e00 + 400)]
+
+    def phrase(length):
+        return "".join(rng.choice(chars) for _ in range(length))
+
+    groups = []
+    for c in range(10):
+        name, definition = phrase(3), "，".join(phrase(6) for _ in range(8))
+        groups.append([
+            {
+                "name": name, "definition": definition, "stock_name": phrase(4),
+                "stock_code": f"{c:02d}{s:04d}", "reason": "，".join(phrase(5) for _ in range(3))
+            }
+            for s in range(20)
+        ])
+    embeddings = [embed_concept_records(records, _pooled_encode) for records in groups]
+    records = [record for records in groups for record in records]
+    docs = [doc for item in embeddings for doc in item["docs"]]
+    # 只向量化不重复的文本
+    assert sum(item["encoded_chars"] for item in embeddings) < 0.6 * sum(len(doc) for doc in docs)
+
+    composed = {
+        "sparse": sp.vstack([item["sparse"] for item in embeddings]),
+        "dense": np.vstack([item["dense"] for item in embeddings]),
+    }
+    per_record = _pooled_encode(docs)
+    per_record = {"sparse": per_record["sparse"], "dense": np.vstack(per_record["dense"])}
+
+    # 查询为某只个股入选理由的片段加股票名称，目标为该条记录
+    sample = rng.sample(range(len(records)), 60)
+    queries = _pooled_encode([records[i]["reason"].split("，")[1] + records[i]["stock_name"] for i in sample])
+    query_vectors = {"sparse": queries["sparse"], "dense": np.vstack(queries["dense"])}
+
+    def scores(vectors, field):
+        result = query_vectors[field] @ vectors[field].T
+        return result.toarray() if sp.issparse(result) else result
+
+    def top(row, k):
+        return set(np.argsort(-row, kind="stable")[:k])
+
+    for field in ["sparse", "dense"]:
+        composed_scores, per_record_scores = scores(composed, field), scores(per_record, field)
+        overlap = np.mean([
+            len(top(a, 10) & top(b, 10)) / 10 for a, b in zip(composed_scores, per_record_scores)
+        ])
+        recall = [
+            np.mean([target in top(row, 5) for row, target in zip(field_scores, sample)])
+            for field_scores in (composed_scores, per_record_scores)
+        ]
+        assert overlap >= 0.8, field
+        assert recall[0] >= recall[1] - 0.05, field
+
+    cosine = np.sum(composed["dense"] * per_record["dense"], axis=1)
+    assert cosine.mean() > 0.98
+
+
+def test_classify_news_falls_back_until_centroids_are_built(monkeypatch):
+    """概念中心向量不存在或为空时按个股记录检索后投票，构建完成后改用中心向量"""
+    from app.service import concept
+
+    counts = []
+    monkeypatch.setattr(concept.config, "concept_index", "centroid", raising=False)
+    monkeypatch.setattr(concept.config, "concept_centroid_check_interval", 0, raising=False)
+    monkeypatch.setattr(concept, "_centroids_ready", False)
+    monkeypatch.setattr(concept, "_centroids_checked_at", float("-inf"))
+    monkeypatch.setattr(concept, "count_concept_centroids", lambda: counts.pop(0))
+    monkeypatch.setattr(concept, "embedding_and_query_batch", lambda news, top_k, batch_size: [
+        [{"concept": "芯片", "distance": 0.5}, {"concept": "芯片", "distance": 0.3}] for _ in news
+    ])
+    monkeypatch.setattr(concept, "query_concept_centroids", lambda news, top_k, batch_size: [
+        [{"concept": "光刻机", "distance": 0.9}] for _ in news
+    ])
+
+    def missing():
+        raise RuntimeError("collection not found")
+
+    counts.extend([0, 3])
+    assert concept.classify_news(["新闻"])[0] == [{"concept": "芯片", "distance": 0.4}]
+    assert concept.classify_news(["新闻"])[0] == [{"concept": "光刻机", "distance": 0.9}]
+    monkeypatch.setattr(concept, "count_concept_centroids", missing)
+    assert concept.classify_news(["新闻"])[0] == [{"concept": "芯片", "distance": 0.4}]
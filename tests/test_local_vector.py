@@ -0,0 +1,119 @@
+"""
+进程内向量检索（app/db/local_vector.py）测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+from scipy import sparse as sp
+from pymilvus import AnnSearchRequest, RRFRanker
+
+from app.db.local_vector import LocalCollection
+from app.model.concept import BGE_M3_DENSE_DIM, JobRequirementSchema
+
+# 6 条招聘要求（主键依次为 0-5）：稠密向量在第 0 维的分量与稀疏向量在词 7 上的权重决定两路召回的排序
+#   稠密召回：0 > 1 > 2 > 3 > 4 > 5
+#   稀疏召回：3 > 1 > 2 > 5 > 4 > 0
+DENSE = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
+SPARSE = [0.1, 0.5, 0.45, 0.6, 0.2, 0.3]
+CITIES = ["上海", "北京", "上海", "深圳", "北京", "上海"]
+SALARIES = ["25-35K", "15-25K", "25-35K", "15-25K", "25-35K", "25-35K"]
+TERM = 7
+
+
+def _entities(rows: list) -> list:
+    dense = np.zeros((len(rows), BGE_M3_DENSE_DIM), dtype=np.float32)
+    dense[:, 0] = [DENSE[i] for i in rows]
+    sparse = sp.csr_array(([SPARSE[i] for i in rows], (list(range(len(rows))), [TERM] * len(rows))),
+                          shape=(len(rows), TERM + 1))
+    return [
+        [CITIES[i] for i in rows],
+        [SALARIES[i] for i in rows],
+        ["3-5年"] * len(rows),
+        [f"公司{i}" for i in rows],
+        [""] * len(rows),
+        [""] * len(rows),
+        ["Python开发"] * len(rows),
+        [""] * len(rows),
+        sparse,
+        list(dense),
+    ]
+
+
+def _query():
+    dense = np.zeros((1, BGE_M3_DENSE_DIM), dtype=np.float32)
+    dense[0, 0] = 1
+    return {"dense": list(dense), "sparse": sp.csr_array(([1.0], ([0], [TERM])), shape=(1, 250002))}
+
+
+def _hybrid(collection, expr: str = None, limit: int = 6) -> list:
+    query = _query()
+    reqs = [
+        AnnSearchRequest(query["sparse"], "sparse_vector", {"metric_type": "IP"}, limit=limit, expr=expr),
+        AnnSearchRequest(query["dense"], "dense_vector", {"metric_type": "IP"}, limit=limit, expr=expr),
+    ]
+    hits = collection.hybrid_search(reqs, rerank=RRFRanker(), limit=limit, output_fields=["company_name"])[0]
+    return [(hit.id, round(hit.distance, 6)) for hit in hits]
+
+
+def _rrf(*ranks) -> float:
+    return round(sum(1 / (60 + rank) for rank in ranks), 6)
+
+
+def _load(path: str, max_segments: int = 16) -> LocalCollection:
+    collection = LocalCollection("jobs", JobRequirementSchema, path, max_segments=max_segments)
+    for rows in ([0, 1], [2, 3], [4, 5]):
+        collection.insert(_entities(rows))
+    return collection
+
+
+def test_hybrid_search_rrf_and_filters(tmp_path):
+    """RRF 融合分数为 Σ 1 / (60 + 名次)；过滤表达式作用于每一路召回；合并数据段后结果不变"""
+    collection = _load(str(tmp_path / "jobs"), max_segments=2)
+    assert collection.num_entities == 6
+    # 超过数据段上限后已合并
+    assert len(collection._read_manifest()["segments"]) <= 2
+
+    # (主键, 稠密名次, 稀疏名次)
+    assert _hybrid(collection) == [
+        (1, _rrf(2, 2)), (3, _rrf(4, 1)), (2, _rrf(3, 3)), (0, _rrf(1, 6)), (5, _rrf(6, 4)), (4, _rrf(5, 5))
+    ]
+    # 每一路只召回前 limit 条：稠密 {0, 1, 2}、稀疏 {3, 1, 2}
+    assert _hybrid(collection, limit=3)[:2] == [(1, _rrf(2, 2)), (2, _rrf(3, 3))]
+    assert _hybrid(collection, 'city == "上海"') == [(2, _rrf(2, 1)), (0, _rrf(1, 3)), (5, _rrf(3, 2))]
+    assert [pk for pk, _ in _hybrid(collection, 'city in ["北京", "深圳"] && salary != "15-25K"')] == [4]
+    assert [pk for pk, _ in _hybrid(collection, 'not (city == "上海" or city == "北京")')] == [3]
+    assert _hybrid(collection, 'city == "广州"') == []
+
+    hits = collection.search(_query()["dense"], "dense_vector", {}, limit=3, expr='city == "北京"',
+                             output_fields=["company_name", "salary"])[0]
+    assert [(hit.id, round(hit.distance, 6)) for hit in hits] == [(1, 0.8), (4, 0.5)]
+    assert [hit.fields for hit in hits] == [
+        {"company_name": "公司1", "salary": "15-25K"}, {"company_name": "公司4", "salary": "25-35K"}
+    ]
+
+
+def test_delete_and_reload_across_instances(tmp_path):
+    """删除后检索不再返回被删除的数据；同一目录上的其他实例（其他进程）重新加载后可见"""
+    path = str(tmp_path / "jobs")
+    writer = _load(path)
+    reader = LocalCollection("jobs", JobRequirementSchema, path)
+    assert reader.num_entities == 6
+
+    writer.delete('city == "北京"')
+    assert reader.num_entities == 4
+    assert _hybrid(reader) == [(3, _rrf(3, 1)), (2, _rrf(2, 2)), (0, _rrf(1, 4)), (5, _rrf(4, 3))]
+
+    writer.delete("pk>=0")
+    assert reader.num_entities == 0
+    assert _hybrid(reader) == []
+    assert sorted(os.listdir(path)) == [".lock", "manifest.json"]
+
+    writer.insert(_entities([0, 1]))
+    # 主键不复用；分数相同按写入顺序
+    assert _hybrid(reader) == [(6, _rrf(1, 2)), (7, _rrf(2, 1))]
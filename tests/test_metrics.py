@@ -0,0 +1,57 @@
+"""
+指标与 Server-Timing 测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.service.metrics import MetricsRegistry, timed
+
+
+def test_registry_renders_prometheus_text():
+    """直方图按桶累计输出，标签值转义"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "示例", ["stage"], buckets=(0.1, 1))
+    counter = registry.counter("demo_total", "示例", ["result"])
+    histogram.observe(0.05, stage="embed")
+    histogram.observe(0.5, stage="embed")
+    counter.inc(result='a"b')
+
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="embed",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="embed",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="embed",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{stage="embed"} 2' in text
+    assert 'demo_total{result="a\\"b"} 1' in text
+
+
+def test_server_timing_header_includes_thread_stages():
+    """线程中（asyncio.to_thread）记录的阶段耗时也计入当前请求的 Server-Timing"""
+    import time
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.middleware import ServerTimingMiddleware
+
+    def search():
+        with timed("milvus", "search"):
+            time.sleep(0.01)
+
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with timed("embed"):
+            pass
+        await asyncio.to_thread(search)
+        return {}
+
+    header = TestClient(app).get("/items/1").headers["server-timing"]
+    stages = dict(part.split(";dur=") for part in header.split(", "))
+    assert list(stages) == ["embed", "milvus.search", "total"]
+    assert float(stages["milvus.search"]) >= 10
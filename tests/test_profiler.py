@@ -0,0 +1,62 @@
+"""
+CPU / 内存分析测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def test_sampling_profiler_collapsed_stacks():
+    """采样结果为 collapsed stack 格式，包含忙碌线程的函数"""
+    import threading
+    from app.service.profiler import SamplingProfiler
+
+    stop = threading.Event()
+
+    def busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    thread = threading.Thread(target=busy_loop, name="busy")
+    thread.start()
+    try:
+        collapsed = SamplingProfiler().sample(0.2, interval=0.005)
+    finally:
+        stop.set()
+        thread.join()
+
+    lines = collapsed.splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("busy_loop (test_profiler.py:" in line for line in busy)
+
+
+def test_admin_endpoints_require_token(monkeypatch):
+    """未配置或 Token 不匹配时拒绝访问；内存快照返回与上一次的差异"""
+    from fastapi.testclient import TestClient
+    from app import app
+    from app.handler import admin
+
+    client = TestClient(app)
+    assert client.post("/api/v1/admin/memory/start").json()["code"] == 403
+
+    monkeypatch.setattr(admin.config, "admin_token", "secret", raising=False)
+    headers = {"X-Admin-Token": "secret"}
+    assert client.post("/api/v1/admin/memory/start", headers={"X-Admin-Token": "wrong"}).json()["code"] == 403
+    try:
+        assert client.post("/api/v1/admin/memory/start", headers=headers).json()["data"] == {"tracing": True}
+        first = client.get("/api/v1/admin/memory/snapshot", headers=headers).json()["data"]
+        assert first["top"] and first["diff"] == []
+        retained = [bytearray(1024) for _ in range(1000)]
+        second = client.get("/api/v1/admin/memory/snapshot", headers=headers).json()["data"]
+        assert second["diff"] and max(item["size_diff"] for item in second["diff"]) >= 1024 * 1000
+        del retained
+    finally:
+        client.post("/api/v1/admin/memory/stop", headers=headers)
+
+    response = client.post("/api/v1/admin/profile/cpu?seconds=0.05", headers=headers)
+    assert response.headers["content-type"].startswith("text/plain")
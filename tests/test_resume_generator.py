@@ -0,0 +1,744 @@
+"""
+简历生成测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.service.json_stream import JSONObjectStream
+
+
+# 两次调用模式下项目经验提示词的标记
+PROJECT_PROMPT_MARK = "JSON 格式返回"
+PROJECTS_REPLY = '[{"name": "订单中心", "description": "d", "tech_stack": ["Go"], "responsibilities": []}]'
+
+
+class FakeLLMClient:
+    """ LLM 客户端替身：按提示词返回预设回复，记录每次调用与最大并发数 """
+
+    name, model, temperature = "fake", "fake-model", 0.7
+
+    def __init__(self, reply=None, delay: float = 0.0):
+        """
+        Args:
+            reply: 回复文本，或根据提示词返回回复的函数；默认项目提示词返回 PROJECTS_REPLY，
+                   其他提示词返回带调用序号的简历
+            delay: 每次调用的模拟耗时（秒）
+        """
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+        self.running = 0
+        self.max_running = 0
+
+    @property
+    def kinds(self) -> list:
+        """每次调用的类型（projects / resume）"""
+        return ["projects" if PROJECT_PROMPT_MARK in prompt else "resume" for prompt in self.prompts]
+
+    def is_fallback(self, text):
+        return False
+
+    async def generate(self, prompt, max_tokens=2000):
+        import asyncio
+
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if self.reply is None:
+            return PROJECTS_REPLY if PROJECT_PROMPT_MARK in prompt else f"# 简历 {len(self.prompts)}"
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+    async def stream(self, prompt, max_tokens=2000):
+        text = await self.generate(prompt, max_tokens)
+        for i in range(0, len(text), 4):
+            yield text[i:i + 4]
+
+
+def test_json_object_stream_yields_each_project_when_complete():
+    """项目 JSON 对象在 token 流中完整到达时立即返回"""
+    text = '```json\n[\n  {"name": "订单中心", "description": "含 {括号} 与 \\"引号\\"", "tech_stack": ["Go"]},\n  {"name": "日志平台", "tech_stack": []}\n]\n```'
+    stream = JSONObjectStream()
+
+    completed = []
+    for i in range(0, len(text), 5):
+        for item in stream.feed(text[i:i + 5]):
+            completed.append((i, item["name"]))
+
+    assert [name for _, name in completed] == ["订单中心", "日志平台"]
+    # 第一个项目在整个响应结束之前就已返回
+    assert completed[0][0] < text.index("日志平台")
+
+
+def test_llm_response_cache_exact_and_semantic_tiers():
+    """精确层按归一化提示词命中，语义层按向量相似度命中"""
+    import asyncio
+    import numpy as np
+    from app.service.llm_cache import LLMResponseCache
+
+    def embed(text):
+        # 按字符统计的简单向量，相近的提示词相似度高
+        vector = np.zeros(64, dtype=np.float32)
+        for char in text:
+            vector[ord(char) % 64] += 1
+        return vector
+
+    cache = LLMResponseCache(semantic_threshold=0.85, semantic_namespaces=["project"], embed=embed)
+    params = {"model": "deepseek-chat", "max_tokens": 2000}
+
+    async def run():
+        assert await cache.get("project", "Python 后端 上海  Redis", params) is None
+        await cache.set("project", "Python 后端 上海  Redis", params, "cached")
+        # 仅空白不同：精确层命中
+        assert await cache.get("project", "Python 后端 上海 Redis\n", params) == "cached"
+        # 内容相近：语义层命中
+        assert await cache.get("project", "Python 后端 上海 Redis Kafka", params) == "cached"
+        # 模型参数不同、未启用语义层的场景均不命中
+        assert await cache.get("project", "Python 后端 上海 Redis", {**params, "max_tokens": 100}) is None
+        assert await cache.get("resume", "Python 后端 上海 Redis Kafka", params) is None
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 3)
+
+
+def test_job_queue_limits_provider_concurrency(tmp_path):
+    """任务持久化到 SQLite，按 LLM 服务限制并发，可订阅状态变化"""
+    import asyncio
+    from app.service.job_store import JobStore
+    from app.service.job_queue import JobQueue
+
+    running = {"now": 0, "max": 0}
+
+    async def handler(request):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.05)
+        running["now"] -= 1
+        if request.get("fail"):
+            raise RuntimeError("生成失败")
+        return {"value": request["value"]}
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store, provider_concurrency={"deepseek": 2}, poll_interval=0.05)
+    queue.register("echo", handler)
+
+    async def run():
+        await queue.start()
+        jobs = [await queue.submit("echo", "deepseek", {"value": i}) for i in range(5)]
+        failed = await queue.submit("echo", "deepseek", {"value": -1, "fail": True})
+        statuses = [job["status"] async for job in queue.watch(jobs[-1]["id"])]
+        async for _ in queue.watch(failed["id"]):
+            pass
+        await queue.stop()
+        return jobs, failed, statuses
+
+    jobs, failed, statuses = asyncio.run(run())
+    assert running["max"] == 2
+    assert statuses[0] in ("pending", "running") and statuses[-1] == "succeeded"
+    # 结果从数据库读取，重新打开后仍然存在
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    assert [store.get(job["id"])["result"]["value"] for job in jobs] == list(range(5))
+    assert store.get(failed["id"])["status"] == "failed"
+    assert store.get(failed["id"])["error"] == "生成失败"
+
+
+def _start_mock_llm_server(reply: str, delay: float = 0, status: int = 200):
+    """本地 OpenAI 兼容的模拟服务，返回 (server, url)"""
+    import json
+    import time
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(delay)
+            self.send_response(status)
+            if body.get("stream"):
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                if status == 200:
+                    for char in reply:
+                        chunk = {"choices": [{"delta": {"content": char}}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.write(b"data: [DONE]\n\n")
+            else:
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(json.dumps({"choices": [{"message": {"content": reply}}]}).encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    # 对冲请求被取消后客户端断开连接，忽略写入错误
+    server.handle_error = lambda request, client_address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+
+def test_chat_client_stream_parses_sse(monkeypatch):
+    """SSE 流只取 data 行的增量文本：忽略注释、空行与无内容的增量，遇到 [DONE] 结束"""
+    import json
+    import asyncio
+    import httpx
+    from app.service import llm_client
+    from app.service.llm_client import ChatClient
+
+    def chunk(delta):
+        return "data: " + json.dumps({"choices": [{"delta": delta}]}, ensure_ascii=False)
+
+    body = "\n".join([
+        ": keep-alive",
+        chunk({"role": "assistant"}),
+        "",
+        chunk({"content": "你好"}),
+        "event: message",
+        'data:{"choices": [{"delta": {"content": "，世界"}}]}',
+        'data: {"choices": []}',
+        "",
+        "data: [DONE]",
+        chunk({"content": "结束后的内容"}),
+    ]) + "\n"
+    requests = []
+
+    def handle(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, content=body.encode())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(llm_client, "get_async_client", lambda: client)
+
+    async def run():
+        chat = ChatClient("key", "http://llm.test/v1/chat/completions", "mock")
+        deltas = [delta async for delta in chat.stream("hi", max_tokens=10)]
+        await client.aclose()
+        return deltas
+
+    assert asyncio.run(run()) == ["你好", "，世界"]
+    assert requests[0]["stream"] is True and requests[0]["max_tokens"] == 10
+
+
+def test_async_client_shared_per_event_loop():
+    """同一事件循环复用同一个客户端，不同事件循环各自创建；关闭后重新创建"""
+    import asyncio
+    from app.service.http_client import close_async_client, get_async_client
+
+    async def run():
+        first, second = get_async_client(), get_async_client()
+        await close_async_client()
+        reopened = get_async_client()
+        await close_async_client()
+        return first, second, reopened
+
+    first, second, reopened = asyncio.run(run())
+    other, _, _ = asyncio.run(run())
+    assert first is second
+    assert first.is_closed and reopened is not first
+    assert other is not first
+
+
+def test_llm_router_retries_breaks_circuit_and_hedges():
+    """失败的地址被重试绕过并熔断；慢地址触发对冲请求"""
+    import time
+    import asyncio
+    from app.service.llm_client import ChatClient
+    from app.service.llm_router import Endpoint, LLMRouter
+    from app.service.http_client import close_async_client
+
+    servers = {
+        "bad": _start_mock_llm_server("", status=500),
+        "slow": _start_mock_llm_server("slow", delay=1),
+        "fast": _start_mock_llm_server("fast"),
+    }
+
+    def endpoint(name):
+        return Endpoint(name, ChatClient("key", servers[name][1], "mock"), failure_threshold=2, cooldown=60)
+
+    async def run():
+        router = LLMRouter([endpoint("bad"), endpoint("fast")], max_attempts=3, backoff=0.01)
+        replies = [await router.generate("hi") for _ in range(5)]
+        streamed = "".join([delta async for delta in router.stream("hi")])
+        states = {item["name"]: item["state"] for item in router.stats()}
+
+        slow, fast = endpoint("slow"), endpoint("fast")
+        # 慢地址评分更优，先被选中
+        slow.latency, fast.latency = 0.01, 0.02
+        hedged = LLMRouter([slow, fast], hedge_delay=0.1)
+        start = time.perf_counter()
+        hedged_reply = await hedged.generate("hi")
+        elapsed = time.perf_counter() - start
+        await close_async_client()
+        return replies, streamed, states, hedged_reply, elapsed
+
+    try:
+        replies, streamed, states, hedged_reply, elapsed = asyncio.run(run())
+    finally:
+        for server, _ in servers.values():
+            server.shutdown()
+
+    assert replies == ["fast"] * 5 and streamed == "fast"
+    assert states == {"bad": "open", "fast": "closed"}
+    assert hedged_reply == "fast" and elapsed < 0.9
+
+
+def test_prompt_compressor_keeps_relevant_sentences_within_budget():
+    """超出预算的文本保留与目标最相关的句子，并保持原文顺序"""
+    import numpy as np
+    from app.service.prompt_budget import PromptCompressor, TokenCounter
+
+    keywords = ["Go", "Kafka", "团建", "食堂"]
+
+    def embed(sentences, query):
+        def vector(text):
+            return np.array([float(k in text) for k in keywords] + [0.1], dtype=np.float32)
+        return np.stack([vector(s) for s in sentences]), vector(query)
+
+    compressor = PromptCompressor(TokenCounter(), budgets={"job_requirements": 30}, embed=embed)
+    detail = "公司每月组织团建活动。熟悉 Go 语言并发编程。员工食堂提供免费午餐。有 Kafka 消息队列使用经验。"
+    counter = compressor.counter
+
+    assert compressor.fit(detail, "Go Kafka", None) == detail
+    [compressed] = compressor.fit_section("job_requirements", [detail], "Go Kafka 后端")
+    assert compressed == "熟悉 Go 语言并发编程。有 Kafka 消息队列使用经验。"
+    assert counter.count(compressed) <= 30 < counter.count(detail)
+    # 每项平均分配分区预算
+    assert compressor.item_budget("job_requirements", 3) == 10
+    assert compressor.item_budget("open_source_projects", 4) is None
+
+
+def test_single_call_mode_renders_resume_locally(monkeypatch):
+    """单次调用模式只调用一次 LLM，Markdown 在本地渲染，个人信息取自原简历"""
+    import json
+    import asyncio
+    from app.service import resume_generator as module
+    from app.schema.generation import GenerateResumeRequest
+    from app.schema.resume import ResumeInfo
+
+    document = {
+        "summary": "5 年后端开发经验。",
+        "tech_stack": ["Go", "Kafka"],
+        "projects": [{
+            "name": "订单中心",
+            "description": "高并发订单系统。",
+            "tech_stack": ["Go"],
+            "responsibilities": ["负责架构设计"]
+        }],
+        "education": "某大学 计算机科学"
+    }
+
+    monkeypatch.setattr(module, "search_by_resume_requirements", lambda **kwargs: {
+        "job_requirements": [{"job_title": "Go 后端", "job_detail": "熟悉 Go。"}],
+        "open_source_projects": [{"project_name": "nsq", "description": "消息队列。"}],
+    })
+    generator = module.ResumeGenerator()
+    generator.llm_client = FakeLLMClient("```json\n" + json.dumps(document, ensure_ascii=False) + "\n```")
+    request = GenerateResumeRequest(
+        old_resume=ResumeInfo(name="张三", tech_stack=["Go"]),
+        target_job_title="Go 后端",
+        target_city="上海",
+        mode="single"
+    )
+
+    response = asyncio.run(generator.generate_resume(request))
+    assert response.success
+    assert len(generator.llm_client.prompts) == 1
+    assert [project.name for project in response.new_projects] == ["订单中心"]
+    assert response.resume_content.startswith("# 张三\n")
+    assert "### 1. 订单中心" in response.resume_content
+    assert "- 负责架构设计" in response.resume_content
+
+
+def test_resume_renderer_templates():
+    """模板在本地渲染，输出确定；HTML 模板转义用户内容"""
+    import pytest
+    from app.service.resume_renderer import ResumeRenderer, TemplateNotExists
+    from app.schema.generation import ResumeDocument
+    from app.schema.resume import ResumeInfo, ProjectDetail
+
+    renderer = ResumeRenderer()
+    resume = ResumeInfo(name="张三<script>", age=28, tech_stack=["Go"], education="某大学")
+    document = ResumeDocument(projects=[
+        ProjectDetail(name="订单中心", description="高并发", tech_stack=["Go"], responsibilities=["设计"])
+    ])
+
+    assert {"default", "compact"} <= set(renderer.templates())
+    markdown = renderer.render(resume, document)
+    assert markdown == renderer.render(resume, document, "default")
+    assert "### 1. 订单中心\n\n**技术栈：** Go" in markdown
+    assert markdown.endswith("## 教育经历\n\n某大学\n")
+    assert renderer.render(resume, document, "compact") != markdown
+
+    html = renderer.render(resume, document, "compact", fmt="html")
+    assert "张三&lt;script&gt;" in html and "<li>设计</li>" in html
+    with pytest.raises(TemplateNotExists):
+        renderer.render(resume, document, "missing")
+
+
+def fake_html_to_pdf(html: str) -> bytes:
+    """html_to_pdf 的替身（在进程池的子进程中执行，须为模块级函数）"""
+    import time
+    time.sleep(0.2)
+    return f"%PDF-fake {len(html)}".encode()
+
+
+def test_pdf_render_pool_limits_pending_and_shuts_down(monkeypatch):
+    """转换在进程池中执行，同时提交的任务数受 max_pending 限制；未安装 weasyprint 时报错"""
+    import time
+    import asyncio
+    import pytest
+    from app.service import pdf_renderer
+    from app.service.pdf_renderer import PdfRenderPool, PdfUnavailable
+
+    monkeypatch.setattr(PdfRenderPool, "available", staticmethod(lambda: False))
+    with pytest.raises(PdfUnavailable):
+        asyncio.run(PdfRenderPool().render("<html></html>"))
+
+    monkeypatch.setattr(PdfRenderPool, "available", staticmethod(lambda: True))
+    monkeypatch.setattr(pdf_renderer, "html_to_pdf", fake_html_to_pdf)
+    pool = PdfRenderPool(max_workers=2, max_pending=1)
+
+    async def run():
+        tasks = [asyncio.create_task(pool.render("<p>简历</p>")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        pending = pool.pending
+        start = time.perf_counter()
+        results = await asyncio.gather(*tasks)
+        return pending, results, time.perf_counter() - start
+
+    try:
+        pending, results, elapsed = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert pending == 2 and pool.pending == 0
+    assert results == [f"%PDF-fake {len('<p>简历</p>')}".encode()] * 2
+    # 两个进程但 max_pending=1，转换依次执行
+    assert elapsed >= 0.35
+    assert pool._executor is None
+
+
+def test_render_endpoints_pdf_and_unavailable(monkeypatch, tmp_path):
+    """/render 与 /results/{id}/render 返回 PDF；未安装 weasyprint 时返回 501"""
+    from fastapi.testclient import TestClient
+    from app import app
+    from app.handler import resume as handler
+    from app.service import pdf_renderer
+    from app.service.pdf_renderer import PdfRenderPool
+    from app.service.generation_store import GenerationStore
+    from app.schema.resume import ResumeInfo
+
+    monkeypatch.setattr(pdf_renderer, "html_to_pdf", fake_html_to_pdf)
+    monkeypatch.setattr(PdfRenderPool, "available", staticmethod(lambda: True))
+    pool = PdfRenderPool(max_workers=1)
+    monkeypatch.setattr(handler, "pdf_render_pool", pool)
+    store = GenerationStore(str(tmp_path / "generations.sqlite3"))
+    monkeypatch.setattr(handler, "generation_store", store)
+    old_resume = ResumeInfo(name="张三", tech_stack=["Go"])
+    result_id = store.save_result(
+        {"old_resume": old_resume.dict()},
+        {"resume_content": "# 张三", "new_projects": [], "document": None}
+    )
+    client = TestClient(app)
+
+    try:
+        rendered = client.post("/api/v1/resume/render", json={"old_resume": old_resume.dict(), "format": "pdf"})
+        assert rendered.headers["content-type"] == "application/pdf"
+        assert rendered.content.startswith(b"%PDF-fake ")
+        assert "filename*=UTF-8''%E5%BC%A0%E4%B8%89.pdf" in rendered.headers["content-disposition"]
+
+        stored = client.post(f"/api/v1/resume/results/{result_id}/render", json={"template_id": "compact"})
+        assert stored.headers["content-type"] == "application/pdf"
+        assert client.post("/api/v1/resume/results/missing/render", json={}).json()["code"] == 404
+
+        monkeypatch.setattr(PdfRenderPool, "available", staticmethod(lambda: False))
+        unavailable = client.post(f"/api/v1/resume/results/{result_id}/render", json={"format": "pdf"}).json()
+        assert unavailable["code"] == 501
+        # 其他格式不依赖 weasyprint
+        markdown = client.post(f"/api/v1/resume/results/{result_id}/render", json={"format": "markdown"})
+        assert markdown.headers["content-type"].startswith("text/markdown") and "张三" in markdown.text
+    finally:
+        pool.shutdown()
+
+
+def test_generation_stages_reused_when_inputs_unchanged(monkeypatch, tmp_path):
+    """换模板不重新生成；只改姓名时只重新合成简历"""
+    import asyncio
+    from app.service import resume_generator as module
+    from app.service.generation_store import GenerationStore
+    from app.schema.generation import GenerateResumeRequest
+    from app.schema.resume import ResumeInfo
+
+    searches = []
+
+    def search(**kwargs):
+        searches.append(kwargs)
+        return {"job_requirements": [{"job_title": "Go 后端"}], "open_source_projects": [{"project_name": "nsq"}]}
+
+    monkeypatch.setattr(module, "search_by_resume_requirements", search)
+    store = GenerationStore(str(tmp_path / "generations.sqlite3"))
+    generator = module.ResumeGenerator(generation_store=store)
+    llm = generator.llm_client = FakeLLMClient()
+
+    def request(**kwargs):
+        return GenerateResumeRequest(
+            old_resume=ResumeInfo(name=kwargs.pop("name", "张三"), tech_stack=["Go"]),
+            target_job_title="Go 后端", target_city="上海", **kwargs
+        )
+
+    first = asyncio.run(generator.generate_resume(request()))
+    assert first.success and len(searches) == 1 and llm.kinds == ["projects", "resume"]
+
+    switched = asyncio.run(generator.generate_resume(request(template_id="compact")))
+    assert switched.resume_content == first.resume_content
+    assert len(searches) == 1 and llm.kinds == ["projects", "resume"]
+    assert switched.result_id != first.result_id
+
+    asyncio.run(generator.generate_resume(request(name="李四")))
+    assert len(searches) == 1 and llm.kinds == ["projects", "resume", "resume"]
+
+    stored = store.get_result(first.result_id)
+    assert stored["request"]["old_resume"]["name"] == "张三"
+    assert stored["result"]["new_projects"][0]["name"] == "订单中心"
+
+
+def test_generation_stages_skip_failures_and_follow_consumed_inputs(monkeypatch, tmp_path):
+    """检索失败与 LLM 备用响应不保存；项目经验重新生成后简历随之重新合成"""
+    import asyncio
+    from app.service import resume_generator as module
+    from app.service.generation_store import GenerationStore
+    from app.schema.generation import GenerateResumeRequest
+    from app.schema.resume import ResumeInfo
+
+    searches = []
+    complete = {"value": False}
+
+    def search(**kwargs):
+        searches.append(kwargs)
+        return {
+            "job_requirements": [{"job_title": "Go 后端"}],
+            "open_source_projects": [{"project_name": "nsq"}] if complete["value"] else [],
+            "complete": complete["value"],
+        }
+
+    projects_reply = {"value": PROJECTS_REPLY}
+
+    def reply(prompt):
+        if PROJECT_PROMPT_MARK in prompt:
+            return projects_reply["value"]
+        # 第一次合成简历时 LLM 不可用，返回备用响应
+        return "备用响应" if len(llm.prompts) == 2 else f"# 简历 {len(llm.prompts)}"
+
+    monkeypatch.setattr(module, "search_by_resume_requirements", search)
+    store = GenerationStore(str(tmp_path / "generations.sqlite3"))
+    generator = module.ResumeGenerator(generation_store=store)
+    llm = generator.llm_client = FakeLLMClient(reply)
+    llm.is_fallback = lambda text: text == "备用响应"
+    request = GenerateResumeRequest(
+        old_resume=ResumeInfo(name="张三", tech_stack=["Go"]), target_job_title="Go 后端", target_city="上海"
+    )
+
+    assert asyncio.run(generator.generate_resume(request)).resume_content == "备用响应"
+    # 检索失败的结果与备用响应都没有保存
+    complete["value"] = True
+    second = asyncio.run(generator.generate_resume(request))
+    assert len(searches) == 2 and llm.kinds == ["projects", "resume", "projects", "resume"]
+    assert second.resume_content == "# 简历 4"
+
+    asyncio.run(generator.generate_resume(request))
+    assert len(searches) == 2 and len(llm.prompts) == 4
+
+    # 项目经验过期后重新生成了不同的项目，简历不能复用按旧项目合成的结果
+    with store._lock:
+        store.db.execute("UPDATE stages SET created_at = 0 WHERE value LIKE '%订单中心%'")
+    projects_reply["value"] = PROJECTS_REPLY.replace("订单中心", "日志平台")
+    third = asyncio.run(generator.generate_resume(request))
+    assert [project.name for project in third.new_projects] == ["日志平台"]
+    assert llm.kinds[4:] == ["projects", "resume"] and third.resume_content == "# 简历 6"
+
+
+def test_multi_target_generation_shares_retrieval(monkeypatch):
+    """多目标共享一次批量检索，开源项目按关键词去重，LLM 并发数受限"""
+    import asyncio
+    from app.service import search as search_module
+    from app.service import resume_generator as module
+    from app.schema.generation import GenerateMultiResumeRequest, ResumeTarget
+    from app.schema.resume import ResumeInfo
+
+    calls = {"batch": [], "projects": []}
+
+    def batch(queries, top_k=10):
+        calls["batch"].append([q["query"] for q in queries])
+        return [[{"job_title": q["query"], "city": q["city"]}] for q in queries]
+
+    def projects(query, industry=None, tech_stack=None, top_k=10, strict=False):
+        calls["projects"].append(tech_stack or query)
+        return [{"project_name": "nsq"}]
+
+    monkeypatch.setattr(search_module, "query_job_requirements_batch", batch)
+    monkeypatch.setattr(search_module, "search_open_source_projects", projects)
+    monkeypatch.setattr(module.config, "llm_provider_concurrency", {"fake": 2}, raising=False)
+    generator = module.ResumeGenerator()
+    llm = generator.llm_client = FakeLLMClient(delay=0.01)
+    targets = [("Go 后端", "上海"), ("Go 后端", "杭州"), ("架构师", "上海"), ("Go 后端", "上海")]
+    request = GenerateMultiResumeRequest(
+        old_resume=ResumeInfo(name="张三", tech_stack=["Go"]),
+        targets=[ResumeTarget(target_job_title=title, target_city=city) for title, city in targets]
+    )
+
+    responses = asyncio.run(generator.generate_resumes(request))
+    assert [response.success for response in responses] == [True] * 4
+    # 重复的目标只检索、生成一次；所有目标一次批量检索，开源项目只搜索一次
+    assert calls["batch"] == [["Go 后端 Go", "Go 后端 Go", "架构师 Go"]]
+    assert calls["projects"] == ["Go"]
+    assert llm.max_running == 2
+
+
+def _stream_generator(monkeypatch, llm_cache=None):
+    """检索替换为固定结果、LLM 为 FakeLLMClient 的生成器"""
+    from app.service import resume_generator as module
+
+    monkeypatch.setattr(module, "search_job_requirements", lambda **kwargs: [{"job_title": "Go 后端"}])
+    monkeypatch.setattr(module, "search_open_source_projects", lambda **kwargs: [{"project_name": "nsq"}])
+    generator = module.ResumeGenerator(llm_cache=llm_cache)
+    generator.llm_client = FakeLLMClient()
+    return generator
+
+
+def _stream_request():
+    from app.schema.generation import GenerateResumeRequest
+    from app.schema.resume import ResumeInfo
+
+    return GenerateResumeRequest(
+        old_resume=ResumeInfo(name="张三", tech_stack=["Go"]),
+        target_job_title="Go 后端",
+        target_city="上海",
+        mode="two_pass"
+    )
+
+
+def test_stream_resume_event_order_and_cache_hits(monkeypatch):
+    """事件依次为检索结果、每个项目、简历增量、done；再次生成时 LLM 回复全部命中缓存"""
+    import asyncio
+    from app.service.llm_cache import LLMResponseCache
+
+    generator = _stream_generator(monkeypatch, LLMResponseCache(semantic_namespaces=[]))
+    llm = generator.llm_client
+
+    async def collect():
+        return [event async for event in generator.stream_resume(_stream_request())]
+
+    events = asyncio.run(collect())
+    names = [name for name, _ in events]
+    assert names[:2] == ["retrieval", "retrieval"]
+    assert {key for _, data in events[:2] for key in data} == {"job_requirements", "open_source_projects"}
+    assert names[2] == "project" and events[2][1]["name"] == "订单中心"
+    assert names[3:-1] == ["resume"] * (len(names) - 4) and len(names) > 5
+    assert "".join(data["delta"] for name, data in events if name == "resume") == "# 简历 2"
+    assert names[-1] == "done" and llm.kinds == ["projects", "resume"]
+
+    cached = asyncio.run(collect())
+    # 缓存命中时一次返回完整回复，不再调用 LLM
+    assert [name for name, _ in cached] == ["retrieval", "retrieval", "project", "resume", "done"]
+    assert cached[3][1]["delta"] == "# 简历 2"
+    assert llm.kinds == ["projects", "resume"]
+
+
+def test_generate_stream_endpoint_sse_framing(monkeypatch):
+    """/generate-stream 每个事件编码为 event/data 两行加空行，出错时返回 error 事件"""
+    import json
+    from fastapi.testclient import TestClient
+    from app import app
+    from app.service import resume_generator as module
+
+    generator = _stream_generator(monkeypatch)
+    monkeypatch.setattr(module, "resume_generator", generator)
+    client = TestClient(app)
+
+    def post():
+        response = client.post("/api/v1/resume/generate-stream", json=_stream_request().dict())
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.endswith("\n\n")
+        events = []
+        for block in response.text[:-2].split("\n\n"):
+            event_line, data_line = block.split("\n")
+            assert event_line.startswith("event: ") and data_line.startswith("data: ")
+            events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+        return events
+
+    events = post()
+    assert [name for name, _ in events][:3] == ["retrieval", "retrieval", "project"]
+    assert events[-1] == ("done", {})
+    assert "".join(data["delta"] for name, data in events if name == "resume") == "# 简历 2"
+
+    def failing_search(**kwargs):
+        raise RuntimeError("检索失败")
+
+    monkeypatch.setattr(module, "search_job_requirements", failing_search)
+    assert ("error", {"message": "检索失败"}) in post()
+
+
+def test_llm_token_logging_runs_off_event_loop():
+    """统计 token 数（可能加载分词器）不在事件循环线程中执行"""
+    import asyncio
+    import threading
+    from app.service.resume_generator import ResumeGenerator
+    from app.service.prompt_budget import PromptCompressor, TokenCounter
+
+    threads = []
+
+    class RecordingCounter(TokenCounter):
+        def count(self, text):
+            threads.append(threading.current_thread())
+            return super().count(text)
+
+    generator = ResumeGenerator(prompt_compressor=PromptCompressor(RecordingCounter()))
+    generator.llm_client = FakeLLMClient("回复")
+
+    async def run():
+        await generator._llm_generate("resume", "提示词", use_cache=False)
+        return [delta async for delta in generator._llm_stream("resume", "提示词", use_cache=False)]
+
+    assert asyncio.run(run()) == ["回复"]
+    assert len(threads) == 4 and threading.main_thread() not in threads
+
+
+async def _collect(stream) -> list:
+    return [delta async for delta in stream]
+
+
+def test_llm_stream_does_not_hold_slot_while_consumer_is_slow(monkeypatch):
+    """流式生成的并发名额与 llm 耗时不包括调用方消费增量的时间"""
+    import asyncio
+    from app.service import resume_generator as module
+    from app.service.metrics import RequestTimings, request_timings
+
+    monkeypatch.setattr(module.config, "llm_provider_concurrency", {"fake": 1}, raising=False)
+    generator = module.ResumeGenerator()
+    generator.llm_client = FakeLLMClient("回复内容较长，分多次返回")
+    timings = RequestTimings()
+
+    async def run():
+        request_timings.set(timings)
+        slow = generator._llm_stream("resume", "提示词一", use_cache=False)
+        first = await slow.__anext__()
+        # 第一个调用方暂停消费时，第二个调用不需要等待并发名额
+        other = await asyncio.wait_for(
+            _collect(generator._llm_stream("resume", "提示词二", use_cache=False)), timeout=1
+        )
+        await asyncio.sleep(0.2)
+        rest = await _collect(slow)
+        return first + "".join(rest), "".join(other)
+
+    assert asyncio.run(run()) == ("回复内容较长，分多次返回", "回复内容较长，分多次返回")
+    assert timings._stages["llm.fake"] < 0.1
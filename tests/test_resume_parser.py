@@ -0,0 +1,208 @@
+"""
+简历解析测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import io
+import asyncio
+
+from docx import Document
+from fastapi import UploadFile
+
+from app.handler.resume import read_upload, UploadTooLarge
+from app.service.resume_parser import ResumeParser
+
+
+SAMPLE_RESUME = """张三
+年龄：25
+教育背景：某某大学 计算机科学与技术 本科
+工作经历：某某科技有限公司 后端开发工程师
+项目经验
+订单中心重构
+负责使用 Python 和 Redis 实现订单缓存
+"""
+
+
+def test_parse_txt_from_memory():
+    """txt 内容直接从 bytes 解析"""
+    response = ResumeParser().parse(file_content=SAMPLE_RESUME.encode("utf-8"), file_type="txt")
+
+    assert response.success
+    assert response.resume_info.name == "张三"
+    assert response.resume_info.age == 25
+    assert "Python" in response.resume_info.tech_stack
+
+
+def test_parse_docx_from_memory():
+    """docx 通过 BytesIO 解析，不落盘"""
+    doc = Document()
+    for line in SAMPLE_RESUME.splitlines():
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    response = ResumeParser().parse(file_content=buffer.getvalue(), file_type="docx")
+
+    assert response.success
+    assert response.resume_info.name == "张三"
+
+
+def test_read_upload_rejects_oversized_file():
+    """超过大小上限的上传被提前拒绝"""
+    upload = UploadFile(io.BytesIO(b"x" * 1024), filename="resume.txt")
+
+    try:
+        asyncio.run(read_upload(upload, max_size=512))
+    except UploadTooLarge:
+        pass
+    else:
+        raise AssertionError("应当抛出 UploadTooLarge")
+
+    upload = UploadFile(io.BytesIO(b"x" * 256), filename="resume.txt")
+    assert asyncio.run(read_upload(upload, max_size=512)) == b"x" * 256
+
+
+def test_looks_broken_detects_empty_and_garbled_pages():
+    """空白页过多或乱码过多时回退到 pdfplumber"""
+    from app.service.pdf_extractor import looks_broken
+
+    assert looks_broken([])
+    assert looks_broken(["", "  \n", "张三"])
+    assert looks_broken(["(cid:12)(cid:34)(cid:56) 简历"])
+    assert not looks_broken(["张三\n年龄：25", "项目经验"])
+
+
+def test_parse_result_cache_hits_memory_and_disk(tmp_path):
+    """相同内容的重复上传命中缓存，磁盘层可在新进程中复用"""
+    from app.service.parse_cache import ParseResultCache
+
+    content = SAMPLE_RESUME.encode("utf-8")
+    parser = ResumeParser(cache=ParseResultCache(cache_num=2, cache_dir=str(tmp_path)))
+
+    first = parser.parse(file_content=content, file_type="txt")
+    second = parser.parse(file_content=content, file_type="txt")
+    assert not first.cached
+    assert second.cached
+    assert second.resume_info == first.resume_info
+
+    # 新的内存层，从磁盘层读取
+    parser = ResumeParser(cache=ParseResultCache(cache_num=2, cache_dir=str(tmp_path)))
+    assert parser.parse(file_content=content, file_type="txt").cached
+    assert not parser.parse(file_content=content, file_type="txt", use_cache=False).cached
+
+
+def test_batch_parse_zip_reports_errors_inline():
+    """批量解析 zip：每个文件一条结果，错误逐条返回"""
+    import zipfile
+    from app.service.batch_parser import BatchParser, iter_archive_sources, open_archive
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("a/resume.txt", SAMPLE_RESUME)
+        archive.writestr("b/photo.png", b"\x89PNG")
+        archive.writestr("c/large.md", "x" * 2048)
+    buffer.seek(0)
+
+    sources = iter_archive_sources(open_archive(buffer, max_files=3, max_total_size=4096), 1024)
+    results = {item["filename"]: item for item in BatchParser(ResumeParser(), max_workers=2).iter_parse(sources)}
+
+    assert results["a/resume.txt"]["success"]
+    assert results["a/resume.txt"]["resume_info"]["name"] == "张三"
+    assert not results["b/photo.png"]["success"]
+    assert not results["c/large.md"]["success"]
+
+
+def test_batch_parse_limits_archive_and_skips_unsupported_reads():
+    """压缩包按文件数与解压后总大小整体拒绝；不支持的文件不读取"""
+    import zipfile
+    import pytest
+    from fastapi.testclient import TestClient
+    from app import app
+    from app.service.batch_parser import BatchParser, ArchiveTooLarge, open_archive
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(3):
+            archive.writestr(f"{i}.txt", "x" * 1000)
+    content = buffer.getvalue()
+
+    with pytest.raises(ArchiveTooLarge):
+        open_archive(io.BytesIO(content), max_files=2, max_total_size=10000)
+    with pytest.raises(ArchiveTooLarge):
+        open_archive(io.BytesIO(content), max_files=3, max_total_size=2999)
+    with pytest.raises(ValueError):
+        open_archive(io.BytesIO(b"not a zip"), max_files=3, max_total_size=10000)
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/resume/parse-batch",
+        files=[("files", ("a.txt", SAMPLE_RESUME.encode("utf-8"))), ("archive", ("b.zip", b"not a zip"))]
+    )
+    assert response.json()["code"] == 400
+
+    def unread():
+        raise AssertionError("不支持的文件不应读取")
+
+    results = list(BatchParser(ResumeParser(), max_workers=1).iter_parse([("photo.png", unread)]))
+    assert results == [{"filename": "photo.png", "success": False, "error": "不支持的文件类型: photo.png"}]
+
+
+def test_batch_parse_close_waits_for_in_flight_reads():
+    """提前关闭结果流时，取消未开始的任务并等待正在读取的任务结束"""
+    import time
+    import threading
+    from app.service.batch_parser import BatchParser
+
+    started = threading.Event()
+    reads = []
+
+    def slow_read():
+        started.set()
+        time.sleep(0.2)
+        reads.append("done")
+        return SAMPLE_RESUME.encode("utf-8")
+
+    parser = BatchParser(ResumeParser(), max_workers=1)
+    lines = parser.iter_ndjson((f"{i}.txt", slow_read) for i in range(4))
+    next(lines)
+    started.wait()
+    lines.close()
+    # 关闭返回时没有任务仍在读取文件
+    count = len(reads)
+    time.sleep(0.3)
+    assert len(reads) == count < 4
+
+
+def test_sectionize_splits_typed_sections_with_offsets():
+    """一次扫描切分段落，偏移与原文一致"""
+    from app.service.resume_sectionizer import SectionKind, sectionize
+
+    sections = sectionize(SAMPLE_RESUME)
+
+    assert [section.kind for section in sections] == [
+        SectionKind.BASIC, SectionKind.EDUCATION, SectionKind.WORK, SectionKind.PROJECTS
+    ]
+    for section in sections:
+        assert SAMPLE_RESUME[section.start:section.end] == section.text
+
+    resume_info = ResumeParser().parse(file_content=SAMPLE_RESUME.encode("utf-8"), file_type="txt").resume_info
+    assert resume_info.education == "某某大学 计算机科学与技术 本科"
+    assert resume_info.work_experience == "某某科技有限公司 后端开发工程师"
+    assert resume_info.projects[0].name == "订单中心重构"
+
+
+def test_keyword_matcher_matches_substring_semantics():
+    """与逐个关键词做大小写不敏感子串判断的结果一致"""
+    from app.service.resume_sectionizer import KeywordMatcher
+
+    keywords = ResumeParser().tech_keywords
+    matcher = KeywordMatcher(keywords)
+    for text in ["熟悉 golang 与 JavaScript", "Django/Flask, PostgreSQL", "分布式高并发", "nothing here"]:
+        expected = [keyword for keyword in keywords if keyword.lower() in text.lower()]
+        assert matcher.find_all(text) == expected
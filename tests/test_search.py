@@ -0,0 +1,159 @@
+"""
+检索测试用例（向量检索使用临时目录中的进程内向量库，向量化使用 benchmarks/stand_ins.py 中的本地替身）
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+def test_search_job_requirements_with_filters(monkeypatch, tmp_path):
+    """招聘要求检索经 prepare_milvus_oper 使用招聘要求 collection，并按城市过滤"""
+    from benchmarks.stand_ins import install_stand_ins, synthetic_job_requirements
+    from app import cache_pool
+    from config import config
+    from app.repositry.milvus import insert_job_requirements
+    from app.service import search
+
+    # 测试结束后恢复被替身替换的配置与模块属性
+    monkeypatch.setattr(config, "vector_backend", "local", raising=False)
+    monkeypatch.setattr(config, "local_vector_path", str(tmp_path), raising=False)
+    for module, name in [(cache_pool, "bge_m3_ef"), (search, "requests")]:
+        monkeypatch.setattr(module, name, getattr(module, name))
+    install_stand_ins(vector_path=str(tmp_path))
+    insert_job_requirements(synthetic_job_requirements(50))
+
+    results = search.search_job_requirements("Python开发 Django", city="上海", top_k=3)
+    assert len(results) == 3
+    assert all(job["city"] == "上海" for job in results)
+    assert results[0]["job_title"] == "Python开发"
+
+
+def test_search_reports_failed_sources(monkeypatch):
+    """检索失败时结果标记为不完整（保留已取得的部分），默认模式仍返回空列表"""
+    import pytest
+    from app.service import search
+
+    def github(keywords, limit=10):
+        raise ConnectionError("GitHub 不可用")
+
+    def gitee(keywords, limit=10):
+        return [{"project_name": "gitee-project"}]
+
+    monkeypatch.setattr(search, "_search_github", github)
+    monkeypatch.setattr(search, "_search_gitee", gitee)
+    monkeypatch.setattr(search, "query_job_requirements", lambda **kwargs: [{"job_title": "Go 后端"}])
+
+    assert search.search_open_source_projects("Go") == [{"project_name": "gitee-project"}]
+    with pytest.raises(search.SearchError) as error:
+        search.search_open_source_projects("Go", strict=True)
+    assert error.value.results == [{"project_name": "gitee-project"}]
+
+    results = search.search_by_resume_requirements("Go 后端", tech_stack="Go")
+    assert results == {
+        "job_requirements": [{"job_title": "Go 后端"}],
+        "open_source_projects": [{"project_name": "gitee-project"}],
+        "complete": False,
+    }
+    monkeypatch.setattr(search, "query_job_requirements_batch", lambda queries, top_k=10: [[]] * len(queries))
+    assert search.search_by_targets([{"job_title": "Go 后端"}], tech_stack="Go")[0]["complete"] is False
+    monkeypatch.setattr(search, "_search_github", lambda keywords, limit=10: [{"project_name": "github-project"}])
+    assert search.search_by_targets([{"job_title": "Go 后端"}], tech_stack="Go")[0]["complete"] is True
+
+
+def test_prepare_milvus_oper_shares_one_connection_across_threads(monkeypatch):
+    """并发的仓储调用共享同一个连接：不会断开其他线程正在使用的连接"""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import pymilvus
+    from app.db import milvus as db_milvus
+
+    class FakeHandler:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    class FakeConnections:
+        """与 pymilvus 相同：同一别名共享一个连接，断开时关闭该连接"""
+
+        def __init__(self):
+            self.handlers = {}
+            self.connects = 0
+
+        def connect(self, alias="default", **kwargs):
+            if alias not in self.handlers:
+                self.handlers[alias] = FakeHandler()
+                self.connects += 1
+
+        def disconnect(self, alias):
+            if alias in self.handlers:
+                self.handlers.pop(alias).close()
+
+    fake_connections = FakeConnections()
+
+    class FakeCollection:
+        def __init__(self, name, using="default"):
+            self.name = name
+            self.using = using
+
+        def load(self):
+            pass
+
+        def search(self):
+            # 与 pymilvus 相同，每次操作时按别名取连接
+            handler = fake_connections.handlers[self.using]
+            time.sleep(0.01)
+            if handler.closed:
+                raise RuntimeError("Cannot invoke RPC on closed channel!")
+            return self.name
+
+    # app.db.milvus 在使用时才从 pymilvus 导入
+    monkeypatch.setattr(pymilvus, "connections", fake_connections)
+    monkeypatch.setattr(pymilvus, "Collection", FakeCollection)
+    monkeypatch.setattr(db_milvus, "_collections", {})
+    monkeypatch.setattr(db_milvus, "_connected_pid", None)
+    monkeypatch.setattr(db_milvus.config, "vector_backend", "milvus", raising=False)
+
+    @db_milvus.prepare_milvus_oper("jobs")
+    def search_jobs(collection):
+        return collection.search()
+
+    @db_milvus.prepare_milvus_oper("concepts")
+    def search_concepts(collection):
+        return collection.search()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(search_jobs if i % 2 else search_concepts) for i in range(40)]
+        results = [future.result() for future in futures]
+
+    assert results == ["concepts", "jobs"] * 20
+    assert fake_connections.connects == 1
+
+
+def test_search_by_targets_records_timings_in_request_context(monkeypatch):
+    """并发检索在调用方上下文中执行，线程中的耗时计入当前请求的 Server-Timing"""
+    from app.service import search
+    from app.service.metrics import RequestTimings, request_timings, timed
+
+    def batch(queries, top_k=10):
+        with timed("milvus", "search"):
+            return [[] for _ in queries]
+
+    def github(keywords, limit=10):
+        with timed("http", "api.github.com"):
+            return [{"project_name": "github-project"}]
+
+    monkeypatch.setattr(search, "query_job_requirements_batch", batch)
+    monkeypatch.setattr(search, "_search_github", github)
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        search.search_by_targets([{"job_title": "Go 后端"}, {"job_title": "架构师"}])
+    finally:
+        request_timings.reset(token)
+
+    assert {"milvus.search", "http.api.github.com"} <= set(timings._stages)
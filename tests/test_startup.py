@@ -0,0 +1,57 @@
+"""
+启动耗时测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import json
+import subprocess
+
+# 导入 app 时不应加载的重型依赖（在首次使用或启动预热时加载）
+HEAVY_MODULES = [
+    "torch", "transformers", "milvus_model", "FlagEmbedding", "pdfplumber", "pypdfium2", "pdfminer", "docx",
+    "pymilvus", "pandas", "grpc",
+]
+# 导入 app 时不应创建的全局实例（模块, 属性）
+LAZY_SINGLETONS = [
+    ("app.service.resume_parser", "resume_parser"),
+    ("app.service.batch_parser", "batch_parser"),
+    ("app.service.resume_generator", "resume_generator"),
+]
+# 导入 app 的耗时上限（秒），可用环境变量 IMPORT_TIME_BUDGET 调整
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", 5))
+
+_measure = f"""
+import sys, json, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+    "singletons": [name for module, name in {LAZY_SINGLETONS!r} if getattr(sys.modules[module], name) is not None],
+}}))
+"""
+
+
+def _import_app() -> dict:
+    """在新进程中导入 app（每个 worker 与 scheduler.py 的冷启动）"""
+    output = subprocess.run(
+        [sys.executable, "-c", _measure], cwd=project_root, capture_output=True, text=True, timeout=120, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_app_skips_heavy_dependencies_and_stays_within_budget():
+    """导入 app 不加载模型、文件解析库与 Milvus 客户端，不创建解析器与生成器，耗时不超过预算"""
+    # 取两次中较快的一次，排除首次编译 .pyc 等一次性开销
+    results = [_import_app() for _ in range(2)]
+    assert results[0]["heavy"] == []
+    assert results[0]["singletons"] == []
+    elapsed = min(result["elapsed"] for result in results)
+    assert elapsed < IMPORT_TIME_BUDGET, f"导入 app 耗时 {elapsed:.2f}s，超过预算 {IMPORT_TIME_BUDGET}s"
@@ -0,0 +1,29 @@
+"""
+工具函数测试用例
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径，确保可以导入 app 模块
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import LogRateLimiter
+
+
+def test_log_rate_limiter_per_call_site():
+    """每个调用位置单独限流，恢复输出时返回期间丢弃的条数"""
+    import time
+
+    limiter = LogRateLimiter(per_second=20, burst=2)
+
+    def hot_path():
+        return limiter.take()
+
+    assert [hot_path() for _ in range(4)] == [0, 0, None, None]
+    # 其他调用位置不受影响
+    assert limiter.take() == 0
+
+    time.sleep(0.1)
+    assert hot_path() == 2
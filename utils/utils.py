@@ -1,4 +1,7 @@
-from typing import Literal
+import sys
+import time
+import threading
+from typing import Dict, Hashable, Literal, Optional
 from config import config
 
 
@@ -13,4 +16,50 @@ def average_split(data: list, step: int) -> list:
     return [
         data[start: start+step]
         for start in range(len(data))[::step]
-    ]
\ No newline at end of file
+    ]
+
+
+class LogRateLimiter:
+    """ 按调用位置限制日志频率（令牌桶）
+
+    每个调用位置（或指定的 key）每秒最多 per_second 条，允许 burst 条突发，
+    超出的日志直接丢弃，放行时返回期间丢弃的条数。
+    """
+
+    def __init__(self, per_second: float = 1.0, burst: int = 5):
+        self.per_second = per_second
+        self.burst = burst
+        # key -> [剩余令牌, 上次补充时间, 丢弃条数]
+        self._buckets: Dict[Hashable, list] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: Hashable = None) -> Optional[int]:
+        """
+        Args:
+            key: 限流 key，默认为调用位置（文件名 + 行号）
+
+        Returns:
+            允许输出时返回上次输出以来丢弃的条数，不允许时返回 None
+        """
+        if key is None:
+            frame = sys._getframe(1)
+            key = (frame.f_code.co_filename, frame.f_lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return None
+            bucket[0] -= 1
+            dropped, bucket[2] = bucket[2], 0
+            return dropped
+
+
+log_limiter = LogRateLimiter(
+    per_second=getattr(config, "log_rate_per_second", 1),
+    burst=getattr(config, "log_rate_burst", 5),
+)